@@ -1,10 +1,15 @@
 # authentication/admin.py
+from django import forms
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
 from django.utils.html import format_html
 from django.utils import timezone
 from django.db.models import Count, Q
 from .models import User, CodeQuitus, TransactionBancaire, ResponsableFiliere, UserActionLog
+from .releves import ReleveInvalide, importer_releve, lire_releve
 
 
 # ==========================================
@@ -197,6 +202,8 @@ class CodeQuitusAdmin(admin.ModelAdmin):
     ]
     list_filter = [
         'utilise', 
+        'paye', 
+        'expire', 
         'date_generation', 
         'date_expiration',
     ]
@@ -209,7 +216,7 @@ class CodeQuitusAdmin(admin.ModelAdmin):
             'fields': ('code', 'reference_bancaire', 'montant')
         }),
         ('📊 Statut', {
-            'fields': ('utilise', 'utilisateur', 'date_utilisation', 'stats_display')
+            'fields': ('utilise', 'expire', 'utilisateur', 'date_utilisation', 'stats_display')
         }),
         ('📅 Dates', {
             'fields': ('date_generation', 'date_expiration')
@@ -244,7 +251,7 @@ class CodeQuitusAdmin(admin.ModelAdmin):
                 '<span style="background: #f44336; color: white; padding: 5px 12px; '
                 'border-radius: 14px; font-size: 11px; font-weight: bold;">✗ UTILISÉ</span>'
             )
-        elif obj.date_expiration and obj.date_expiration < timezone.now():
+        elif obj.expire or (obj.date_expiration and obj.date_expiration < timezone.now()):
             return format_html(
                 '<span style="background: #ff9800; color: white; padding: 5px 12px; '
                 'border-radius: 14px; font-size: 11px; font-weight: bold;">⏰ EXPIRÉ</span>'
@@ -307,18 +314,14 @@ class CodeQuitusAdmin(admin.ModelAdmin):
     
     def stats_display(self, obj):
         """Afficher des statistiques dans le détail"""
-        total = CodeQuitus.objects.count()
-        disponibles = CodeQuitus.objects.filter(
-            utilise=False, 
-            date_expiration__gt=timezone.now()
-        ).count()
-        utilises = CodeQuitus.objects.filter(utilise=True).count()
-        expires = CodeQuitus.objects.filter(
-            date_expiration__lte=timezone.now(), 
-            utilise=False
-        ).count()
+        stats = CodeQuitus.statistiques()
+        total = stats['total']
+        disponibles = stats['disponibles']
+        utilises = stats['utilises']
+        expires = stats['expires']
         
         pourcentage_utilises = (utilises / total * 100) if total > 0 else 0
+        capacite = CodeQuitus.capacite()
         
         return format_html(
             '<div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); '
@@ -355,27 +358,48 @@ class CodeQuitusAdmin(admin.ModelAdmin):
             '{:.1f}%</div>'
             '</div>'
             '</div>'
+            '<div style="margin-top: 10px; padding: 10px; background: rgba(255,255,255,0.1); border-radius: 8px;">'
+            '<div style="font-size: 12px;">🔢 Espace des codes : {} restants sur {} ({}% utilisé)</div>'
+            '</div>'
             '</div>',
-            total, disponibles, utilises, expires, pourcentage_utilises, pourcentage_utilises
+            total, disponibles, utilises, expires, pourcentage_utilises, pourcentage_utilises,
+            capacite['restants'], capacite['total'], capacite['taux_utilisation']
         )
     stats_display.short_description = 'Statistiques'
     
+    def _generer(self, request, nombre):
+        try:
+            codes = CodeQuitus.generer_batch(nombre=nombre)
+        except ValueError as e:
+            self.message_user(request, f'❌ {e}', level='error')
+            return
+        self.message_user(request, f'✅ {len(codes)} codes générés avec succès', level='success')
+    
+    def changelist_view(self, request, extra_context=None):
+        """Alerte quand l'espace des codes approche de la saturation"""
+        capacite = CodeQuitus.capacite()
+        if capacite['niveau'] != 'ok':
+            self.message_user(
+                request,
+                f"⚠️ Espace des codes utilisé à {capacite['taux_utilisation']}% "
+                f"({capacite['restants']} codes restants)",
+                level='error' if capacite['niveau'] == 'critique' else 'warning'
+            )
+        return super().changelist_view(request, extra_context)
+    
     def generer_codes_10(self, request, queryset):
         """Générer 10 codes"""
-        codes = CodeQuitus.generer_batch(nombre=10)
-        self.message_user(request, f'✅ {len(codes)} codes générés avec succès', level='success')
+        self._generer(request, 10)
     generer_codes_10.short_description = '🎫 Générer 10 nouveaux codes'
     
     def generer_codes_50(self, request, queryset):
         """Générer 50 codes"""
-        codes = CodeQuitus.generer_batch(nombre=50)
-        self.message_user(request, f'✅ {len(codes)} codes générés avec succès', level='success')
+        self._generer(request, 50)
     generer_codes_50.short_description = '🎫 Générer 50 nouveaux codes'
     
     def generer_codes_100(self, request, queryset):
         """Générer 100 codes"""
-        codes = CodeQuitus.generer_batch(nombre=100)
-        self.message_user(request, f'✅ {len(codes)} codes générés avec succès', level='success')
+        self._generer(request, 100)
     generer_codes_100.short_description = '🎫 Générer 100 nouveaux codes'
     
     def has_add_permission(self, request):
@@ -393,8 +417,23 @@ class CodeQuitusAdmin(admin.ModelAdmin):
 # TRANSACTION BANCAIRE ADMIN
 # ==========================================
 
+class ImportReleveForm(forms.Form):
+    fichier = forms.FileField(label='Relevé bancaire (.csv ou .xlsx)')
+    banque = forms.CharField(label='Banque par défaut', max_length=100, required=False)
+    agence = forms.CharField(label='Agence par défaut', max_length=100, required=False)
+    simulation = forms.BooleanField(label='Simulation (ne rien enregistrer)', required=False)
+
+    def clean_fichier(self):
+        fichier = self.cleaned_data['fichier']
+        if not fichier.name.lower().endswith(('.csv', '.xlsx')):
+            raise forms.ValidationError('Format non supporté : CSV ou XLSX uniquement')
+        return fichier
+
+
 @admin.register(TransactionBancaire)
 class TransactionBancaireAdmin(admin.ModelAdmin):
+    change_list_template = 'admin/authentication/transactionbancaire/change_list.html'
+    
     list_display = [
         'numero_recu', 
         'nom_payeur', 
@@ -452,6 +491,60 @@ class TransactionBancaireAdmin(admin.ModelAdmin):
             obj.banque, obj.agence
         )
     banque_display.short_description = 'Banque / Agence'
+    
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if not obj.code_quitus.paye:
+            CodeQuitus.objects.filter(pk=obj.code_quitus_id).update(paye=True)
+    
+    def get_urls(self):
+        urls = [
+            path(
+                'importer-releve/',
+                self.admin_site.admin_view(self.importer_releve_view),
+                name='authentication_transactionbancaire_importer_releve'
+            ),
+        ]
+        return urls + super().get_urls()
+    
+    def importer_releve_view(self, request):
+        """Upload d'un relevé bancaire et affichage du rapport de rapprochement"""
+        if not self.has_add_permission(request):
+            return redirect('admin:authentication_transactionbancaire_changelist')
+        
+        rapport = None
+        form = ImportReleveForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            fichier = form.cleaned_data['fichier']
+            try:
+                rapport = importer_releve(
+                    lire_releve(fichier.file, fichier.name),
+                    banque=form.cleaned_data['banque'],
+                    agence=form.cleaned_data['agence'],
+                    simulation=form.cleaned_data['simulation'],
+                )
+            except ReleveInvalide as e:
+                form.add_error('fichier', f'Relevé invalide : {e}')
+            else:
+                self.message_user(
+                    request,
+                    f'✅ {rapport.importees} transaction(s) rapprochée(s) sur {rapport.total} ligne(s)'
+                    + (' (simulation)' if form.cleaned_data['simulation'] else ''),
+                    level='success'
+                )
+        
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Importer un relevé bancaire',
+            'form': form,
+            'rapport': rapport,
+            'anomalies': rapport.anomalies[:500] if rapport else [],
+            'par_motif': sorted(rapport.par_motif().items()) if rapport else [],
+        }
+        return TemplateResponse(
+            request, 'admin/authentication/transactionbancaire/import_releve.html', context
+        )
 
 
 # ==========================================
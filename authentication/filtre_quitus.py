@@ -0,0 +1,143 @@
+# authentication/filtre_quitus.py
+"""
+Filtre en mémoire des codes quitus existants.
+
+L'espace ne compte que 10^6 codes : un bitmap exact d'un bit par code
+(125 Ko) tient partout. C'est un filtre de Bloom à une seule fonction de
+hachage (l'identité), donc sans aucun faux positif : un code absent du
+filtre est rejeté sans interroger MySQL, un code présent est ensuite lu
+en base normalement.
+
+Le bitmap est partagé entre processus via le cache (clé versionnée) et
+gardé en mémoire dans chaque processus. generer_batch() invalide la
+version après commit ; QUITUS_FILTRE_TTL borne l'âge de la copie locale.
+
+Cette invalidation n'atteint pas les autres processus si le cache ne leur
+est pas commun (LocMem, ou commande generer_quitus lancée à part) : un
+code absent du filtre déclenche alors, au plus une fois toutes les
+QUITUS_FILTRE_CONTROLE secondes par processus, une lecture du plus grand
+id en base ; si des codes ont été créés depuis la construction, le
+filtre est reconstruit.
+"""
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+
+from .keyspace import TAILLE_ESPACE
+
+VERSION_KEY = 'quitus:filtre:version'
+BITMAP_KEY = 'quitus:filtre:bitmap:{version}'
+
+_local = None  # (version, chargé_le, dernier_id, bytes)
+_controle = 0.0  # dernier contrôle du plus grand id en base (monotonic)
+_verrou = threading.Lock()
+
+
+def _version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = int(time.time() * 1000)
+        if not cache.add(VERSION_KEY, version, timeout=None):
+            version = cache.get(VERSION_KEY, version)
+    return version
+
+
+def invalider_filtre():
+    """À appeler après toute création de codes (après commit)"""
+    cache.set(VERSION_KEY, int(time.time() * 1000), timeout=None)
+
+
+def _construire():
+    from .models import CodeQuitus
+
+    bitmap = bytearray(TAILLE_ESPACE // 8)
+    dernier_id = 0
+    for pk, code in CodeQuitus.objects.values_list('pk', 'code').iterator(chunk_size=10000):
+        dernier_id = max(dernier_id, pk)
+        if code.isdigit():
+            n = int(code)
+            bitmap[n >> 3] |= 1 << (n & 7)
+    return dernier_id, bytes(bitmap)
+
+
+def _bitmap():
+    global _local
+
+    version = _version()
+    local = _local
+    if local is not None and local[0] == version and time.monotonic() - local[1] < settings.QUITUS_FILTRE_TTL:
+        return local[3]
+
+    with _verrou:
+        local = _local
+        if local is None or local[0] != version or time.monotonic() - local[1] >= settings.QUITUS_FILTRE_TTL:
+            cle = BITMAP_KEY.format(version=version)
+            contenu = cache.get(cle)
+            if contenu is None:
+                contenu = _construire()
+                cache.set(cle, contenu, timeout=settings.QUITUS_FILTRE_TTL)
+            local = (version, time.monotonic(), *contenu)
+            _local = local
+    return local[3]
+
+
+def _controle_du():
+    return time.monotonic() - _controle >= settings.QUITUS_FILTRE_CONTROLE
+
+
+def _codes_crees_depuis():
+    """
+    Des codes ont été créés après la construction de la copie locale sans
+    que l'invalidation nous parvienne : filtre invalidé, True.
+    """
+    from .models import CodeQuitus
+
+    global _controle
+    local = _local
+    if local is None or not _controle_du():
+        return False
+    _controle = time.monotonic()
+    if (CodeQuitus.objects.aggregate(dernier=Max('pk'))['dernier'] or 0) <= local[2]:
+        return False
+    invalider_filtre()
+    return True
+
+
+def code_existe_peut_etre(code):
+    """
+    False : le code n'existe certainement pas (aucune requête SQL).
+    True  : le code existe (à confirmer en base pour son statut).
+    """
+    if not _format_valide(code):
+        return False
+    if _present(_bitmap(), code):
+        return True
+    return _codes_crees_depuis() and _present(_bitmap(), code)
+
+
+async def acode_existe_peut_etre(code):
+    """
+    code_existe_peut_etre pour les vues asynchrones : la copie locale à jour
+    est lue sans quitter la boucle, seul un rechargement passe par un thread.
+    """
+    if not _format_valide(code):
+        return False
+    local = _local
+    if local is not None and local[0] == await cache.aget(VERSION_KEY) \
+            and time.monotonic() - local[1] < settings.QUITUS_FILTRE_TTL \
+            and (_present(local[3], code) or not _controle_du()):
+        return _present(local[3], code)
+    return await sync_to_async(code_existe_peut_etre)(code)
+
+
+def _format_valide(code):
+    return bool(code) and len(code) == 6 and code.isdigit()
+
+
+def _present(bitmap, code):
+    n = int(code)
+    return bool(bitmap[n >> 3] & (1 << (n & 7)))
@@ -0,0 +1,38 @@
+# authentication/keyspace.py
+"""
+Permutation de l'espace des codes quitus (000000 → 999999).
+
+Un réseau de Feistel équilibré sur 1000 × 1000 transforme un index
+séquentiel (0, 1, 2, ...) en un code à 6 chiffres :
+- chaque index donne un code différent (bijection), donc un curseur
+  persistant suffit pour ne jamais produire deux fois le même code ;
+- la fonction de tour est un HMAC-SHA256 sur une clé secrète, donc la
+  suite des codes n'est pas devinable depuis l'extérieur.
+
+Le coût d'une allocation reste constant quel que soit le remplissage,
+contrairement au tirage aléatoire avec rejet (≈ 1/(1 - taux) essais).
+"""
+import hashlib
+import hmac
+
+MOITIE = 1000
+TAILLE_ESPACE = MOITIE * MOITIE
+NOMBRE_TOURS = 4
+
+
+def _tour(cle, numero, valeur):
+    empreinte = hmac.new(cle, f'{numero}:{valeur}'.encode(), hashlib.sha256).digest()
+    return int.from_bytes(empreinte[:8], 'big') % MOITIE
+
+
+def permuter(index, cle):
+    """Index séquentiel (0 ≤ index < 10^6) -> code à 6 chiffres"""
+    if not 0 <= index < TAILLE_ESPACE:
+        raise ValueError(f'Index hors de l\'espace des codes : {index}')
+    if isinstance(cle, str):
+        cle = cle.encode()
+
+    gauche, droite = divmod(index, MOITIE)
+    for numero in range(NOMBRE_TOURS):
+        gauche, droite = droite, (gauche + _tour(cle, numero, droite)) % MOITIE
+    return f'{gauche * MOITIE + droite:06d}'
@@ -0,0 +1,78 @@
+import random
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from authentication.models import CodeQuitus
+
+
+class Command(BaseCommand):
+    help = 'Test de charge de /api/auth/verify-quitus/ (requêtes/seconde, statuts, requêtes SQL)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requetes',
+            type=int,
+            default=2000,
+            help='Nombre de requêtes à envoyer (défaut: 2000)'
+        )
+        parser.add_argument(
+            '--taux-existants',
+            type=float,
+            default=0.1,
+            help='Part des requêtes portant sur un code existant (défaut: 0.1)'
+        )
+        parser.add_argument(
+            '--ips',
+            type=int,
+            default=1000,
+            help='Nombre d\'adresses IP simulées (1 = une seule IP, pour voir la limitation)'
+        )
+
+    def handle(self, *args, **options):
+        nombre = options['requetes']
+        if nombre <= 0 or options['ips'] <= 0:
+            raise CommandError('--requetes et --ips doivent être supérieurs à 0')
+
+        existants = list(CodeQuitus.objects.values_list('code', flat=True)[:5000])
+        if not existants and options['taux_existants'] > 0:
+            self.stdout.write(self.style.WARNING('⚠️  Aucun code en base : toutes les requêtes seront des échecs'))
+
+        aleatoire = random.Random(42)
+        codes = [
+            aleatoire.choice(existants) if existants and aleatoire.random() < options['taux_existants']
+            else f'{aleatoire.randrange(10 ** 6):06d}'
+            for _ in range(nombre)
+        ]
+        ips = [f'10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}' for i in range(options['ips'])]
+
+        client = Client(HTTP_HOST='localhost')
+        statuts = Counter()
+
+        self.stdout.write(f'🔄 {nombre} requêtes verify-quitus depuis {len(ips)} IP(s)...')
+
+        # Premier appel hors mesure : chargement du filtre
+        client.post('/api/auth/verify-quitus/', {'code_quitus': '000000'}, REMOTE_ADDR='10.255.255.255')
+
+        with CaptureQueriesContext(connection) as requetes_sql:
+            debut = time.perf_counter()
+            for i, code in enumerate(codes):
+                response = client.post(
+                    '/api/auth/verify-quitus/',
+                    {'code_quitus': code},
+                    REMOTE_ADDR=ips[i % len(ips)]
+                )
+                statuts[response.status_code] += 1
+            duree = time.perf_counter() - debut
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\n✅ {nombre / duree:,.0f} requêtes/s ({duree * 1000 / nombre:.2f} ms/requête)'
+        ))
+        self.stdout.write(f'   Requêtes SQL: {len(requetes_sql)} ({len(requetes_sql) / nombre:.2f} par appel)')
+        self.stdout.write('   Statuts HTTP:')
+        for code_http, total in sorted(statuts.items()):
+            self.stdout.write(f'   • {code_http}: {total}')
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from authentication.models import CodeQuitus
+
+
+class Command(BaseCommand):
+    help = (
+        'Marque comme expirés les codes quitus non utilisés dont la date est dépassée. '
+        'À planifier (cron), par exemple : 0 * * * * python manage.py expire_quitus'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--taille-lot',
+            type=int,
+            default=5000,
+            help='Nombre de codes mis à jour par requête (défaut: 5000)'
+        )
+        parser.add_argument(
+            '--simulation',
+            action='store_true',
+            help='Affiche le nombre de codes concernés sans rien modifier'
+        )
+
+    def handle(self, *args, **options):
+        if options['taille_lot'] <= 0:
+            raise CommandError('--taille-lot doit être supérieur à 0')
+
+        if options['simulation']:
+            nombre = CodeQuitus.objects.filter(
+                utilise=False, expire=False, date_expiration__lte=timezone.now()
+            ).count()
+            self.stdout.write(self.style.WARNING(f'🔍 {nombre} code(s) seraient marqués expirés'))
+            return
+
+        nombre = CodeQuitus.expirer(taille_lot=options['taille_lot'])
+        stats = CodeQuitus.statistiques()
+
+        self.stdout.write(self.style.SUCCESS(f'✅ {nombre} code(s) marqué(s) expiré(s)'))
+        self.stdout.write(
+            f'   • Disponibles: {stats["disponibles"]}'
+            f'\n   • Utilisés: {stats["utilises"]}'
+            f'\n   • Expirés: {stats["expires"]}'
+        )
@@ -71,18 +71,30 @@ class Command(BaseCommand):
             )
             
             # Statistiques
-            total_codes = CodeQuitus.objects.count()
-            codes_utilises = CodeQuitus.objects.filter(utilise=True).count()
-            codes_disponibles = CodeQuitus.objects.filter(utilise=False).count()
+            stats = CodeQuitus.statistiques()
+            capacite = CodeQuitus.capacite()
             
             self.stdout.write(
                 self.style.SUCCESS(
                     f'\n📊 Statistiques totales:'
-                    f'\n   • Total codes: {total_codes}'
-                    f'\n   • Disponibles: {codes_disponibles}'
-                    f'\n   • Utilisés: {codes_utilises}'
+                    f'\n   • Total codes: {stats["total"]}'
+                    f'\n   • Disponibles: {stats["disponibles"]}'
+                    f'\n   • Utilisés: {stats["utilises"]}'
+                    f'\n   • Expirés: {stats["expires"]}'
                 )
             )
+            self.stdout.write(
+                f'\n🔢 Espace des codes: {capacite["restants"]:,} codes encore disponibles '
+                f'sur {capacite["total"]:,} ({capacite["taux_utilisation"]}% utilisé)'
+            )
+            if capacite['niveau'] == 'critique':
+                self.stdout.write(self.style.ERROR(
+                    '🚨 Espace des codes presque épuisé : prévoir un nouveau format de code'
+                ))
+            elif capacite['niveau'] == 'alerte':
+                self.stdout.write(self.style.WARNING(
+                    '⚠️  Espace des codes bientôt saturé'
+                ))
             
         except Exception as e:
             raise CommandError(f'Erreur lors de la génération: {str(e)}')
\ No newline at end of file
@@ -0,0 +1,79 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from authentication.releves import ReleveInvalide, importer_releve, lire_releve
+
+
+class Command(BaseCommand):
+    help = 'Importe un relevé bancaire (CSV/XLSX) et rapproche les paiements avec les codes quitus'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'fichier',
+            help='Chemin du relevé (.csv ou .xlsx)'
+        )
+        parser.add_argument(
+            '--banque',
+            default='',
+            help='Banque par défaut si la colonne est absente du relevé'
+        )
+        parser.add_argument(
+            '--agence',
+            default='',
+            help='Agence par défaut si la colonne est absente du relevé'
+        )
+        parser.add_argument(
+            '--simulation',
+            action='store_true',
+            help="Produit le rapport sans rien écrire en base"
+        )
+        parser.add_argument(
+            '--rapport',
+            help='Fichier CSV où écrire le détail des anomalies'
+        )
+
+    def handle(self, *args, **options):
+        fichier = options['fichier']
+
+        self.stdout.write(f'🔄 Import du relevé {fichier}...')
+        if options['simulation']:
+            self.stdout.write(self.style.WARNING('   Mode simulation : aucune écriture en base'))
+
+        debut = time.perf_counter()
+        try:
+            with open(fichier, 'rb') as flux:
+                rapport = importer_releve(
+                    lire_releve(flux, fichier),
+                    banque=options['banque'],
+                    agence=options['agence'],
+                    simulation=options['simulation'],
+                )
+        except FileNotFoundError:
+            raise CommandError(f'Fichier introuvable : {fichier}')
+        except ReleveInvalide as e:
+            raise CommandError(f'Relevé invalide : {e}')
+        duree = time.perf_counter() - debut
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\n✅ {rapport.importees} transaction(s) rapprochée(s) sur {rapport.total} ligne(s) '
+            f'en {duree:.1f}s'
+        ))
+        self.stdout.write(f'   Montant total: {rapport.montant_total:,.0f} FCFA')
+
+        if rapport.anomalies:
+            self.stdout.write(self.style.WARNING(f'\n⚠️  {len(rapport.anomalies)} anomalie(s):'))
+            for motif, nombre in sorted(rapport.par_motif().items()):
+                self.stdout.write(f'   • {motif}: {nombre}')
+
+            if options['rapport']:
+                with open(options['rapport'], 'w', newline='', encoding='utf-8-sig') as sortie:
+                    rapport.ecrire_csv(sortie)
+                self.stdout.write(f"\n📄 Détail écrit dans {options['rapport']}")
+            else:
+                for anomalie in rapport.anomalies[:10]:
+                    self.stdout.write(
+                        f"   ligne {anomalie['ligne']}: {anomalie['reference'] or '-'} / "
+                        f"{anomalie['recu'] or '-'} → {anomalie['motif']}"
+                    )
+                if len(rapport.anomalies) > 10:
+                    self.stdout.write('   ... (utilisez --rapport pour le détail complet)')
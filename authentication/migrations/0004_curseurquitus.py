@@ -0,0 +1,29 @@
+# Generated by Django 5.1.4 on 2026-10-19 17:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0003_user_created_by_user_nom_user_prenom_alter_user_role_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CurseurQuitus',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cle', models.CharField(max_length=64, verbose_name='Clé de permutation')),
+                ('position', models.PositiveIntegerField(default=0, verbose_name='Position')),
+                ('codes_herites', models.PositiveIntegerField(default=0, help_text='Codes existants à la création du curseur')),
+                ('codes_ignores', models.PositiveIntegerField(default=0, help_text='Codes hérités rencontrés dans la permutation et sautés')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Curseur Quitus',
+                'verbose_name_plural': 'Curseur Quitus',
+                'db_table': 'curseur_quitus',
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.4 on 2026-10-19 18:01
+
+from django.db import migrations, models
+
+
+def marquer_codes_payes(apps, schema_editor):
+    """Les codes ayant déjà une transaction saisie dans l'admin sont payés"""
+    CodeQuitus = apps.get_model('authentication', 'CodeQuitus')
+    CodeQuitus.objects.filter(transaction__isnull=False).update(paye=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0004_curseurquitus'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='codequitus',
+            name='paye',
+            field=models.BooleanField(default=False, help_text='Paiement rapproché avec un relevé bancaire', verbose_name='Payé'),
+        ),
+        migrations.RunPython(marquer_codes_payes, migrations.RunPython.noop),
+    ]
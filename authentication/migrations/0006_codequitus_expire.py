@@ -0,0 +1,22 @@
+# Generated by Django 5.1.4 on 2026-10-19 18:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0005_codequitus_paye'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='codequitus',
+            name='expire',
+            field=models.BooleanField(default=False, help_text='Positionné par la commande expire_quitus', verbose_name='Expiré'),
+        ),
+        migrations.AddIndex(
+            model_name='codequitus',
+            index=models.Index(fields=['utilise', 'expire', 'date_expiration'], name='codes_quitus_dispo_idx'),
+        ),
+    ]
@@ -1,10 +1,31 @@
 # authentication/models.py
+from django.conf import settings
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
-from django.db import models
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models import Count, Q
 from django.utils import timezone
+import enum
+import logging
 import secrets
 
+from .filtre_quitus import invalider_filtre
+from .keyspace import TAILLE_ESPACE, permuter
+
+logger = logging.getLogger(__name__)
+
 class UserManager(BaseUserManager):
+    # Relations lues par UserSerializer (profil candidat/responsable, créateur)
+    RELATIONS_PROFIL = ('candidat', 'created_by', 'responsable_filiere_profile__filiere')
+
+    def avec_profil(self):
+        """Utilisateurs avec leur profil chargé dans la même requête"""
+        return self.select_related(*self.RELATIONS_PROFIL)
+
+    def get_by_natural_key(self, username):
+        # Appelé par authenticate() : le profil est chargé dès la connexion
+        return self.avec_profil().get(**{self.model.USERNAME_FIELD: username})
+
     def create_user(self, email, password=None, **extra_fields):
         if not email:
             raise ValueError('L\'email est obligatoire')
@@ -115,6 +136,18 @@ class ResponsableFiliere(models.Model):
         return f"{self.user.get_full_name()} - {self.filiere}"
 
 
+class ResultatClaim(enum.Enum):
+    """Résultat de CodeQuitus.claim()"""
+    CLAIMED = 'claimed'
+    NOT_FOUND = 'not_found'
+    ALREADY_USED = 'already_used'
+    EXPIRED = 'expired'
+
+    @property
+    def ok(self):
+        return self is ResultatClaim.CLAIMED
+
+
 class CodeQuitus(models.Model):
     """Codes générés pour la banque - permettent l'inscription"""
     code = models.CharField(max_length=6, unique=True, db_index=True, verbose_name='Code Quitus')
@@ -122,6 +155,12 @@ class CodeQuitus(models.Model):
     date_generation = models.DateTimeField(auto_now_add=True, verbose_name='Date de génération')
     date_expiration = models.DateTimeField(verbose_name='Date d\'expiration')
     utilise = models.BooleanField(default=False, verbose_name='Utilisé')
+    paye = models.BooleanField(default=False, verbose_name='Payé', help_text="Paiement rapproché avec un relevé bancaire")
+    expire = models.BooleanField(
+        default=False,
+        verbose_name='Expiré',
+        help_text="Positionné par la commande expire_quitus"
+    )
     utilisateur = models.ForeignKey(
         User, 
         null=True, 
@@ -141,36 +180,173 @@ class CodeQuitus(models.Model):
         indexes = [
             models.Index(fields=['code', 'utilise']),
             models.Index(fields=['date_expiration']),
+            # Codes disponibles : utilise=False, expire=False, date_expiration > now
+            models.Index(fields=['utilise', 'expire', 'date_expiration'], name='codes_quitus_dispo_idx'),
         ]
     
+    STATS_CACHE_KEY = 'quitus:statistiques'
+    
     def __str__(self):
-        status = 'Utilisé' if self.utilise else 'Disponible'
+        status = 'Utilisé' if self.utilise else 'Expiré' if self.expire else 'Disponible'
         return f"{self.code} - {status}"
     
+    # 6 chiffres : 10^6 codes possibles au total
+    TAILLE_ESPACE = TAILLE_ESPACE
+    TAILLE_LOT_INSERTION = 1000
+
+    @classmethod
+    def disponibles(cls):
+        """Codes attribuables (servi par l'index codes_quitus_dispo_idx)"""
+        return cls.objects.filter(utilise=False, expire=False, date_expiration__gt=timezone.now())
+
+    @classmethod
+    def statistiques(cls):
+        """
+        Compteurs globaux en une seule requête agrégée, mis en cache
+        QUITUS_STATS_TTL secondes (invalidés par génération, attribution
+        et expiration des codes).
+        """
+        stats = cache.get(cls.STATS_CACHE_KEY)
+        if stats is None:
+            maintenant = timezone.now()
+            non_utilise = Q(utilise=False)
+            expire = Q(expire=True) | Q(date_expiration__lte=maintenant)
+            stats = cls.objects.aggregate(
+                total=Count('id'),
+                utilises=Count('id', filter=Q(utilise=True)),
+                disponibles=Count('id', filter=non_utilise & Q(expire=False, date_expiration__gt=maintenant)),
+                expires=Count('id', filter=non_utilise & expire),
+            )
+            cache.set(cls.STATS_CACHE_KEY, stats, timeout=settings.QUITUS_STATS_TTL)
+        return stats
+
+    @classmethod
+    def invalider_statistiques(cls):
+        cache.delete(cls.STATS_CACHE_KEY)
+
+    @classmethod
+    def expirer(cls, taille_lot=5000):
+        """
+        Passe à expire=True les codes non utilisés dont la date est dépassée.
+        Mise à jour par lots de clés primaires pour limiter la durée des verrous.
+        Retourne le nombre de codes expirés.
+        """
+        a_expirer = cls.objects.filter(utilise=False, expire=False, date_expiration__lte=timezone.now())
+        total = 0
+        while True:
+            ids = list(a_expirer.order_by().values_list('pk', flat=True)[:taille_lot])
+            if not ids:
+                break
+            total += cls.objects.filter(pk__in=ids, utilise=False).update(expire=True)
+        if total:
+            cls.invalider_statistiques()
+        return total
+
+    @classmethod
+    def capacite(cls):
+        """
+        Occupation de l'espace des codes :
+        total, attribués, restants, taux d'utilisation (%) et niveau
+        d'alerte ('ok', 'alerte', 'critique') selon QUITUS_SEUIL_ALERTE /
+        QUITUS_SEUIL_CRITIQUE.
+        """
+        attribues = cls.objects.count()
+        curseur = CurseurQuitus.objects.filter(pk=CurseurQuitus.PK_UNIQUE).first()
+        restants = curseur.restants() if curseur else cls.TAILLE_ESPACE - attribues
+        taux = round((cls.TAILLE_ESPACE - restants) * 100 / cls.TAILLE_ESPACE, 2)
+
+        if taux >= settings.QUITUS_SEUIL_CRITIQUE:
+            niveau = 'critique'
+        elif taux >= settings.QUITUS_SEUIL_ALERTE:
+            niveau = 'alerte'
+        else:
+            niveau = 'ok'
+
+        return {
+            'total': cls.TAILLE_ESPACE,
+            'attribues': attribues,
+            'restants': restants,
+            'taux_utilisation': taux,
+            'niveau': niveau,
+            'position_curseur': curseur.position if curseur else 0,
+        }
+
     @classmethod
     def generer_batch(cls, nombre=100, montant=50000, validite_jours=90):
-        """Générer un lot de codes pour la banque"""
-        codes = []
-        date_expiration = timezone.now() + timezone.timedelta(days=validite_jours)
-        
-        for _ in range(nombre):
-            code = ''.join([str(secrets.randbelow(10)) for _ in range(6)])
-            
-            while cls.objects.filter(code=code).exists():
-                code = ''.join([str(secrets.randbelow(10)) for _ in range(6)])
-            
-            ref_bancaire = f"REF{timezone.now().strftime('%Y%m%d')}{secrets.token_hex(4).upper()}"
-            
-            codes.append(cls(
-                code=code,
-                montant=montant,
-                date_expiration=date_expiration,
-                reference_bancaire=ref_bancaire
-            ))
-        
-        cls.objects.bulk_create(codes)
+        """
+        Générer un lot de codes pour la banque.
+
+        Les codes sont pris à la suite dans la permutation de l'espace
+        (voir CurseurQuitus / keyspace.py) : coût constant par code, sans
+        tirage aléatoire ni vérification code par code. Le lot est inséré
+        par paquets de TAILLE_LOT_INSERTION.
+        """
+        maintenant = timezone.now()
+        date_expiration = maintenant + timezone.timedelta(days=validite_jours)
+        prefixe = f"REF{maintenant.strftime('%Y%m%d')}"
+
+        with transaction.atomic():
+            curseur = CurseurQuitus.verrouiller()
+            valeurs = curseur.allouer(nombre)
+
+            references = set(
+                cls.objects.filter(reference_bancaire__startswith=prefixe)
+                .values_list('reference_bancaire', flat=True)
+            )
+
+            codes = []
+            for code in valeurs:
+                ref_bancaire = f"{prefixe}{secrets.token_hex(4).upper()}"
+                while ref_bancaire in references:
+                    ref_bancaire = f"{prefixe}{secrets.token_hex(4).upper()}"
+                references.add(ref_bancaire)
+
+                codes.append(cls(
+                    code=code,
+                    montant=montant,
+                    date_expiration=date_expiration,
+                    reference_bancaire=ref_bancaire
+                ))
+
+            cls.objects.bulk_create(codes, batch_size=cls.TAILLE_LOT_INSERTION)
+            # Les nouveaux codes doivent être visibles du filtre de verify_quitus
+            transaction.on_commit(invalider_filtre)
+            transaction.on_commit(cls.invalider_statistiques)
+
+        capacite = cls.capacite()
+        if capacite['niveau'] != 'ok':
+            logger.warning(
+                "Espace des codes quitus utilisé à %s%% (%s codes restants)",
+                capacite['taux_utilisation'], capacite['restants']
+            )
         return codes
     
+    @classmethod
+    def claim(cls, code, utilisateur):
+        """
+        Attribue atomiquement un code à un utilisateur.
+
+        Un seul UPDATE conditionnel (utilise=False et non expiré) : parmi des
+        inscriptions concurrentes sur le même code, une seule obtient
+        CLAIMED, les autres ALREADY_USED. À appeler dans la transaction
+        de l'inscription pour que l'attribution soit annulée avec elle.
+        """
+        maintenant = timezone.now()
+        modifies = cls.objects.filter(
+            code=code, utilise=False, expire=False, date_expiration__gt=maintenant
+        ).update(utilise=True, utilisateur=utilisateur, date_utilisation=maintenant)
+        if modifies:
+            transaction.on_commit(cls.invalider_statistiques)
+            return ResultatClaim.CLAIMED
+
+        # Échec : une lecture pour en donner la raison
+        etat = cls.objects.filter(code=code).values_list('utilise', flat=True).first()
+        if etat is None:
+            return ResultatClaim.NOT_FOUND
+        if etat:
+            return ResultatClaim.ALREADY_USED
+        return ResultatClaim.EXPIRED
+    
     def marquer_utilise(self, utilisateur):
         """Marquer le code comme utilisé par un utilisateur"""
         self.utilise = True
@@ -180,7 +356,90 @@ class CodeQuitus(models.Model):
     
     def est_valide(self):
         """Vérifier si le code est encore valide"""
-        return not self.utilise and self.date_expiration > timezone.now()
+        return not self.utilise and not self.expire and self.date_expiration > timezone.now()
+
+
+class CurseurQuitus(models.Model):
+    """
+    Curseur persistant de l'allocateur de codes quitus (une seule ligne).
+
+    `position` est le prochain index de la permutation (keyspace.permuter).
+    Les codes créés avant l'allocateur (`codes_herites`) peuvent tomber
+    sur la permutation : ils sont détectés par paquet et sautés.
+    """
+    PK_UNIQUE = 1
+
+    cle = models.CharField(max_length=64, verbose_name='Clé de permutation')
+    position = models.PositiveIntegerField(default=0, verbose_name='Position')
+    codes_herites = models.PositiveIntegerField(
+        default=0,
+        help_text="Codes existants à la création du curseur"
+    )
+    codes_ignores = models.PositiveIntegerField(
+        default=0,
+        help_text="Codes hérités rencontrés dans la permutation et sautés"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'curseur_quitus'
+        verbose_name = 'Curseur Quitus'
+        verbose_name_plural = 'Curseur Quitus'
+
+    def __str__(self):
+        return f"Curseur quitus @ {self.position}"
+
+    @classmethod
+    def verrouiller(cls):
+        """Curseur verrouillé (SELECT ... FOR UPDATE), créé au besoin. Dans une transaction."""
+        curseur = cls.objects.select_for_update().filter(pk=cls.PK_UNIQUE).first()
+        if curseur is None:
+            cls.objects.get_or_create(
+                pk=cls.PK_UNIQUE,
+                defaults={
+                    'cle': secrets.token_hex(32),
+                    'codes_herites': CodeQuitus.objects.count(),
+                }
+            )
+            curseur = cls.objects.select_for_update().get(pk=cls.PK_UNIQUE)
+        return curseur
+
+    def restants(self):
+        """Codes encore attribuables (hors codes hérités pas encore atteints)"""
+        return TAILLE_ESPACE - self.position - (self.codes_herites - self.codes_ignores)
+
+    def allouer(self, nombre):
+        """Réserve `nombre` codes et avance le curseur (appeler après verrouiller())"""
+        restants = self.restants()
+        if nombre > restants:
+            raise ValueError(
+                f'Espace des codes insuffisant : {nombre} demandés, {restants} disponibles'
+            )
+
+        alloues = []
+        while len(alloues) < nombre and self.position < TAILLE_ESPACE:
+            fin = min(
+                TAILLE_ESPACE,
+                self.position + min(nombre - len(alloues), CodeQuitus.TAILLE_LOT_INSERTION)
+            )
+            candidats = [permuter(index, self.cle) for index in range(self.position, fin)]
+
+            # Tant qu'il reste des codes hérités non rencontrés, une requête par paquet
+            herites = set()
+            if self.codes_ignores < self.codes_herites:
+                herites = set(
+                    CodeQuitus.objects.filter(code__in=candidats).values_list('code', flat=True)
+                )
+                self.codes_ignores += len(herites)
+
+            alloues.extend(code for code in candidats if code not in herites)
+            self.position = fin
+
+        if len(alloues) < nombre:
+            raise ValueError("Espace des codes quitus épuisé")
+
+        self.save(update_fields=['position', 'codes_ignores', 'updated_at'])
+        return alloues
 
 
 class TransactionBancaire(models.Model):
@@ -0,0 +1,277 @@
+# authentication/releves.py
+"""
+Import des relevés bancaires (CSV / XLSX) et rapprochement avec les codes quitus.
+
+- lecture en flux (csv / openpyxl en read_only), ligne par ligne ;
+- rapprochement par `reference_bancaire` via un index en mémoire chargé
+  une seule fois ;
+- insertion des transactions par bulk_create (paquets) ;
+- marquage "payé" des codes rapprochés en une seule requête UPDATE ;
+- rapport des lignes non rapprochées, doublons et erreurs.
+"""
+import csv
+import io
+import unicodedata
+import zipfile
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+
+from .models import CodeQuitus, TransactionBancaire
+
+TAILLE_PAQUET = 1000
+
+# Colonnes attendues -> variantes acceptées dans l'en-tête du relevé
+COLONNES = {
+    'reference_bancaire': ('reference_bancaire', 'reference', 'ref', 'ref_bancaire'),
+    'numero_recu': ('numero_recu', 'recu', 'num_recu', 'no_recu', 'n_recu', 'numero_operation'),
+    'nom_payeur': ('nom_payeur', 'payeur', 'nom', 'donneur_ordre'),
+    'montant': ('montant', 'montant_paye', 'credit'),
+    'date_paiement': ('date_paiement', 'date', 'date_operation', 'date_valeur'),
+    'banque': ('banque',),
+    'agence': ('agence',),
+}
+OBLIGATOIRES = ('reference_bancaire', 'numero_recu', 'montant', 'date_paiement')
+
+FORMATS_DATE = ('%d/%m/%Y', '%d/%m/%Y %H:%M', '%d/%m/%Y %H:%M:%S', '%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%d-%m-%Y')
+
+
+class ReleveInvalide(ValueError):
+    """Fichier illisible ou colonnes obligatoires absentes"""
+
+
+@dataclass
+class RapportImport:
+    """Résultat du rapprochement"""
+    total: int = 0
+    importees: int = 0
+    montant_total: Decimal = Decimal('0')
+    anomalies: list = field(default_factory=list)  # [{'ligne', 'reference', 'recu', 'motif'}]
+
+    def signaler(self, ligne, reference, recu, motif):
+        self.anomalies.append({'ligne': ligne, 'reference': reference, 'recu': recu, 'motif': motif})
+
+    def par_motif(self):
+        compteur = {}
+        for anomalie in self.anomalies:
+            compteur[anomalie['motif']] = compteur.get(anomalie['motif'], 0) + 1
+        return compteur
+
+    def ecrire_csv(self, sortie):
+        writer = csv.DictWriter(sortie, fieldnames=['ligne', 'reference', 'recu', 'motif'], delimiter=';')
+        writer.writeheader()
+        writer.writerows(self.anomalies)
+
+
+# ============================================
+# LECTURE DU FICHIER
+# ============================================
+
+def _normaliser_entete(valeur):
+    valeur = unicodedata.normalize('NFKD', str(valeur or '')).encode('ascii', 'ignore').decode()
+    return '_'.join(valeur.strip().lower().replace('.', ' ').split())
+
+
+def _correspondance_colonnes(entete):
+    """En-tête du fichier -> {colonne attendue: position}"""
+    normalise = [_normaliser_entete(v) for v in entete]
+    positions = {}
+    for colonne, variantes in COLONNES.items():
+        for variante in variantes:
+            if variante in normalise:
+                positions[colonne] = normalise.index(variante)
+                break
+    manquantes = [c for c in OBLIGATOIRES if c not in positions]
+    if manquantes:
+        raise ReleveInvalide(f"Colonnes obligatoires absentes : {', '.join(manquantes)}")
+    return positions
+
+
+def _lignes_csv(fichier):
+    texte = io.TextIOWrapper(fichier, encoding='utf-8-sig', newline='')
+    try:
+        debut = texte.readline()
+        delimiteur = ';' if debut.count(';') >= debut.count(',') else ','
+        yield next(csv.reader([debut], delimiter=delimiteur))
+        yield from csv.reader(texte, delimiter=delimiteur)
+    except UnicodeDecodeError:
+        raise ReleveInvalide('Encodage non reconnu (UTF-8 attendu)')
+    except csv.Error as e:
+        raise ReleveInvalide(f'CSV illisible : {e}')
+
+
+def _lignes_xlsx(fichier):
+    from openpyxl import load_workbook
+    from openpyxl.utils.exceptions import InvalidFileException
+
+    # Un classeur en lecture seule est décompressé au fil de la lecture :
+    # les erreurs d'archive peuvent survenir à n'importe quelle ligne
+    try:
+        classeur = load_workbook(fichier, read_only=True, data_only=True)
+        try:
+            yield from classeur.active.iter_rows(values_only=True)
+        finally:
+            classeur.close()
+    except (InvalidFileException, zipfile.BadZipFile, KeyError) as e:
+        raise ReleveInvalide(f'Classeur XLSX illisible : {e}')
+
+
+def lire_releve(fichier, nom):
+    """
+    Itère sur les lignes du relevé : (numéro de ligne, dict des colonnes).
+    `fichier` est un flux binaire ; le format est déduit de l'extension de `nom`.
+    """
+    lignes = _lignes_xlsx(fichier) if nom.lower().endswith('.xlsx') else _lignes_csv(fichier)
+    try:
+        entete = next(lignes)
+    except StopIteration:
+        raise ReleveInvalide('Relevé vide')
+    positions = _correspondance_colonnes(entete)
+
+    for numero, valeurs in enumerate(lignes, start=2):
+        if not valeurs or all(v in (None, '') for v in valeurs):
+            continue
+        yield numero, {
+            colonne: valeurs[position] if position < len(valeurs) else None
+            for colonne, position in positions.items()
+        }
+
+
+# ============================================
+# CONVERSIONS
+# ============================================
+
+def _texte(valeur):
+    return str(valeur).strip() if valeur is not None else ''
+
+
+def _montant(valeur):
+    if isinstance(valeur, (int, float, Decimal)):
+        return Decimal(str(valeur))
+    texte = _texte(valeur).replace('\xa0', '').replace(' ', '').replace(',', '.')
+    try:
+        return Decimal(texte)
+    except InvalidOperation:
+        raise ValueError(f'Montant illisible : {texte}')
+
+
+def _date(valeur):
+    if isinstance(valeur, datetime):
+        return valeur
+    if isinstance(valeur, date):
+        return datetime.combine(valeur, datetime.min.time())
+    texte = _texte(valeur)
+    for format_date in FORMATS_DATE:
+        try:
+            return datetime.strptime(texte, format_date)
+        except ValueError:
+            continue
+    raise ValueError(f'Date illisible : {texte}')
+
+
+# ============================================
+# RAPPROCHEMENT
+# ============================================
+
+def _index_codes():
+    """reference_bancaire -> (id, payé) pour tous les codes (une requête)"""
+    return {
+        reference: (code_id, paye)
+        for reference, code_id, paye in CodeQuitus.objects.values_list('reference_bancaire', 'id', 'paye')
+    }
+
+
+def _inserer(paquet, rapport):
+    """Insère un paquet en écartant les reçus déjà présents en base"""
+    existants = set(
+        TransactionBancaire.objects.filter(numero_recu__in=[t.numero_recu for t, _, _ in paquet])
+        .values_list('numero_recu', flat=True)
+    )
+    a_creer = []
+    for transaction_bancaire, numero_ligne, reference in paquet:
+        if transaction_bancaire.numero_recu in existants:
+            rapport.signaler(numero_ligne, reference, transaction_bancaire.numero_recu, 'Reçu déjà importé')
+            continue
+        a_creer.append(transaction_bancaire)
+
+    TransactionBancaire.objects.bulk_create(a_creer, batch_size=TAILLE_PAQUET)
+    rapport.importees += len(a_creer)
+    rapport.montant_total += sum((t.montant_paye for t in a_creer), Decimal('0'))
+    return [t.code_quitus_id for t in a_creer]
+
+
+def importer_releve(lignes, banque='', agence='', simulation=False):
+    """
+    Rapproche les lignes d'un relevé (voir lire_releve) avec les codes quitus.
+
+    En simulation, rien n'est écrit : seul le rapport est produit (les reçus
+    déjà présents en base ne sont alors pas détectés).
+    """
+    rapport = RapportImport()
+    index = _index_codes()
+    recus_vus = set()
+    codes_vus = set()
+    codes_payes = []
+    paquet = []
+
+    with transaction.atomic():
+        for numero, ligne in lignes:
+            rapport.total += 1
+            reference = _texte(ligne['reference_bancaire']).upper()
+            recu = _texte(ligne['numero_recu'])
+
+            if not reference or not recu:
+                rapport.signaler(numero, reference, recu, 'Référence ou reçu manquant')
+                continue
+            if recu in recus_vus:
+                rapport.signaler(numero, reference, recu, 'Reçu en double dans le relevé')
+                continue
+            recus_vus.add(recu)
+
+            code = index.get(reference)
+            if code is None:
+                rapport.signaler(numero, reference, recu, 'Référence inconnue')
+                continue
+            code_id, deja_paye = code
+            if deja_paye or code_id in codes_vus:
+                rapport.signaler(numero, reference, recu, 'Code déjà payé')
+                continue
+
+            try:
+                montant = _montant(ligne['montant'])
+                date_paiement = _date(ligne['date_paiement'])
+            except ValueError as e:
+                rapport.signaler(numero, reference, recu, f'Ligne invalide : {e}')
+                continue
+
+            codes_vus.add(code_id)
+            if simulation:
+                rapport.importees += 1
+                rapport.montant_total += montant
+                continue
+
+            paquet.append((TransactionBancaire(
+                code_quitus_id=code_id,
+                nom_payeur=_texte(ligne.get('nom_payeur'))[:200],
+                montant_paye=montant,
+                date_paiement=date_paiement,
+                banque=(_texte(ligne.get('banque')) or banque)[:100],
+                agence=(_texte(ligne.get('agence')) or agence)[:100],
+                numero_recu=recu[:50],
+                notes='Import relevé bancaire',
+            ), numero, reference))
+
+            if len(paquet) >= TAILLE_PAQUET:
+                codes_payes += _inserer(paquet, rapport)
+                paquet = []
+
+        if paquet:
+            codes_payes += _inserer(paquet, rapport)
+
+        if codes_payes:
+            # Une seule requête pour tous les codes rapprochés
+            CodeQuitus.objects.filter(id__in=codes_payes).update(paye=True)
+
+    return rapport
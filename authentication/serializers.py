@@ -4,7 +4,7 @@ from django.contrib.auth import authenticate, get_user_model
 from django.utils import timezone
 from configurations.models import Filiere
 from django.db import transaction
-from .models import CodeQuitus, ResponsableFiliere, UserActionLog
+from .models import CodeQuitus, ResponsableFiliere, ResultatClaim, UserActionLog
 from candidats.models import Candidat
 
 User = get_user_model()
@@ -31,23 +31,17 @@ class LoginSerializer(serializers.Serializer):
             return data
         
         # Candidats : code quitus optionnel pour la connexion
-        if user.role == 'candidat':
-            try:
-                candidat = Candidat.objects.get(user=user)
-            except Candidat.DoesNotExist:
-                pass
-            
-            if code_quitus:
-                try:
-                    quitus = CodeQuitus.objects.get(utilisateur=user)
-                    if quitus.code != code_quitus:
-                        raise serializers.ValidationError({
-                            "code_quitus": "Code quitus incorrect."
-                        })
-                except CodeQuitus.DoesNotExist:
-                    raise serializers.ValidationError({
-                        "code_quitus": "Aucun quitus associé à ce compte."
-                    })
+        if user.role == 'candidat' and code_quitus:
+            codes = CodeQuitus.objects.filter(utilisateur=user).values_list('code', flat=True)
+            codes = list(codes)
+            if not codes:
+                raise serializers.ValidationError({
+                    "code_quitus": "Aucun quitus associé à ce compte."
+                })
+            if code_quitus not in codes:
+                raise serializers.ValidationError({
+                    "code_quitus": "Code quitus incorrect."
+                })
         
         data['user'] = user
         return data
@@ -110,6 +104,11 @@ class CreateResponsableFiliereSerializer(serializers.Serializer):
         
         return user
 class UserSerializer(serializers.ModelSerializer):
+    """
+    Les champs calculés lisent candidat, responsable_filiere_profile et
+    created_by : passer le queryset par optimiser_queryset() pour
+    sérialiser N utilisateurs en une seule requête.
+    """
     full_name = serializers.SerializerMethodField()  # ← AJOUTE ÇA
     candidat = serializers.SerializerMethodField()
     responsable_filiere = serializers.SerializerMethodField()
@@ -125,6 +124,10 @@ class UserSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'created_at', 'created_by']
     
+    @staticmethod
+    def optimiser_queryset(queryset):
+        return queryset.select_related(*User.objects.RELATIONS_PROFIL)
+    
     def get_full_name(self, obj):  # ← AJOUTE ÇA
         return f"{obj.prenom or ''} {obj.nom or ''}".strip() or obj.email
     def get_candidat(self, obj):
@@ -154,6 +157,13 @@ class UserSerializer(serializers.ModelSerializer):
         return None
 
 
+MESSAGES_CLAIM = {
+    ResultatClaim.NOT_FOUND: "Code quitus invalide.",
+    ResultatClaim.ALREADY_USED: "Code quitus déjà utilisé.",
+    ResultatClaim.EXPIRED: "Code quitus expiré.",
+}
+
+
 class RegisterSerializer(serializers.Serializer):
     """Inscription d'un nouveau candidat - VALIDATION STRICTE"""
     email = serializers.EmailField()
@@ -194,8 +204,6 @@ class RegisterSerializer(serializers.Serializer):
                     f"Code quitus expiré le {quitus.date_expiration.date()}."
                 )
             
-            self.context['code_quitus_obj'] = quitus
-            
         except CodeQuitus.DoesNotExist:
             raise serializers.ValidationError(f"Le code quitus '{code}' n'existe pas.")
         
@@ -207,15 +215,7 @@ class RegisterSerializer(serializers.Serializer):
         return data
 
     def create(self, validated_data):
-        code_quitus_obj = self.context.get('code_quitus_obj')
-        if not code_quitus_obj:
-            raise serializers.ValidationError("Code quitus invalide (erreur interne).")
-        
-        quitus_fresh = CodeQuitus.objects.get(code=code_quitus_obj.code)
-        if quitus_fresh.utilise:
-            raise serializers.ValidationError("Code quitus déjà utilisé.")
-        if quitus_fresh.date_expiration < timezone.now():
-            raise serializers.ValidationError("Code quitus expiré.")
+        code = validated_data['code_quitus']
         
         with transaction.atomic():
             user = User.objects.create_user(
@@ -226,6 +226,13 @@ class RegisterSerializer(serializers.Serializer):
                 role='candidat'
             )
             
+            # Attribution atomique : la validation ci-dessus peut être
+            # dépassée par une inscription concurrente sur le même code
+            resultat = CodeQuitus.claim(code, user)
+            if not resultat.ok:
+                # L'exception annule la transaction (utilisateur compris)
+                raise serializers.ValidationError({'code_quitus': [MESSAGES_CLAIM[resultat]]})
+            
             candidat = Candidat.objects.create(
                 user=user,
                 nom=validated_data['nom'],
@@ -237,8 +244,6 @@ class RegisterSerializer(serializers.Serializer):
                 email=validated_data['email'],
             )
             
-            quitus_fresh.marquer_utilise(user)
-            
             return user
 
 
@@ -1,3 +1,440 @@
-from django.test import TestCase
+import functools
+import io
+import threading
+from datetime import date, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.test import (
+    RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature,
+)
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.test import APIClient
+
+from candidats.models import Candidat
+from configurations.models import Filiere
+
+from . import filtre_quitus, keyspace
+from .keyspace import TAILLE_ESPACE
+from .models import CodeQuitus, CurseurQuitus, ResponsableFiliere, ResultatClaim, User
+from .releves import ReleveInvalide, lire_releve
+from .serializers import LoginSerializer, RegisterSerializer, UserSerializer
+from .throttles import TokenBucketThrottle
+
+
+def creer_code(code):
+    return CodeQuitus.objects.create(
+        code=code, reference_bancaire=f'REF-{code}', date_expiration=timezone.now() + timedelta(days=30)
+    )
+
+
+# ============================================
+# LIMITATION PAR IP
+# ============================================
+
+class TokenBucketThrottleTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+
+    def requete(self, ip, relais=None):
+        entetes = {'X-Forwarded-For': relais} if relais else {}
+        return self.factory.post('/api/auth/verify-quitus/', REMOTE_ADDR=ip, headers=entetes)
+
+    def test_rafale_puis_refus(self):
+        throttle = TokenBucketThrottle()
+        autorisees = [throttle.allow_request(self.requete('10.0.0.1'), None) for _ in range(TokenBucketThrottle.capacite + 1)]
+        self.assertEqual(autorisees.count(True), TokenBucketThrottle.capacite)
+        self.assertFalse(autorisees[-1])
+        self.assertIsNotNone(throttle.wait())
+
+    def test_x_forwarded_for_ignore_sans_proxy(self):
+        throttle = TokenBucketThrottle()
+        autorisees = [
+            throttle.allow_request(self.requete('10.0.0.1', f'203.0.113.{i}'), None)
+            for i in range(TokenBucketThrottle.capacite + 1)
+        ]
+        self.assertFalse(autorisees[-1])
+
+    def test_x_forwarded_for_derriere_un_proxy(self):
+        with override_settings(REST_FRAMEWORK={'NUM_PROXIES': 1}):
+            throttle = TokenBucketThrottle()
+            self.assertEqual(throttle.get_ident(self.requete('10.0.0.1', '203.0.113.7')), '203.0.113.7')
+
+
+# ============================================
+# FILTRE DES CODES QUITUS
+# ============================================
+
+class FiltreQuitusTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        filtre_quitus._local = None
+        filtre_quitus._controle = 0.0
+        creer_code('123456')
+
+    def test_code_present_et_absent(self):
+        self.assertTrue(filtre_quitus.code_existe_peut_etre('123456'))
+        self.assertFalse(filtre_quitus.code_existe_peut_etre('654321'))
+        self.assertFalse(filtre_quitus.code_existe_peut_etre('12a456'))
+
+    def test_code_cree_par_un_autre_processus(self):
+        self.assertFalse(filtre_quitus.code_existe_peut_etre('654321'))
+        # Création sans invalidation qui parvienne à ce processus (commande à part, cache LocMem)
+        creer_code('654321')
+
+        with override_settings(QUITUS_FILTRE_CONTROLE=3600):
+            self.assertFalse(filtre_quitus.code_existe_peut_etre('654321'))
+        with override_settings(QUITUS_FILTRE_CONTROLE=0):
+            self.assertTrue(filtre_quitus.code_existe_peut_etre('654321'))
+
+    async def test_version_asynchrone(self):
+        self.assertTrue(await filtre_quitus.acode_existe_peut_etre('123456'))
+        self.assertFalse(await filtre_quitus.acode_existe_peut_etre('654321'))
+
+
+# ============================================
+# RELEVÉS BANCAIRES
+# ============================================
+
+class LectureReleveTests(TestCase):
+    ENTETE = 'reference;numero_recu;montant;date\n'
+
+    def lire(self, contenu, nom='releve.csv'):
+        return list(lire_releve(io.BytesIO(contenu), nom))
+
+    def test_csv_valide(self):
+        lignes = self.lire((self.ENTETE + 'REF-1;R1;50000;01/09/2026\n').encode())
+        self.assertEqual(lignes, [(2, {
+            'reference_bancaire': 'REF-1', 'numero_recu': 'R1', 'montant': '50000', 'date_paiement': '01/09/2026',
+        })])
+
+    def test_fichiers_illisibles(self):
+        cas = {
+            'encodage': ((self.ENTETE + 'REF-1;R1;50000;01/09/2026\n').encode('utf-16'), 'releve.csv'),
+            'csv': ((self.ENTETE + 'REF-1;' + 'x' * (1 << 18) + '\n').encode(), 'releve.csv'),
+            'xlsx': (b'ceci n\'est pas une archive', 'releve.xlsx'),
+        }
+        for nom, (contenu, fichier) in cas.items():
+            with self.subTest(nom), self.assertRaises(ReleveInvalide):
+                self.lire(contenu, fichier)
+
+
+# ============================================
+# ATTRIBUTION CONCURRENTE D'UN CODE QUITUS
+# ============================================
+
+@skipUnlessDBFeature('test_db_allows_multiple_connections')  # MySQL : pas SQLite
+class ClaimConcurrentTests(TransactionTestCase):
+    """Deux inscriptions simultanées sur le même code : une seule l'obtient"""
+    databases = {'default', 'sequences'}  # l'inscription crée un Candidat (matricule)
+
+    def setUp(self):
+        cache.clear()
+        self.code = creer_code('424242').code
+
+    def en_parallele(self, *fonctions):
+        depart = threading.Barrier(len(fonctions), timeout=10)
+        resultats, erreurs = [], []
+
+        def executer(fonction):
+            try:
+                depart.wait()
+                resultats.append(fonction())
+            except Exception as e:
+                erreurs.append(e)
+            finally:
+                connection.close()
+
+        fils = [threading.Thread(target=executer, args=(fonction,)) for fonction in fonctions]
+        for fil in fils:
+            fil.start()
+        for fil in fils:
+            fil.join()
+        return resultats, erreurs
+
+    def test_claim_un_seul_succes(self):
+        users = [User.objects.create_user(f'claim{i}@example.com', 'motdepasse123') for i in range(2)]
+
+        def reclamer(user):
+            with transaction.atomic():
+                return CodeQuitus.claim(self.code, user), user
+
+        resultats, erreurs = self.en_parallele(*(lambda user=user: reclamer(user) for user in users))
+
+        self.assertEqual(erreurs, [])
+        self.assertEqual(
+            sorted(resultat.value for resultat, _ in resultats),
+            [ResultatClaim.ALREADY_USED.value, ResultatClaim.CLAIMED.value],
+        )
+        gagnant = next(user for resultat, user in resultats if resultat.ok)
+        self.assertEqual(CodeQuitus.objects.get(code=self.code).utilisateur, gagnant)
+
+    def test_inscriptions_simultanees(self):
+        inscriptions = []
+        for i in range(2):
+            serializer = RegisterSerializer(data={
+                'email': f'inscrit{i}@example.com',
+                'password': 'motdepasse123',
+                'password_confirm': 'motdepasse123',
+                'code_quitus': self.code,
+                'nom': 'NOM',
+                'prenom': f'Prenom{i}',
+                'date_naissance': date(2005, 1, 1),
+                'lieu_naissance': 'Douala',
+                'sexe': 'F',
+                'telephone': '690000000',
+            })
+            # Les deux passent la validation : le code est encore libre
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+            inscriptions.append(serializer)
+
+        resultats, erreurs = self.en_parallele(*(serializer.save for serializer in inscriptions))
+
+        self.assertEqual(len(resultats), 1)
+        self.assertEqual(len(erreurs), 1)
+        self.assertIsInstance(erreurs[0], serializers.ValidationError)
+        self.assertIn('code_quitus', erreurs[0].detail)
+        # L'inscription refusée est annulée, utilisateur compris
+        self.assertEqual(User.objects.filter(email__startswith='inscrit').count(), 1)
+        self.assertEqual(CodeQuitus.objects.get(code=self.code).utilisateur, resultats[0])
+
+
+# ============================================
+# GÉNÉRATION DES CODES QUITUS PAR LOT
+# ============================================
+
+class GenerationQuitusTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        filtre_quitus._local = None
+
+    def test_lot_sans_doublon(self):
+        codes = CodeQuitus.generer_batch(nombre=2500)
+        self.assertEqual(CodeQuitus.objects.count(), 2500)
+        self.assertEqual(len({c.code for c in codes}), 2500)
+        self.assertEqual(len({c.reference_bancaire for c in codes}), 2500)
+        self.assertTrue(all(len(c.code) == 6 and c.code.isdigit() for c in codes))
+
+    def test_lectures_independantes_de_la_taille(self):
+        # Aucune lecture par code : curseur, références du jour, capacité
+        CodeQuitus.generer_batch(nombre=1)  # crée le curseur
+        lectures = []
+        for nombre in (10, 2000):
+            with CaptureQueriesContext(connection) as requetes:
+                CodeQuitus.generer_batch(nombre=nombre)
+            lectures.append(sum(q['sql'].lstrip().upper().startswith('SELECT') for q in requetes.captured_queries))
+        self.assertEqual(lectures[0], lectures[1])
+        self.assertLessEqual(lectures[1], 5)
+
+    def test_statistiques_et_filtre_a_jour(self):
+        self.assertEqual(CodeQuitus.statistiques()['total'], 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            code = CodeQuitus.generer_batch(nombre=3)[0].code
+        self.assertEqual(CodeQuitus.statistiques()['disponibles'], 3)
+        self.assertTrue(filtre_quitus.code_existe_peut_etre(code))
+
+    def test_espace_insuffisant(self):
+        CurseurQuitus.objects.create(pk=CurseurQuitus.PK_UNIQUE, cle='cle', position=TAILLE_ESPACE - 3)
+        with self.assertRaisesMessage(ValueError, '5 demandés, 3 disponibles'):
+            CodeQuitus.generer_batch(nombre=5)
+        self.assertFalse(CodeQuitus.objects.exists())
+        self.assertEqual(CurseurQuitus.objects.get().position, TAILLE_ESPACE - 3)
+
+        self.assertEqual(len(CodeQuitus.generer_batch(nombre=3)), 3)
+        self.assertEqual(CodeQuitus.capacite()['restants'], 0)
+        self.assertEqual(CodeQuitus.capacite()['niveau'], 'critique')
+
+    def test_commande(self):
+        sortie = io.StringIO()
+        call_command('generer_quitus', 3, stdout=sortie)
+        self.assertIn('3 codes générés', sortie.getvalue())
+        self.assertEqual(CodeQuitus.objects.count(), 3)
+
+
+# ============================================
+# PERMUTATION DE L'ESPACE ET CURSEUR PERSISTANT
+# ============================================
+
+class PermutationQuitusTests(SimpleTestCase):
+
+    def test_bijection_sur_tout_l_espace(self):
+        # La fonction de tour ne prend que 4 × 1000 valeurs : mémorisée pour la durée du test
+        with mock.patch.object(keyspace, '_tour', functools.cache(keyspace._tour)):
+            codes = {keyspace.permuter(index, b'cle-de-test') for index in range(TAILLE_ESPACE)}
+        self.assertEqual(len(codes), TAILLE_ESPACE)
+        self.assertEqual(min(codes), '000000')
+        self.assertEqual(max(codes), '999999')
+
+    def test_depend_de_la_cle(self):
+        premiers = [keyspace.permuter(index, 'cle-a') for index in range(20)]
+        self.assertEqual(premiers, [keyspace.permuter(index, b'cle-a') for index in range(20)])
+        self.assertNotEqual(premiers, [keyspace.permuter(index, 'cle-b') for index in range(20)])
+
+    def test_index_hors_espace(self):
+        for index in (-1, TAILLE_ESPACE):
+            with self.assertRaises(ValueError):
+                keyspace.permuter(index, 'cle')
+
+
+class CurseurQuitusTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_curseur_persistant(self):
+        premier = [c.code for c in CodeQuitus.generer_batch(nombre=5)]
+        curseur = CurseurQuitus.objects.get()
+        self.assertEqual(curseur.position, 5)
+        self.assertEqual(premier, [keyspace.permuter(index, curseur.cle) for index in range(5)])
+
+        # Le lot suivant reprend à la position enregistrée, avec la même clé
+        second = [c.code for c in CodeQuitus.generer_batch(nombre=3)]
+        curseur.refresh_from_db()
+        self.assertEqual(curseur.position, 8)
+        self.assertEqual(second, [keyspace.permuter(index, curseur.cle) for index in range(5, 8)])
+        self.assertEqual(CodeQuitus.capacite()['restants'], TAILLE_ESPACE - 8)
+
+    def test_codes_herites_sautes(self):
+        cle = 'cle-fixe'
+        # Codes créés avant l'allocateur : l'un tombe sur la permutation, l'autre non
+        suite = [keyspace.permuter(index, cle) for index in range(10)]
+        creer_code(suite[1])
+        creer_code(next(f'{n:06d}' for n in range(TAILLE_ESPACE) if f'{n:06d}' not in suite))
+        with mock.patch('authentication.models.secrets.token_hex', return_value=cle):
+            with transaction.atomic():
+                CurseurQuitus.verrouiller()
+
+        codes = [c.code for c in CodeQuitus.generer_batch(nombre=4)]
+        self.assertEqual(codes, [keyspace.permuter(index, cle) for index in (0, 2, 3, 4)])
+
+        curseur = CurseurQuitus.objects.get()
+        self.assertEqual((curseur.position, curseur.codes_herites, curseur.codes_ignores), (5, 2, 1))
+        self.assertEqual(curseur.restants(), TAILLE_ESPACE - 5 - 1)
+
+
+# ============================================
+# EXPIRATION EN MASSE ET STATISTIQUES
+# ============================================
+
+class ExpirationQuitusTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        hier = timezone.now() - timedelta(days=1)
+        self.perimes = [creer_code(f'10000{i}') for i in range(5)]
+        CodeQuitus.objects.filter(pk__in=[c.pk for c in self.perimes]).update(date_expiration=hier)
+        self.valide = creer_code('200000')
+        self.utilise = creer_code('300000')
+        CodeQuitus.objects.filter(pk=self.utilise.pk).update(utilise=True, date_expiration=hier)
+
+    def test_expiration_par_lots(self):
+        with self.assertNumQueries(3 * 2 + 1):  # 3 lots (lecture des ids + update), lecture vide
+            self.assertEqual(CodeQuitus.expirer(taille_lot=2), 5)
+        self.assertEqual(set(CodeQuitus.objects.filter(expire=True).values_list('code', flat=True)),
+                         {c.code for c in self.perimes})
+        self.assertEqual(CodeQuitus.expirer(), 0)
+        self.assertEqual(list(CodeQuitus.disponibles()), [self.valide])
+
+    def test_code_expire_refuse(self):
+        CodeQuitus.objects.filter(pk=self.valide.pk).update(expire=True)
+        self.valide.refresh_from_db()
+        self.assertFalse(self.valide.est_valide())
+        user = User.objects.create_user('expire@example.com', 'motdepasse123')
+        self.assertIs(CodeQuitus.claim(self.valide.code, user), ResultatClaim.EXPIRED)
+
+    def test_statistiques_en_cache(self):
+        attendu = {'total': 7, 'utilises': 1, 'disponibles': 1, 'expires': 5}
+        self.assertEqual(CodeQuitus.statistiques(), attendu)
+        with self.assertNumQueries(0):
+            self.assertEqual(CodeQuitus.statistiques(), attendu)
+
+        CodeQuitus.expirer()
+        with self.assertNumQueries(1):
+            self.assertEqual(CodeQuitus.statistiques(), attendu)
+
+    def test_commande(self):
+        sortie = io.StringIO()
+        call_command('expire_quitus', '--simulation', stdout=sortie)
+        self.assertIn('5 code(s) seraient marqués', sortie.getvalue())
+        self.assertFalse(CodeQuitus.objects.filter(expire=True).exists())
+
+        call_command('expire_quitus', '--taille-lot', '2', stdout=sortie)
+        self.assertIn('5 code(s) marqué(s) expiré(s)', sortie.getvalue())
+        self.assertEqual(CodeQuitus.objects.filter(expire=True).count(), 5)
+
+
+# ============================================
+# PROFILS CHARGÉS AVEC L'UTILISATEUR
+# ============================================
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ProfilsUtilisateursTests(TestCase):
+    databases = {'default', 'sequences'}  # matricules des candidats
+
+    def setUp(self):
+        self.admin = User.objects.create_user('admin@example.com', 'motdepasse123', role='super_admin')
+        self.filiere = Filiere.objects.create(code='INF', libelle='Informatique')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.ajouter(2)
+
+    def ajouter(self, nombre):
+        """`nombre` candidats et `nombre` responsables créés par l'admin"""
+        debut = User.objects.count()
+        for i in range(debut, debut + nombre):
+            candidat = User.objects.create_user(
+                f'candidat{i}@example.com', 'motdepasse123', role='candidat', created_by=self.admin
+            )
+            Candidat.objects.create(
+                user=candidat, nom=f'NOM{i}', prenom=f'Prenom{i}', email=candidat.email,
+                date_naissance=date(2005, 1, 1), lieu_naissance='Yaoundé', sexe='M',
+            )
+            responsable = User.objects.create_user(
+                f'responsable{i}@example.com', 'motdepasse123', role='responsable_filiere', created_by=self.admin
+            )
+            ResponsableFiliere.objects.create(user=responsable, filiere=self.filiere, telephone='690000000')
+
+    def test_serialisation_en_une_requete(self):
+        with self.assertNumQueries(1):
+            donnees = UserSerializer(UserSerializer.optimiser_queryset(User.objects.all()), many=True).data
+        candidat = next(d for d in donnees if d['role'] == 'candidat')
+        self.assertTrue(candidat['candidat']['matricule'])
+        self.assertEqual(candidat['created_by_name'], self.admin.get_full_name())
+        responsable = next(d for d in donnees if d['role'] == 'responsable_filiere')
+        self.assertEqual(responsable['responsable_filiere']['filiere'], 'Informatique')
+
+    def test_connexion_sans_requete_de_profil(self):
+        serializer = LoginSerializer(data={'email': 'candidat1@example.com', 'password': 'motdepasse123'})
+        # Candidat sans code quitus : seule la lecture de l'utilisateur (profil joint)
+        with self.assertNumQueries(1):
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+        with self.assertNumQueries(0):
+            self.assertEqual(UserSerializer(serializer.validated_data['user']).data['candidat']['nom'], 'NOM1')
+
+    def test_code_quitus_verifie_a_la_connexion(self):
+        user = User.objects.get(email='candidat1@example.com')
+        CodeQuitus.objects.filter(pk=creer_code('111111').pk).update(utilisateur=user, utilise=True)
+        for code, valide in (('111111', True), ('222222', False)):
+            serializer = LoginSerializer(data={
+                'email': user.email, 'password': 'motdepasse123', 'code_quitus': code,
+            })
+            self.assertEqual(serializer.is_valid(), valide, code)
+
+    def test_liste_en_nombre_de_requetes_constant(self):
+        def requetes():
+            with CaptureQueriesContext(connection) as capture:
+                response = self.client.get('/api/auth/users/')
+            self.assertEqual(response.json()['count'], User.objects.exclude(role='super_admin').count())
+            return len(capture.captured_queries)
+
+        avant = requetes()
+        self.ajouter(5)
+        self.assertEqual(requetes(), avant)
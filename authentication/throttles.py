@@ -0,0 +1,71 @@
+# authentication/throttles.py
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Seau à jetons par adresse IP, stocké dans le cache.
+
+    L'IP vient de get_ident() : REMOTE_ADDR, ou X-Forwarded-For lu à
+    travers NUM_PROXIES proxys de confiance seulement, sinon un client
+    contournerait la limite en changeant d'en-tête à chaque requête.
+
+    `capacite` jetons au maximum (rafale autorisée), rechargés de `debit`
+    jetons par seconde. Chaque requête consomme un jeton ; sans jeton,
+    DRF répond 429 avec un en-tête Retry-After.
+    """
+    scope = 'token_bucket'
+    capacite = 10
+    debit = 1.0
+
+    def get_cache_key(self, request):
+        return f'throttle:{self.scope}:{self.get_ident(request)}'
+
+    def allow_request(self, request, view):
+        cle = self.get_cache_key(request)
+        maintenant = time.time()
+        autorise, seau = self._consommer(cache.get(cle, (self.capacite, maintenant)), maintenant)
+        cache.set(cle, seau, timeout=self._duree_cle())
+        return autorise
+
+    async def aallow_request(self, request):
+        """allow_request pour les vues asynchrones (hors DRF)"""
+        cle = self.get_cache_key(request)
+        maintenant = time.time()
+        autorise, seau = self._consommer(await cache.aget(cle, (self.capacite, maintenant)), maintenant)
+        await cache.aset(cle, seau, timeout=self._duree_cle())
+        return autorise
+
+    def _consommer(self, seau, maintenant):
+        """(autorisé, nouvel état du seau) après recharge et prise d'un jeton"""
+        jetons, dernier = seau
+        jetons = min(self.capacite, jetons + (maintenant - dernier) * self.debit)
+
+        if jetons < 1:
+            self.attente = (1 - jetons) / self.debit
+            return False, (jetons, maintenant)
+        return True, (jetons - 1, maintenant)
+
+    def wait(self):
+        return getattr(self, 'attente', None)
+
+    def _duree_cle(self):
+        # Au-delà, le seau est de toute façon plein : inutile de garder la clé
+        return int(self.capacite / self.debit) + 1
+
+
+class VerificationQuitusThrottle(TokenBucketThrottle):
+    """Limite la vérification des codes quitus (anti force brute)"""
+    scope = 'verify_quitus'
+
+    @property
+    def capacite(self):
+        return settings.QUITUS_VERIFICATION_RAFALE
+
+    @property
+    def debit(self):
+        return settings.QUITUS_VERIFICATION_PAR_MINUTE / 60
@@ -1,4 +1,5 @@
 # authentication/urls.py
+from django.conf import settings
 from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView
 from rest_framework.routers import DefaultRouter
@@ -12,7 +13,11 @@ urlpatterns = [
     # ========================================
     path('login/', views.login_view, name='login'),
     path('register/', views.register_view, name='register'),
-    path('verify-quitus/', views.verify_quitus_view, name='verify_quitus'),
+    path(
+        'verify-quitus/',
+        views.averify_quitus_view if settings.VUES_ASYNCHRONES else views.verify_quitus_view,
+        name='verify_quitus'
+    ),
     path('logout/', views.logout_view, name='logout'),
     path('refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     
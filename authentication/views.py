@@ -1,15 +1,19 @@
 # authentication/views.py
+import json
 import logging
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes,authentication_classes
+from rest_framework.decorators import api_view, permission_classes, authentication_classes, throttle_classes
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.exceptions import Throttled
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth.password_validation import validate_password  # ✅ Ajouté
 from django.core.exceptions import ValidationError 
 from django.shortcuts import get_object_or_404
 from django.db import transaction # <--- AJOUTÉ : Pour vos blocs transaction.atomic()
 from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from candidats.models import Candidat
 from django.db.models import Q, Count
 from .serializers import (
@@ -18,6 +22,11 @@ from .serializers import (
 )
 from .models import CodeQuitus, User, UserActionLog
 from .permissions import IsSuperAdmin, IsAdminAcademique, IsResponsableFiliere
+from .filtre_quitus import acode_existe_peut_etre, code_existe_peut_etre
+from .throttles import VerificationQuitusThrottle
+from sgee_project.http import reponse_json, utilisateur_du_jeton
+from sgee_project.pagination import KeysetPagination
+from sgee_project.routers import lecture_sur_replique
 
 def get_tokens_for_user(user):
     """Générer les tokens JWT pour un utilisateur"""
@@ -42,8 +51,7 @@ def get_client_ip(request):
 # AUTHENTIFICATION (PUBLIC)
 # ==========================================
 
-# On récupère le logger par défaut de Django
-logger = logging.getLogger('django')
+logger = logging.getLogger(__name__)
 
 # authentication/views.py - CORRECTION verify_quitus_view
 
@@ -55,108 +63,140 @@ from rest_framework.authentication import SessionAuthentication
 @api_view(['POST'])
 @authentication_classes([])  # ✅ Désactive TOUTE authentification
 @permission_classes([AllowAny])  # ✅ Autorise tout le monde
+@throttle_classes([VerificationQuitusThrottle])  # 🔥 Anti force brute (seau à jetons par IP)
 def verify_quitus_view(request):
     """
     Vérifier un code quitus.
     - Si non utilisé -> status: "available"
     - Si utilisé par l'utilisateur connecté -> status: "owned"
     - Si utilisé par un autre -> error avec action: "login_required"
-    """
-    
-    print("\n" + "="*80)
-    print("🔍 VERIFY QUITUS - DEBUG")
-    print("="*80)
-    
-    # 🔥 DEBUG: Afficher TOUS les headers reçus
-    print("📨 HEADERS REÇUS:")
-    for key, value in request.headers.items():
-        if 'auth' in key.lower() or 'token' in key.lower():
-            print(f"   🔑 {key}: {value[:50]}..." if len(value) > 50 else f"   🔑 {key}: {value}")
-        else:
-            print(f"   📄 {key}: {value[:50]}..." if len(value) > 50 else f"   📄 {key}: {value}")
-    
-    # 🔥 AUTHENTIFICATION MANUELLE OPTIONNELLE
-    jwt_auth = JWTAuthentication()
-    authenticated_user = None
     
-    try:
-        auth_result = jwt_auth.authenticate(request)
-        if auth_result is not None:
-            authenticated_user, _ = auth_result
-            print(f"✅ Token JWT décodé avec succès")
-    except Exception as e:
-        print(f"⚠️ Erreur authentification JWT: {type(e).__name__}: {e}")
-    
-    code_quitus = request.data.get('code_quitus')
-    print(f"📝 Code reçu: {code_quitus}")
-    print(f"👤 User authentifié: {authenticated_user}")
+    Chemin rapide : un code absent du filtre en mémoire est rejeté sans
+    requête SQL ; le JWT n'est décodé que si le code est déjà utilisé.
+    """
+    code_quitus = str(request.data.get('code_quitus') or '').strip()
     
     # Validation du code
     if not code_quitus:
-        print("❌ Code manquant")
         return Response(
             {'error': 'Code quitus requis'}, 
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    # Vérifier l'existence du code
+    # Vérifier l'existence du code (filtre en mémoire, puis base)
+    if not code_existe_peut_etre(code_quitus):
+        return Response(
+            {'error': 'Code quitus invalide'}, 
+            status=status.HTTP_404_NOT_FOUND
+        )
     try:
         quitus = CodeQuitus.objects.get(code=code_quitus)
-        print(f"✅ Code trouvé: {quitus.code}")
-        print(f"   - Utilisé: {quitus.utilise}")
-        print(f"   - Utilisateur ID: {quitus.utilisateur_id}")
     except CodeQuitus.DoesNotExist:
-        print("❌ Code inexistant")
         return Response(
             {'error': 'Code quitus invalide'}, 
             status=status.HTTP_404_NOT_FOUND
         )
     
+    # CAS 1 : CODE EXPIRÉ OU NON UTILISÉ ✅
+    reponse = _quitus_non_utilise(quitus)
+    if reponse is not None:
+        return Response(*reponse)
+    
+    # CAS 2 & 3 : CODE DÉJÀ UTILISÉ → authentification manuelle optionnelle
+    authenticated_user = None
+    try:
+        auth_result = JWTAuthentication().authenticate(request)
+        if auth_result is not None:
+            authenticated_user, _ = auth_result
+    except Exception as e:
+        logger.debug("verify_quitus : JWT ignoré (%s)", type(e).__name__)
+    
+    return Response(*_quitus_utilise(quitus, authenticated_user.id if authenticated_user else None))
+
+
+def _quitus_non_utilise(quitus):
+    """(données, statut) pour un code expiré ou disponible ; None si le code est déjà utilisé"""
     # Vérifier la validité (expiration)
-    if hasattr(quitus, 'est_valide'):
-        if not quitus.est_valide() and not quitus.utilise:
-            print("❌ Code expiré")
-            return Response(
-                {'error': 'Code quitus expiré'}, 
-                status=status.HTTP_400_BAD_REQUEST
-            )
+    if not quitus.est_valide() and not quitus.utilise:
+        return {'error': 'Code quitus expiré'}, status.HTTP_400_BAD_REQUEST
     
-    # CAS 1 : CODE NON UTILISÉ ✅
     if not quitus.utilise:
-        print("✅ STATUS: AVAILABLE (code non utilisé)")
-        return Response({
+        return {
             'status': 'available',
             'message': 'Code quitus valide et disponible',
             'montant': str(quitus.montant),
             'reference_bancaire': quitus.reference_bancaire,
             'date_expiration': quitus.date_expiration.isoformat() if quitus.date_expiration else None,
-        }, status=status.HTTP_200_OK)
-    
-    # CAS 2 & 3 : CODE DÉJÀ UTILISÉ
-    print(f"⚠️ Code déjà utilisé par user_id: {quitus.utilisateur_id}")
-    
+        }, status.HTTP_200_OK
+    return None
+
+
+def _quitus_utilise(quitus, user_id):
+    """(données, statut) pour un code déjà utilisé ; user_id : utilisateur authentifié ou None"""
     # Vérifier si l'utilisateur est connecté
-    if not authenticated_user:
-        print("❌ User non connecté → login_required")
-        return Response({
+    if not user_id:
+        return {
             'error': 'Ce code est déjà utilisé. Veuillez vous connecter si c\'est votre code.',
             'action': 'login_required'
-        }, status=status.HTTP_400_BAD_REQUEST)
+        }, status.HTTP_400_BAD_REQUEST
     
     # Vérifier si c'est le propriétaire du code
-    if quitus.utilisateur_id == authenticated_user.id:
-        print("✅ STATUS: OWNED (code appartient à l'utilisateur connecté)")
-        return Response({
+    if quitus.utilisateur_id == user_id:
+        return {
             'status': 'owned',
             'message': 'Ce code est déjà associé à votre compte',
             'montant': str(quitus.montant),
             'reference_bancaire': quitus.reference_bancaire,
-        }, status=status.HTTP_200_OK)
-    else:
-        print(f"❌ Code appartient à un autre user (ID: {quitus.utilisateur_id})")
-        return Response({
-            'error': 'Ce code quitus est déjà utilisé par un autre candidat'
-        }, status=status.HTTP_400_BAD_REQUEST)
+        }, status.HTTP_200_OK
+    return {
+        'error': 'Ce code quitus est déjà utilisé par un autre candidat'
+    }, status.HTTP_400_BAD_REQUEST
+
+
+@csrf_exempt
+@require_POST
+async def averify_quitus_view(request):
+    """
+    verify_quitus_view pour le serveur ASGI (VUES_ASYNCHRONES) : mêmes
+    réponses et même seau à jetons, ORM asynchrone. Le filtre en mémoire
+    et le décodage du JWT ne quittent pas la boucle d'événements.
+    """
+    throttle = VerificationQuitusThrottle()
+    if not await throttle.aallow_request(request):
+        refus = Throttled(throttle.wait())
+        response = reponse_json({'detail': refus.detail}, status=refus.status_code)
+        response['Retry-After'] = str(refus.wait)
+        return response
+    
+    donnees = request.POST
+    if request.content_type == 'application/json':
+        try:
+            donnees = json.loads(request.body or b'{}')
+        except ValueError:
+            donnees = None
+        if not isinstance(donnees, dict):
+            return reponse_json({'detail': 'JSON invalide'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    code_quitus = str(donnees.get('code_quitus') or '').strip()
+    if not code_quitus:
+        return reponse_json({'error': 'Code quitus requis'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    if not await acode_existe_peut_etre(code_quitus):
+        return reponse_json({'error': 'Code quitus invalide'}, status=status.HTTP_404_NOT_FOUND)
+    try:
+        quitus = await CodeQuitus.objects.aget(code=code_quitus)
+    except CodeQuitus.DoesNotExist:
+        return reponse_json({'error': 'Code quitus invalide'}, status=status.HTTP_404_NOT_FOUND)
+    
+    reponse = _quitus_non_utilise(quitus)
+    if reponse is not None:
+        return reponse_json(*reponse)
+    
+    # Même règle que JWTAuthentication : jeton valide et compte actif
+    user_id = utilisateur_du_jeton(request)
+    if user_id and not await User.objects.filter(pk=user_id, is_active=True).aexists():
+        user_id = None
+    return reponse_json(*_quitus_utilise(quitus, user_id))
 @api_view(['POST'])
 @authentication_classes([])  # 🔥 CRUCIAL
 @permission_classes([AllowAny])
@@ -223,27 +263,23 @@ def login_view(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@lecture_sur_replique
 def list_users_view(request):
     user = request.user
     
-    print(f"🔍 DEBUG - Utilisateur: {user.email} (rôle: {user.role})")
-    
     if user.role == 'super_admin':
         users = User.objects.filter(
             role__in=['admin_academique', 'responsable_filiere', 'candidat']
-        ).select_related('candidat', 'created_by')
-        print(f"🔍 Super Admin → {users.count()} users")
-        
+        )
     elif user.role == 'admin_academique':
         users = User.objects.filter(
             role__in=['responsable_filiere', 'candidat']
-        ).select_related('candidat', 'created_by')
+        )
     elif user.role == 'responsable_filiere':
-        if hasattr(user, 'responsable_filiere_profile') and user.responsable_filiere_profile.filiere:
-            filiere_id = user.responsable_filiere_profile.filiere.id
+        if hasattr(user, 'responsable_filiere_profile') and user.responsable_filiere_profile.filiere_id:
             users = User.objects.filter(
-                role='candidat', candidat__filiere_id=filiere_id
-            ).select_related('created_by')
+                role='candidat', candidat__filiere_id=user.responsable_filiere_profile.filiere_id
+            )
         else:
             users = User.objects.none()
     else:
@@ -253,9 +289,6 @@ def list_users_view(request):
     is_active = request.query_params.get('is_active')
     if is_active and is_active.lower() in ['true', 'false']:  # ← FIX !
         users = users.filter(is_active=(is_active.lower() == 'true'))
-        print(f"🔍 Filtre actif: {is_active}")
-    else:
-        print("🔍 Pas de filtre actif")
     
     # Autres filtres
     role_filter = request.query_params.get('role')
@@ -263,20 +296,29 @@ def list_users_view(request):
     
     if role_filter:
         users = users.filter(role=role_filter)
-        print(f"🔍 Filtre rôle: {role_filter}")
     if search:
         users = users.filter(
             Q(email__icontains=search) | Q(nom__icontains=search) | Q(prenom__icontains=search)
         )
-        print(f"🔍 Recherche: {search}")
     
-    final_count = users.count()
-    print(f"✅ FINAL: {final_count} utilisateurs")
+    users = UserSerializer.optimiser_queryset(users)
+    
+    # Pagination par curseur (optionnelle) : ?cursor=&per_page=&count=exact|estime
+    if KeysetPagination.demandee(request):
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(users, request)
+        return Response({
+            **paginator.get_meta(),
+            'users': UserSerializer(page, many=True).data
+        }, status=status.HTTP_200_OK)
     
+    # Une seule requête : profils joints, total déduit de la liste
     serializer = UserSerializer(users, many=True)
+    data = serializer.data
+    logger.debug('list_users: %s utilisateurs pour %s (%s)', len(data), user.email, user.role)
     return Response({
-        'count': final_count,
-        'users': serializer.data
+        'count': len(data),
+        'users': data
     }, status=status.HTTP_200_OK)
 
 @api_view(['PUT'])
@@ -298,7 +340,7 @@ def update_user_view(request, pk):  # ← pk obligatoire !
     serializer = UserSerializer(target_user, data=request.data, partial=True)
     if serializer.is_valid():
         serializer.save()
-        print(f"✅ User {pk} modifié par {user.email}")
+        logger.info('Utilisateur modifié', extra={'user_id': pk, 'acteur_id': user.id})
         return Response(serializer.data, status=status.HTTP_200_OK)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -317,7 +359,8 @@ def toggle_user_active_view(request, pk):
         target_user = User.objects.get(id=pk)
         target_user.is_active = not target_user.is_active
         target_user.save()
-        print(f"✅ User {pk} {'activé' if target_user.is_active else 'désactivé'} par {user.email}")
+        logger.info('Utilisateur %s', 'activé' if target_user.is_active else 'désactivé',
+                    extra={'user_id': pk, 'acteur_id': user.id})
         return Response({
             'id': pk,
             'is_active': target_user.is_active,
@@ -385,7 +428,7 @@ def delete_user_view(request, pk):  # ← AJOUTE pk ici !
     # Suppression
     target_user.delete()
     
-    print(f"✅ User {pk} ({target_user.email}) supprimé par {user.email}")
+    logger.info('Utilisateur supprimé', extra={'user_id': pk, 'acteur_id': user.id})
     
     return Response({
         'success': True,
@@ -397,7 +440,7 @@ def delete_user_view(request, pk):  # ← AJOUTE pk ici !
 @permission_classes([IsAuthenticated])
 def get_user_view(request, user_id):
     """Récupérer les détails d'un utilisateur"""
-    target_user = get_object_or_404(User, id=user_id)
+    target_user = get_object_or_404(User.objects.avec_profil(), id=user_id)
     
     if not request.user.can_manage_user(target_user):
         return Response({'error': 'Accès refusé'}, status=status.HTTP_403_FORBIDDEN)
@@ -418,9 +461,6 @@ def create_admin_user_view(request):
     """
     user = request.user
     
-    print(f"🔍 CREATE USER - Acteur: {user.email} (rôle: {user.role})")
-    print(f"📦 Data reçue: {request.data}")
-    
     if user.role not in ['super_admin', 'admin_academique']:
         return Response(
             {'error': 'Accès refusé'}, 
@@ -480,7 +520,7 @@ def create_admin_user_view(request):
                 is_email_verified=True
             )
             
-            print(f"✅ User créé: {new_user.email} (ID: {new_user.id})")
+            logger.info('Utilisateur créé', extra={'user_id': new_user.id, 'role': target_role, 'acteur_id': user.id})
             
             # Si responsable de filière, créer le profil
             if target_role == 'responsable_filiere':
@@ -494,7 +534,6 @@ def create_admin_user_view(request):
                         filiere=filiere,
                         telephone=request.data.get('telephone', '')
                     )
-                    print(f"✅ Profil Responsable Filière créé pour filière: {filiere.libelle}")
                 except Filiere.DoesNotExist:
                     raise Exception(f"Filière ID {filiere_id} non trouvée")
             
@@ -521,12 +560,13 @@ def create_admin_user_view(request):
             }, status=status.HTTP_201_CREATED)
             
     except Exception as e:
-        print(f"❌ Erreur création: {str(e)}")
+        logger.exception('Erreur création utilisateur', extra={'acteur_id': user.id})
         return Response({
             'error': f'Erreur lors de la création: {str(e)}'
         }, status=status.HTTP_400_BAD_REQUEST)
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@lecture_sur_replique
 def get_evolution_candidats_view(request):
     """ÉVOLUTION candidats derniers 6 mois"""
     from django.db.models import Count
@@ -604,7 +644,8 @@ def toggle_user_active_view(request, pk):  # ← pk déjà OK
             ip_address=get_client_ip(request)
         )
         
-        print(f"✅ User {pk} {'activé' if target_user.is_active else 'désactivé'} par {user.email}")
+        logger.info('Utilisateur %s', 'activé' if target_user.is_active else 'désactivé',
+                    extra={'user_id': pk, 'acteur_id': user.id})
         
         return Response({
             'success': True,
@@ -671,7 +712,7 @@ def reset_user_password_view(request, pk):  # ← pk au lieu de user_id
         ip_address=get_client_ip(request)
     )
     
-    print(f"✅ Mot de passe réinitialisé pour user {pk} par {user.email}")
+    logger.info('Mot de passe réinitialisé', extra={'user_id': pk, 'acteur_id': user.id})
     
     return Response({
         'success': True,
@@ -685,6 +726,7 @@ def reset_user_password_view(request, pk):  # ← pk au lieu de user_id
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@lecture_sur_replique
 def get_statistics_view(request):
     user = request.user
     stats = {}
@@ -760,6 +802,7 @@ def get_statistics_view(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@lecture_sur_replique
 def get_action_logs_view(request):
     """Récupérer les logs d'actions (audit)"""
     if request.user.role not in ['super_admin', 'admin_academique']:
@@ -777,7 +820,15 @@ def get_action_logs_view(request):
     if user_id:
         logs = logs.filter(Q(actor_id=user_id) | Q(target_user_id=user_id))
     
-    logs = logs.select_related('actor', 'target_user')[:100]  # Limite 100
+    logs = logs.select_related('actor', 'target_user')
+    
+    # Pagination par curseur (optionnelle), sinon les 100 plus récents
+    paginator = None
+    if KeysetPagination.demandee(request):
+        paginator = KeysetPagination()
+        logs = paginator.paginate_queryset(logs, request)
+    else:
+        logs = logs[:100]  # Limite 100
     
     data = [{
         'id': log.id,
@@ -788,6 +839,9 @@ def get_action_logs_view(request):
         'created_at': log.created_at.isoformat()
     } for log in logs]
     
+    if paginator is not None:
+        return Response({**paginator.get_meta(), 'logs': data}, status=status.HTTP_200_OK)
+    
     return Response({
         'count': len(data),
         'logs': data
@@ -804,9 +858,6 @@ def create_admin_user_view(request):
     ✅ ENDPOINT UNIFIÉ pour créer Admin Académique ET Responsable Filière
     URL: POST /api/auth/users/create/
     """
-    print(f"🔍 CREATE USER - Acteur: {request.user.email} (rôle: {request.user.role})")
-    print(f"📦 Data reçue: {request.data}")
-    
     # Vérifier les permissions
     if not request.user.role in ['super_admin', 'admin_academique']:
         return Response(
@@ -827,13 +878,12 @@ def create_admin_user_view(request):
             }, status=status.HTTP_201_CREATED)
             
         except Exception as e:
-            print(f"❌ Erreur création user: {str(e)}")
+            logger.exception('Erreur création utilisateur', extra={'acteur_id': request.user.id})
             return Response(
                 {'error': f'Erreur lors de la création: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
-    print(f"❌ Erreurs validation: {serializer.errors}")
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
@@ -862,7 +912,7 @@ def list_filieres_view(request):
             'count': len(filieres_list)
         })
     except Exception as e:
-        print(f"❌ Erreur filières: {str(e)}")
+        logger.exception('Erreur liste filières')
         return Response(
             {'error': str(e)},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -873,9 +923,6 @@ def create_responsable_filiere_view(request):
     """Super Admin + Admin Acad → Créer Resp. Filière"""
     user = request.user
     
-    print(f"🔍 CREATE USER - Acteur: {user.email} (rôle: {user.role})")
-    print(f"📦 Data reçue: {request.data}")
-    
     # Vérification des permissions
     if user.role not in ['super_admin', 'admin_academique']:
         return Response(
@@ -895,7 +942,7 @@ def create_responsable_filiere_view(request):
             # Créer l'utilisateur (le serializer gère le mot de passe)
             user_new = serializer.save()
             
-            print(f"✅ User créé: {user_new.email} - Filière: {user_new.responsable_filiere_profile.filiere}")
+            logger.info('Responsable de filière créé', extra={'user_id': user_new.id, 'acteur_id': request.user.id})
             
             # Log de l'action
             UserActionLog.objects.create(
@@ -925,9 +972,7 @@ def create_responsable_filiere_view(request):
             return Response(response_data, status=status.HTTP_201_CREATED)
             
         except Exception as e:
-            print(f"❌ Erreur création user: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception('Erreur création responsable de filière', extra={'acteur_id': request.user.id})
             
             # Nettoyer si l'utilisateur a été créé mais pas le profil
             if 'user_new' in locals():
@@ -938,7 +983,6 @@ def create_responsable_filiere_view(request):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
-    print(f"❌ Erreurs validation: {serializer.errors}")
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 @api_view(['GET', 'PATCH', 'PUT'])  # ✅ Accepte GET, PATCH et PUT
@@ -1021,16 +1065,11 @@ def change_password_view(request):
     user = request.user
     data = request.data
     
-    # ✅ Debug : afficher les données reçues
-    print(f"🔐 Change password - User: {user.email}")
-    print(f"📦 Data reçue: {data.keys()}")
-    
     # Vérifier que tous les champs sont présents
     required_fields = ['current_password', 'new_password', 'confirm_password']
     missing_fields = [field for field in required_fields if field not in data]
     
     if missing_fields:
-        print(f"❌ Champs manquants: {missing_fields}")
         return Response(
             {'error': f'Champs manquants: {", ".join(missing_fields)}'},
             status=status.HTTP_400_BAD_REQUEST
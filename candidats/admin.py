@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Candidat, Quitus, Dossier, Document, Region, Departement
+from django.utils import timezone
+from .models import Candidat, Quitus, Dossier, Document, Region, Departement, DoublonCandidat
 
 @admin.register(Quitus)
 class QuitusAdmin(admin.ModelAdmin):
@@ -52,3 +53,26 @@ class DocumentAdmin(admin.ModelAdmin):
     list_filter = ['type_document', 'is_verified']
     search_fields = ['candidat__nom', 'candidat__prenom', 'nom_fichier']
     readonly_fields = ['created_at', 'updated_at']
+
+@admin.register(DoublonCandidat)
+class DoublonCandidatAdmin(admin.ModelAdmin):
+    """File de revue des doublons présumés (commande detecter_doublons)"""
+    list_display = ['candidat', 'doublon_de', 'score', 'statut', 'traite_par', 'created_at']
+    list_filter = ['statut']
+    search_fields = ['candidat__nom', 'candidat__prenom', 'candidat__matricule', 'doublon_de__matricule']
+    list_select_related = ['candidat', 'doublon_de', 'traite_par']
+    raw_id_fields = ['candidat', 'doublon_de']
+    readonly_fields = ['score', 'traite_par', 'traite_le', 'created_at']
+    actions = ['confirmer', 'ecarter']
+
+    def _traiter(self, request, queryset, statut):
+        nombre = queryset.update(statut=statut, traite_par=request.user, traite_le=timezone.now())
+        self.message_user(request, f"{nombre} paire(s) traitée(s)")
+
+    def confirmer(self, request, queryset):
+        self._traiter(request, queryset, 'confirme')
+    confirmer.short_description = "✅ Confirmer comme doublons"
+
+    def ecarter(self, request, queryset):
+        self._traiter(request, queryset, 'ecarte')
+    ecarter.short_description = "❌ Écarter (personnes différentes)"
@@ -0,0 +1,136 @@
+# candidats/doublons.py
+"""
+Détection des candidats inscrits plusieurs fois.
+
+Blocage : seuls les candidats de même clé phonétique du nom ET de même date
+de naissance sont comparés (index candidat_bloc_doublon_idx). Les blocs
+restent petits, le coût total est donc quasi linéaire.
+
+Comparaison : similarité difflib sur « nom prénom » normalisé, mots triés
+(un nom et un prénom inversés restent détectés). Les paires au-dessus de
+DOUBLONS_SEUIL vont dans la file de revue DoublonCandidat.
+"""
+import itertools
+import logging
+from difflib import SequenceMatcher
+
+from django.conf import settings
+
+from .models import Candidat, DoublonCandidat
+from .utils.phonetique import cle_phonetique, normaliser
+
+logger = logging.getLogger(__name__)
+
+# Au-delà, le bloc est ignoré (date de naissance de remplissage, etc.)
+TAILLE_BLOC_MAX = 500
+
+
+def signature(nom, prenom):
+    return ' '.join(sorted(f'{normaliser(nom)} {normaliser(prenom)}'.replace('-', ' ').split()))
+
+
+def similarite(a, b):
+    """Ratio de similarité entre deux signatures (0 à 1)"""
+    if a == b:
+        return 1.0
+    comparateur = SequenceMatcher(None, a, b, autojunk=False)
+    # Bornes supérieures bon marché avant le calcul exact
+    if comparateur.real_quick_ratio() < settings.DOUBLONS_SEUIL:
+        return 0.0
+    if comparateur.quick_ratio() < settings.DOUBLONS_SEUIL:
+        return 0.0
+    return comparateur.ratio()
+
+
+def _comparer_bloc(bloc):
+    """bloc : liste de (id, signature). Retourne les paires (id_min, id_max, score)."""
+    paires = []
+    for (id_a, sig_a), (id_b, sig_b) in itertools.combinations(bloc, 2):
+        score = similarite(sig_a, sig_b)
+        if score >= settings.DOUBLONS_SEUIL:
+            paires.append((min(id_a, id_b), max(id_a, id_b), round(score, 3)))
+    return paires
+
+
+def _enregistrer(paires):
+    """Ajoute les paires à la file de revue (les paires déjà connues sont ignorées)"""
+    if paires:
+        DoublonCandidat.objects.bulk_create(
+            [DoublonCandidat(candidat_id=a, doublon_de_id=b, score=score) for a, b, score in paires],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+    return len(paires)
+
+
+def detecter_pour(candidat):
+    """Détection incrémentale pour un candidat (après enrôlement). Retourne le nombre de paires."""
+    if not candidat.cle_phonetique or not candidat.date_naissance:
+        return 0
+
+    voisins = (
+        Candidat.objects
+        .filter(cle_phonetique=candidat.cle_phonetique, date_naissance=candidat.date_naissance)
+        .exclude(pk=candidat.pk)
+        .values_list('id', 'nom', 'prenom')[:TAILLE_BLOC_MAX]
+    )
+    sig = signature(candidat.nom, candidat.prenom)
+    paires = []
+    for pk, nom, prenom in voisins:
+        score = similarite(sig, signature(nom, prenom))
+        if score >= settings.DOUBLONS_SEUIL:
+            paires.append((min(pk, candidat.pk), max(pk, candidat.pk), round(score, 3)))
+    return _enregistrer(paires)
+
+
+def recalculer_cles(tous=False, taille_lot=2000):
+    """Renseigne cle_phonetique (les vides seulement, ou toutes). Retourne le nombre de lignes."""
+    candidats = Candidat.objects.only('id', 'nom', 'cle_phonetique').order_by('pk')
+    if not tous:
+        candidats = candidats.filter(cle_phonetique='')
+
+    total = 0
+    dernier_pk = 0
+    while True:
+        lot = list(candidats.filter(pk__gt=dernier_pk)[:taille_lot])
+        if not lot:
+            break
+        for candidat in lot:
+            candidat.cle_phonetique = cle_phonetique(candidat.nom)
+        Candidat.objects.bulk_update(lot, ['cle_phonetique'])
+        total += len(lot)
+        dernier_pk = lot[-1].pk
+    return total
+
+
+def detecter_tout(taille_lot=5000):
+    """
+    Passe complète : parcours unique trié par (clé, date de naissance),
+    comparaison bloc par bloc. Retourne (candidats, blocs comparés, paires).
+    """
+    lignes = (
+        Candidat.objects
+        .exclude(cle_phonetique='')
+        .order_by('cle_phonetique', 'date_naissance', 'pk')
+        .values_list('id', 'nom', 'prenom', 'cle_phonetique', 'date_naissance')
+        .iterator(chunk_size=taille_lot)
+    )
+
+    candidats = blocs = paires = 0
+    en_attente = []
+    for (cle, date), groupe in itertools.groupby(lignes, key=lambda ligne: (ligne[3], ligne[4])):
+        bloc = [(pk, signature(nom, prenom)) for pk, nom, prenom, _, _ in groupe]
+        candidats += len(bloc)
+        if len(bloc) < 2:
+            continue
+        if len(bloc) > TAILLE_BLOC_MAX:
+            logger.warning('Bloc de doublons ignoré (%s, %s) : %s candidats', cle, date, len(bloc))
+            continue
+        blocs += 1
+        en_attente.extend(_comparer_bloc(bloc))
+        if len(en_attente) >= taille_lot:
+            paires += _enregistrer(en_attente)
+            en_attente = []
+
+    paires += _enregistrer(en_attente)
+    return candidats, blocs, paires
@@ -0,0 +1,169 @@
+# candidats/events.py
+"""
+Publication / abonnement des événements poussés aux clients (SSE).
+
+Canaux : « candidat:<id> » (notifications et statut du dossier d'un
+candidat) et « filiere:<id> » (changements de statut des dossiers d'une
+filière, pour le RF).
+
+Le backend est choisi par EVENEMENTS_BACKEND :
+- BackendMemoire : dans le processus, suffisant avec un seul worker ASGI ;
+- BackendRedis : PUBLISH/SUBSCRIBE Redis (ou tout serveur compatible),
+  nécessaire dès qu'il y a plusieurs workers. Requiert le paquet redis.
+
+publier() est synchrone et appelable depuis n'importe quel thread ; une
+erreur de publication est journalisée mais ne remonte jamais à l'appelant.
+"""
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+TAILLE_FILE = 100  # messages en attente par abonné, au-delà ils sont perdus
+
+
+def canal_candidat(candidat_id):
+    return f'candidat:{candidat_id}'
+
+
+def canal_filiere(filiere_id):
+    return f'filiere:{filiere_id}'
+
+
+# ==========================================
+# BACKEND MÉMOIRE (un seul processus)
+# ==========================================
+
+class AbonnementMemoire:
+    def __init__(self, backend, canaux):
+        self.backend = backend
+        self.canaux = canaux
+        self.boucle = asyncio.get_running_loop()
+        self.file = asyncio.Queue(maxsize=TAILLE_FILE)
+
+    def deposer(self, message):
+        # Appelé dans la boucle de l'abonné (call_soon_threadsafe)
+        try:
+            self.file.put_nowait(message)
+        except asyncio.QueueFull:
+            logger.warning('Abonné %s saturé : message perdu', self.canaux)
+
+    async def recevoir(self, delai):
+        """Prochain message, ou None après `delai` secondes sans message"""
+        try:
+            return await asyncio.wait_for(self.file.get(), delai)
+        except asyncio.TimeoutError:
+            return None
+
+    async def fermer(self):
+        self.backend._retirer(self)
+
+
+class BackendMemoire:
+    def __init__(self):
+        self._abonnes = defaultdict(set)
+        self._verrou = threading.Lock()
+
+    def publier(self, canal, message):
+        with self._verrou:
+            abonnes = list(self._abonnes.get(canal, ()))
+        for abonnement in abonnes:
+            try:
+                abonnement.boucle.call_soon_threadsafe(abonnement.deposer, message)
+            except RuntimeError:
+                # Boucle fermée : l'abonné est parti sans se désinscrire
+                self._retirer(abonnement)
+
+    async def abonner(self, canaux):
+        abonnement = AbonnementMemoire(self, canaux)
+        with self._verrou:
+            for canal in canaux:
+                self._abonnes[canal].add(abonnement)
+        return abonnement
+
+    def _retirer(self, abonnement):
+        with self._verrou:
+            for canal in abonnement.canaux:
+                abonnes = self._abonnes.get(canal)
+                if abonnes is not None:
+                    abonnes.discard(abonnement)
+                    if not abonnes:
+                        del self._abonnes[canal]
+
+
+# ==========================================
+# BACKEND REDIS (plusieurs workers)
+# ==========================================
+
+class AbonnementRedis:
+    def __init__(self, client, pubsub):
+        self.client = client
+        self.pubsub = pubsub
+
+    async def recevoir(self, delai):
+        message = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=delai)
+        if message is None:
+            return None
+        donnees = message['data']
+        return donnees.decode('utf-8') if isinstance(donnees, bytes) else donnees
+
+    async def fermer(self):
+        await self.pubsub.aclose()
+        await self.client.aclose()
+
+
+class BackendRedis:
+    def __init__(self):
+        try:
+            import redis
+            import redis.asyncio  # noqa: F401
+        except ImportError:
+            raise ImproperlyConfigured("BackendRedis nécessite le paquet « redis » (pip install redis)")
+        self._redis = redis
+        self._client = redis.Redis.from_url(settings.EVENEMENTS_REDIS_URL)
+
+    def publier(self, canal, message):
+        self._client.publish(canal, message)
+
+    async def abonner(self, canaux):
+        client = self._redis.asyncio.Redis.from_url(settings.EVENEMENTS_REDIS_URL)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(*canaux)
+        return AbonnementRedis(client, pubsub)
+
+
+# ==========================================
+# API
+# ==========================================
+
+_backend = None
+_verrou_backend = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _verrou_backend:
+            if _backend is None:
+                _backend = import_string(settings.EVENEMENTS_BACKEND)()
+    return _backend
+
+
+def publier(canaux, type_evenement, donnees):
+    """Publie un événement {type, data} sur un ou plusieurs canaux"""
+    if isinstance(canaux, str):
+        canaux = [canaux]
+    message = json.dumps({'type': type_evenement, 'data': donnees}, default=str)
+    try:
+        backend = get_backend()
+        for canal in canaux:
+            backend.publier(canal, message)
+    except Exception:
+        logger.exception('Publication de « %s » impossible sur %s', type_evenement, canaux)
@@ -0,0 +1,129 @@
+import re
+from collections import Counter, OrderedDict
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from authentication.models import User
+from sgee_project.detecteur import empreinte
+
+# (rôle, URL) des endpoints GET chauds, appelés avec le premier utilisateur actif du rôle
+ENDPOINTS = [
+    ('responsable_filiere', '/api/candidats/respfiliere/dashboard-stats/'),
+    ('responsable_filiere', '/api/candidats/respfiliere/mes-candidats/'),
+    ('responsable_filiere', '/api/candidats/respfiliere/mes-candidats/?statut=en_attente'),
+    ('responsable_filiere', '/api/candidats/respfiliere/mes-candidats/?cursor=&statut=complet'),
+    ('responsable_filiere', '/api/candidats/respfiliere/profil-filiere/'),
+    ('responsable_filiere', '/api/candidats/respfiliere/export-stats/'),
+    ('admin_academique', '/api/candidats/admin-academique/dashboard-stats/'),
+    ('admin_academique', '/api/candidats/admin-academique/stats-filieres/'),
+    ('admin_academique', '/api/candidats/admin-academique/filieres-responsables/'),
+    ('admin_academique', '/api/candidats/admin-academique/utilisateurs/'),
+    ('super_admin', '/api/auth/users/'),
+    ('super_admin', '/api/auth/statistics/'),
+    ('super_admin', '/api/auth/action-logs/'),
+]
+
+# Signes d'un plan coûteux : MySQL (type ALL, filesort, temporary) et SQLite (SCAN, B-TREE)
+_ALERTES = (
+    (re.compile(r'\bALL\b'), 'parcours complet de table'),
+    (re.compile(r'Using filesort'), 'tri sans index (filesort)'),
+    (re.compile(r'Using temporary'), 'table temporaire'),
+    (re.compile(r'^SCAN (?!.*USING (?:COVERING )?INDEX)', re.MULTILINE), 'parcours complet de table'),
+    (re.compile(r'USE TEMP B-TREE FOR ORDER BY'), 'tri sans index'),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Capture les requêtes SQL des principaux endpoints (client de test) et les passe à EXPLAIN, "
+        "pour choisir les index à créer"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sortie',
+            help='Fichier où écrire le rapport complet (plans EXPLAIN inclus)'
+        )
+        parser.add_argument(
+            '--filtre',
+            default='',
+            help='Ne garder que les URL contenant ce texte'
+        )
+
+    def handle(self, *args, **options):
+        client = Client(HTTP_HOST='localhost')
+        utilisateurs = {}
+        rapport = []
+        alertes = Counter()
+
+        for role, url in ENDPOINTS:
+            if options['filtre'] not in url:
+                continue
+            if role not in utilisateurs:
+                utilisateurs[role] = User.objects.filter(role=role, is_active=True).order_by('pk').first()
+            user = utilisateurs[role]
+            if user is None:
+                self.stdout.write(self.style.WARNING(f'⚠️  {url} ignoré : aucun utilisateur « {role} »'))
+                continue
+
+            jeton = str(RefreshToken.for_user(user).access_token)
+            with CaptureQueriesContext(connection) as capture:
+                response = client.get(url, HTTP_AUTHORIZATION=f'Bearer {jeton}')
+
+            formes = OrderedDict()
+            for requete in capture.captured_queries:
+                sql = requete['sql']
+                if sql.lstrip().upper().startswith('SELECT'):
+                    formes.setdefault(empreinte(sql), []).append(sql)
+
+            self.stdout.write(
+                f'\n🔍 {url} → HTTP {response.status_code}, '
+                f'{len(capture)} requête(s), {len(formes)} forme(s) distincte(s)'
+            )
+            rapport.append(f'## {url} ({role}) : HTTP {response.status_code}, {len(capture)} requête(s)\n')
+
+            for sqls in formes.values():
+                plan = self.expliquer(sqls[0])
+                problemes = [libelle for motif, libelle in _ALERTES if motif.search(plan)]
+                repetitions = f' ×{len(sqls)}' if len(sqls) > 1 else ''
+                if problemes or len(sqls) > 1:
+                    self.stdout.write(self.style.WARNING(
+                        f'   ⚠️  {", ".join(problemes) or "même forme répétée"}{repetitions} : {sqls[0][:150]}'
+                    ))
+                alertes.update(problemes)
+                rapport.append(f'{sqls[0]}{repetitions}\n{plan}\n')
+
+        if alertes:
+            self.stdout.write(self.style.WARNING('\n📊 Alertes:'))
+            for libelle, nombre in alertes.most_common():
+                self.stdout.write(f'   • {libelle}: {nombre}')
+        else:
+            self.stdout.write(self.style.SUCCESS('\n✅ Aucun plan coûteux détecté'))
+
+        if options['sortie']:
+            with open(options['sortie'], 'w', encoding='utf-8') as sortie:
+                sortie.write(f'# Audit des requêtes ({connection.vendor})\n\n')
+                sortie.write('\n'.join(rapport))
+            self.stdout.write(f"\n📄 Rapport écrit dans {options['sortie']}")
+
+    def expliquer(self, sql):
+        """Plan d'exécution sous forme de texte, une ligne par étape"""
+        prefixe = 'EXPLAIN QUERY PLAN' if connection.vendor == 'sqlite' else 'EXPLAIN'
+        try:
+            with connection.cursor() as curseur:
+                curseur.execute(f'{prefixe} {sql}')
+                colonnes = [col[0] for col in curseur.description]
+                lignes = curseur.fetchall()
+        except Exception as e:
+            return f'(EXPLAIN impossible : {e})'
+
+        if connection.vendor == 'sqlite':
+            return '\n'.join(str(ligne[-1]) for ligne in lignes)
+        return '\n'.join(
+            ' | '.join(f'{nom}={valeur}' for nom, valeur in zip(colonnes, ligne) if valeur is not None)
+            for ligne in lignes
+        )
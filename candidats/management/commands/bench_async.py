@@ -0,0 +1,225 @@
+import asyncio
+import collections
+import json
+import resource
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+CHEMINS_DEFAUT = ('/api/config/bacs/1/series/', '/api/epreuves/')
+
+
+async def lire_reponse(lecteur):
+    """(statut, connexion à fermer) d'une réponse HTTP/1.1, corps lu et ignoré"""
+    ligne = await lecteur.readline()
+    if not ligne:
+        raise ConnectionError('connexion fermée par le serveur')
+    statut = int(ligne.split()[1])
+
+    longueur, morceaux, fermer = None, False, False
+    while True:
+        ligne = await lecteur.readline()
+        if ligne in (b'\r\n', b'\n', b''):
+            break
+        nom, _, valeur = ligne.decode('latin-1').partition(':')
+        nom, valeur = nom.strip().lower(), valeur.strip().lower()
+        if nom == 'content-length':
+            longueur = int(valeur)
+        elif nom == 'transfer-encoding':
+            morceaux = 'chunked' in valeur
+        elif nom == 'connection':
+            fermer = valeur == 'close'
+
+    if morceaux:
+        while True:
+            taille = int((await lecteur.readline()).split(b';')[0], 16)
+            await lecteur.readexactly(taille + 2)  # données + CRLF
+            if taille == 0:
+                break
+    elif longueur is not None:
+        await lecteur.readexactly(longueur)
+    else:
+        await lecteur.read()
+        fermer = True
+    return statut, fermer
+
+
+class Campagne:
+    """`clients` connexions keep-alive qui se partagent `total` requêtes"""
+
+    def __init__(self, url, requetes, clients, total, delai):
+        parties = urlsplit(url)
+        if parties.scheme != 'http' or not parties.hostname:
+            raise CommandError(f'URL non prise en charge (http://hote:port attendu) : {url}')
+        self.hote = parties.hostname
+        self.port = parties.port or 80
+        self.prefixe = parties.path.rstrip('/')
+        self.requetes = [
+            self.preparer(methode, chemin, corps, entetes) for methode, chemin, corps, entetes in requetes
+        ]
+        self.clients = clients
+        self.total = total
+        self.delai = delai
+
+        self.restantes = total
+        self.durees = []
+        self.statuts = collections.Counter()
+        self.erreurs = collections.Counter()
+        self.connectes = 0
+
+    def preparer(self, methode, chemin, corps, entetes):
+        corps = corps or b''
+        lignes = [
+            f'{methode} {self.prefixe}{chemin} HTTP/1.1',
+            f'Host: {self.hote}:{self.port}',
+            'Accept: application/json',
+            'Accept-Encoding: gzip',
+            *(f'{nom}: {valeur}' for nom, valeur in entetes.items()),
+        ]
+        if corps:
+            lignes += ['Content-Type: application/json', f'Content-Length: {len(corps)}']
+        return ('\r\n'.join(lignes) + '\r\n\r\n').encode('latin-1') + corps
+
+    async def lancer(self):
+        debut = time.perf_counter()
+        await asyncio.gather(*(self.client(i) for i in range(self.clients)))
+        return time.perf_counter() - debut
+
+    async def client(self, numero):
+        connexion = None
+        try:
+            while self.restantes > 0:
+                self.restantes -= 1
+                requete = self.requetes[(self.total - self.restantes) % len(self.requetes)]
+                debut = time.perf_counter()
+                try:
+                    if connexion is None:
+                        connexion = await asyncio.wait_for(
+                            asyncio.open_connection(self.hote, self.port), self.delai
+                        )
+                        self.connectes += 1
+                    lecteur, ecrivain = connexion
+                    ecrivain.write(requete)
+                    await ecrivain.drain()
+                    statut, fermer = await asyncio.wait_for(lire_reponse(lecteur), self.delai)
+                except (OSError, ValueError, asyncio.IncompleteReadError, asyncio.TimeoutError) as exc:
+                    self.erreurs[type(exc).__name__] += 1
+                    connexion = self.fermer(connexion)
+                    continue
+                self.durees.append((time.perf_counter() - debut) * 1000)
+                self.statuts[statut] += 1
+                if fermer:
+                    connexion = self.fermer(connexion)
+        finally:
+            self.fermer(connexion)
+
+    @staticmethod
+    def fermer(connexion):
+        if connexion is not None:
+            connexion[1].close()
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Charge des serveurs déjà lancés avec N clients simultanés et compare débit et "
+        "latences (p50, p95, p99) : typiquement le même code servi en WSGI (vues "
+        "synchrones) et en ASGI avec VUES_ASYNCHRONES=True"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--cible', action='append', required=True, metavar='NOM=URL',
+            help="Serveur à mesurer, répétable. Ex. --cible wsgi=http://127.0.0.1:8000 "
+                 "(gunicorn sgee_project.wsgi -w 4 --threads 8) --cible asgi=http://127.0.0.1:8001 "
+                 "(VUES_ASYNCHRONES=True uvicorn sgee_project.asgi:application --workers 4)"
+        )
+        parser.add_argument('--clients', type=int, default=1000, help='Clients simultanés (défaut: 1000)')
+        parser.add_argument('--requetes', type=int, default=20000, help='Requêtes par cible (défaut: 20000)')
+        parser.add_argument(
+            '--chemin', action='append',
+            help=f"Chemin GET à appeler, répétable (défaut: {', '.join(CHEMINS_DEFAUT)})"
+        )
+        parser.add_argument(
+            '--quitus',
+            help="Ajoute POST /api/auth/verify-quitus/ avec ce code (limité par IP : relever "
+                 "QUITUS_VERIFICATION_RAFALE sur les serveurs mesurés)"
+        )
+        parser.add_argument(
+            '--jeton',
+            help='JWT d\'accès envoyé en Bearer (ex. pour --chemin /api/candidats/check-enrollment/)'
+        )
+        parser.add_argument('--delai', type=float, default=30, help='Délai maximal par requête en secondes (défaut: 30)')
+
+    def handle(self, *args, **options):
+        if options['clients'] <= 0 or options['requetes'] <= 0:
+            raise CommandError('--clients et --requetes doivent être supérieurs à 0')
+
+        cibles = []
+        for cible in options['cible']:
+            nom, separateur, url = cible.partition('=')
+            if not separateur:
+                nom, url = cible, cible
+            cibles.append((nom, url))
+
+        entetes = {'Authorization': f"Bearer {options['jeton']}"} if options['jeton'] else {}
+        requetes = [('GET', chemin, None, entetes) for chemin in options['chemin'] or CHEMINS_DEFAUT]
+        if options['quitus']:
+            corps = json.dumps({'code_quitus': options['quitus']}).encode()
+            requetes.append(('POST', '/api/auth/verify-quitus/', corps, entetes))
+
+        self.verifier_descripteurs(options['clients'])
+        self.stdout.write(
+            f"\n🔄 {options['clients']} client(s) simultané(s), {options['requetes']} requête(s) par cible, "
+            f"{len(requetes)} endpoint(s) en alternance\n"
+        )
+        self.stdout.write(
+            f"{'Cible':<12}{'req/s':>9}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}"
+            f"{'connectés':>11}{'erreurs':>9}  statuts"
+        )
+        for nom, url in cibles:
+            # Échauffement hors mesure : caches (registre, catalogue) et connexions des workers
+            asyncio.run(Campagne(url, requetes, 1, len(requetes), options['delai']).lancer())
+
+            campagne = Campagne(url, requetes, options['clients'], options['requetes'], options['delai'])
+            duree = asyncio.run(campagne.lancer())
+            self.afficher(nom, campagne, duree)
+
+        self.stdout.write(self.style.SUCCESS('\n✅ Mesure terminée (latences vues par le client, attente de connexion comprise)'))
+
+    def verifier_descripteurs(self, clients):
+        """Chaque client garde un socket ouvert : relève la limite de fichiers ouverts si possible"""
+        souple, dure = resource.getrlimit(resource.RLIMIT_NOFILE)
+        besoin = clients + 64
+        if souple >= besoin:
+            return
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (min(besoin, dure), dure))
+        except (ValueError, OSError):
+            pass
+        if resource.getrlimit(resource.RLIMIT_NOFILE)[0] < besoin:
+            self.stdout.write(self.style.WARNING(
+                f'⚠️  Limite de fichiers ouverts ({souple}) inférieure à {besoin} : augmentez ulimit -n'
+            ))
+
+    def afficher(self, nom, campagne, duree):
+        erreurs = sum(campagne.erreurs.values())
+        statuts = ' '.join(f'{code}:{nombre}' for code, nombre in sorted(campagne.statuts.items()))
+        if not campagne.durees:
+            self.stdout.write(f'{nom:<12}{"—":>9}  aucune réponse ({dict(campagne.erreurs)})')
+            return
+
+        durees = sorted(campagne.durees)
+
+        def centile(p):
+            return durees[min(len(durees) - 1, int(len(durees) * p))]
+
+        self.stdout.write(
+            f'{nom:<12}{len(durees) / duree:>9.0f}'
+            f'{statistics.median(durees):>8.1f}ms{centile(0.95):>8.1f}ms{centile(0.99):>8.1f}ms{durees[-1]:>8.1f}ms'
+            f'{campagne.connectes:>11}{erreurs:>9}  {statuts}'
+        )
+        if erreurs:
+            self.stdout.write(f"{'':<12}erreurs : {dict(campagne.erreurs)}")
@@ -0,0 +1,95 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from authentication.models import User
+from sgee_project.middleware import brotli
+
+ENDPOINTS_PAR_DEFAUT = [
+    '/api/auth/users/',
+    '/api/auth/action-logs/',
+    '/api/candidats/respfiliere/mes-candidats/',
+    '/api/config/bootstrap/',
+    '/api/config/filieres/',
+    '/api/epreuves/',
+]
+
+
+def percentile(valeurs, p):
+    valeurs = sorted(valeurs)
+    index = max(0, min(len(valeurs) - 1, round(p / 100 * len(valeurs)) - 1))
+    return valeurs[index]
+
+
+class Command(BaseCommand):
+    help = 'Mesure la taille sur le réseau et la latence (p50/p95) des réponses API avec et sans compression'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--email',
+            help="Utilisateur pour le jeton JWT (défaut: premier superadmin actif)"
+        )
+        parser.add_argument(
+            '--endpoint',
+            action='append',
+            dest='endpoints',
+            help='Endpoint à mesurer (répétable, défaut: payloads typiques du dashboard)'
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=30,
+            help='Nombre de requêtes par endpoint et par encodage (défaut: 30)'
+        )
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        if iterations <= 0:
+            raise CommandError("Le nombre d'itérations doit être supérieur à 0")
+
+        if options['email']:
+            user = User.objects.filter(email=options['email']).first()
+        else:
+            user = User.objects.filter(role='super_admin', is_active=True).first()
+        if user is None:
+            raise CommandError('Aucun utilisateur trouvé pour générer le jeton JWT')
+
+        token = str(RefreshToken.for_user(user).access_token)
+        client = Client(HTTP_HOST='localhost', HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        encodages = ['identity', 'gzip'] + (['br'] if brotli is not None else [])
+
+        self.stdout.write(f'🔄 Benchmark compression ({iterations} requêtes / cas) en tant que {user.email}')
+        if brotli is None:
+            self.stdout.write(self.style.WARNING('⚠️  Module brotli absent : seul gzip est mesuré'))
+        self.stdout.write('')
+        self.stdout.write(
+            f'{"Endpoint":<45} {"Enc.":<9} {"HTTP":>4} {"Octets":>10} {"Ratio":>7} {"p50 ms":>8} {"p95 ms":>8}'
+        )
+        self.stdout.write('-' * 97)
+
+        for endpoint in options['endpoints'] or ENDPOINTS_PAR_DEFAUT:
+            reference = None
+            for encodage in encodages:
+                durees = []
+                response = None
+                for _ in range(iterations):
+                    debut = time.perf_counter()
+                    response = client.get(endpoint, HTTP_ACCEPT_ENCODING=encodage)
+                    durees.append((time.perf_counter() - debut) * 1000)
+
+                taille = len(response.content)
+                if reference is None:
+                    reference = taille or 1
+                ratio = f'{taille / reference:.0%}'
+
+                self.stdout.write(
+                    f'{endpoint:<45} {response.get("Content-Encoding", "identity"):<9} '
+                    f'{response.status_code:>4} {taille:>10,} {ratio:>7} '
+                    f'{statistics.median(durees):>8.2f} {percentile(durees, 95):>8.2f}'
+                )
+
+        self.stdout.write(self.style.SUCCESS('\n✅ Benchmark terminé'))
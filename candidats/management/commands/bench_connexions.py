@@ -0,0 +1,99 @@
+import statistics
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import request_finished, request_started
+from django.db import connection, connections
+
+from authentication.models import User
+
+ENGINE_POOL = 'sgee_project.mysql_pool'
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure les requêtes/seconde selon la politique de connexion à la base "
+        "(une connexion par requête, connexions persistantes, pool)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requetes', type=int, default=500, help='Requêtes simulées par mode (défaut: 500)')
+        parser.add_argument('--threads', type=int, default=1, help='Threads simultanés, comme un worker threadé (défaut: 1)')
+        parser.add_argument(
+            '--requetes-sql', type=int, default=3,
+            help='Requêtes SQL par requête simulée (défaut: 3)'
+        )
+
+    def handle(self, *args, **options):
+        if options['requetes'] <= 0 or options['threads'] <= 0:
+            raise CommandError('--requetes et --threads doivent être supérieurs à 0')
+
+        reglages = connections.settings['default']
+        if connection.vendor != 'mysql':
+            self.stdout.write(self.style.WARNING(
+                f'⚠️  Base {connection.vendor} : la connexion y est presque gratuite, '
+                'la mesure n\'a de sens que contre MySQL/MariaDB'
+            ))
+
+        modes = [
+            ('Une connexion par requête', {'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False, 'POOL_TAILLE': 0}),
+            ('Persistantes (60 s)', {'CONN_MAX_AGE': 60, 'CONN_HEALTH_CHECKS': False, 'POOL_TAILLE': 0}),
+            ('Persistantes (60 s) + vérification', {'CONN_MAX_AGE': 60, 'CONN_HEALTH_CHECKS': True, 'POOL_TAILLE': 0}),
+        ]
+        if reglages['ENGINE'] == ENGINE_POOL:
+            modes.append(('Pool', {'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False, 'POOL_TAILLE': options['threads']}))
+        else:
+            self.stdout.write(f'ℹ️  Mode pool ignoré : DB_POOL_TAILLE=0 (ENGINE {reglages["ENGINE"]})')
+
+        origine = {cle: reglages.get(cle) for cle in ('CONN_MAX_AGE', 'CONN_HEALTH_CHECKS', 'POOL_TAILLE')}
+        self.stdout.write(
+            f"\n🔄 {options['requetes']} requête(s) par mode, {options['threads']} thread(s), "
+            f"{options['requetes_sql']} requête(s) SQL chacune\n"
+        )
+        self.stdout.write(f"{'Mode':<40}{'req/s':>10}{'moyenne':>12}{'p99':>12}")
+        try:
+            for libelle, parametres in modes:
+                connections.close_all()
+                reglages.update(parametres)
+                debit, durees = self.mesurer(options['requetes'], options['threads'], options['requetes_sql'])
+                durees.sort()
+                p99 = durees[min(len(durees) - 1, int(len(durees) * 0.99))]
+                self.stdout.write(
+                    f'{libelle:<40}{debit:>10.0f}{statistics.mean(durees):>10.2f}ms{p99:>10.2f}ms'
+                )
+        finally:
+            connections.close_all()
+            reglages.update(origine)
+
+        self.stdout.write(self.style.SUCCESS('\n✅ Mesure terminée'))
+
+    def mesurer(self, total, nb_threads, requetes_sql):
+        """(requêtes/seconde, durées en ms) d'un cycle requête complet, signaux compris"""
+        durees = []
+        verrou = threading.Lock()
+
+        def travailleur(nombre):
+            locales = []
+            try:
+                for _ in range(nombre):
+                    debut = time.perf_counter()
+                    # Comme le handler WSGI : close_old_connections en début et en fin de requête
+                    request_started.send(sender=self.__class__)
+                    for _ in range(requetes_sql):
+                        User.objects.only('pk').order_by('pk').first()
+                    request_finished.send(sender=self.__class__)
+                    locales.append((time.perf_counter() - debut) * 1000)
+            finally:
+                connection.close()
+                with verrou:
+                    durees.extend(locales)
+
+        parts = [total // nb_threads + (1 if i < total % nb_threads else 0) for i in range(nb_threads)]
+        threads = [threading.Thread(target=travailleur, args=(n,)) for n in parts if n]
+        debut = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return total / (time.perf_counter() - debut), durees
@@ -0,0 +1,160 @@
+import contextlib
+import logging
+import statistics
+import tempfile
+import time
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+
+from sgee_project.logutils import EchantillonnageDebug, FormateurJSON, mettre_en_file
+
+CHAMPS = {
+    'nom': 'NGUEMA', 'prenom': 'Paul', 'date_naissance': '2005-01-01', 'lieu_naissance': 'Yaoundé',
+    'sexe': 'M', 'telephone': '690000000', 'email': 'paul@example.cm', 'adresse': 'Bastos',
+    'nom_pere': 'NGUEMA Jean', 'tel_pere': '690000001', 'nom_mere': 'ABENA Marie', 'tel_mere': '690000002',
+    'region_id': '3', 'departement_id': '12', 'bac_id': '1', 'serie_id': '2', 'mention_id': '3',
+    'filiere_id': '4', 'niveau_id': '1', 'centre_examen_id': '2', 'centre_depot_id': '1',
+    'annee_obtention_diplome': '2024', 'code_quitus': 'ABCD-1234-EFGH',
+}
+
+
+def requete_enrollement():
+    """Requête multipart comparable à une soumission d'enrôlement réelle"""
+    fichiers = {
+        nom: SimpleUploadedFile(f'{nom}.jpg', b'\xff' * 20000, content_type='image/jpeg')
+        for nom in ('photo_file', 'cni_file', 'diplome_file')
+    }
+    request = RequestFactory().post('/api/candidats/enrollement/', data={**CHAMPS, **fichiers})
+    request.POST, request.FILES  # analyse du multipart hors mesure
+    return request
+
+
+def traces_print(request):
+    """Ce qu'enrollement_view et CandidatEnrollementSerializer affichaient à chaque appel"""
+    print(f"\n{'='*80}")
+    print("👤 USER AUTHENTIFIÉ: paul@example.cm (role: candidat)")
+    print(f"{'='*80}")
+    print("📋 Aucun candidat trouvé")
+    print(f"\n📂 FICHIERS REÇUS ({len(request.FILES)}):")
+    for key, file in request.FILES.items():
+        print(f"  ✅ {key}: {file.name} ({file.size} bytes)")
+    print(f"\n📥 DONNÉES ({len(request.POST)}):")
+    for key, value in request.POST.items():
+        print(f"  📝 {key}: {value}")
+    print("\n🔍 VALIDATION...")
+    print("✅ VALIDATION OK")
+    print("\n💾 SAUVEGARDE...")
+    print(f"\n{'='*80}")
+    print("🚀 DÉBUT SAUVEGARDE CANDIDAT")
+    for key, value in request.POST.items():
+        print(f"  ✅ {key}: {value}")
+    print(f"\n{'='*80}")
+    print("✅ ENRÔLEMENT COMPLET: CAND20260000426")
+    print("✅ SUCCÈS: CAND20260000426 | Statut: complet")
+
+
+def traces_logging(logger, request):
+    """Journalisation actuelle d'enrollement_view"""
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug('Enrôlement soumis', extra={
+            'user_id': 1,
+            'champs': sorted(request.POST.keys()),
+            'fichiers': {key: file.size for key, file in request.FILES.items()},
+        })
+    logger.info('Enrôlement enregistré', extra={'user_id': 1, 'candidat_id': 1, 'statut': 'complet'})
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare le surcoût par requête d'enrôlement des anciens print() et de la "
+        "journalisation structurée (synchrone, en file, avec et sans DEBUG)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=2000, help='Requêtes simulées par mode (défaut: 2000)')
+        parser.add_argument(
+            '--sortie',
+            help="Fichier recevant les traces (défaut: fichier temporaire, tamponné par ligne comme "
+                 "une sortie standard non tamponnée)"
+        )
+        parser.add_argument(
+            '--echantillon', type=float, default=0.01,
+            help='Part des DEBUG gardés pour le mode « debug échantillonné » (défaut: 0.01)'
+        )
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        if iterations <= 0:
+            raise CommandError('--iterations doit être supérieur à 0')
+
+        request = requete_enrollement()
+        chemin = options['sortie'] or tempfile.NamedTemporaryFile(prefix='bench_logging_', delete=False).name
+        self.stdout.write(f'🔄 {iterations} requête(s) par mode, traces écrites dans {chemin}\n')
+
+        with open(chemin, 'w', buffering=1, encoding='utf-8') as sortie:
+            resultats = [
+                ('print()', self.mesurer_print(request, sortie, iterations), 0),
+                ('logging synchrone, DEBUG',
+                 *self.mesurer_logging(request, sortie, iterations, logging.DEBUG, en_file=False)),
+                ('logging en file, DEBUG',
+                 *self.mesurer_logging(request, sortie, iterations, logging.DEBUG)),
+                (f"logging en file, DEBUG échantillonné ({options['echantillon']:g})",
+                 *self.mesurer_logging(request, sortie, iterations, logging.DEBUG, taux=options['echantillon'])),
+                ('logging en file, INFO',
+                 *self.mesurer_logging(request, sortie, iterations, logging.INFO)),
+            ]
+
+        reference = statistics.mean(resultats[0][1])
+        self.stdout.write(f"{'Mode':<48}{'moyenne':>10}{'p50':>10}{'p99':>10}{'gain':>8}")
+        for libelle, durees, vidage in resultats:
+            durees = sorted(durees)
+            moyenne = statistics.mean(durees)
+            p99 = durees[min(len(durees) - 1, int(len(durees) * 0.99))]
+            self.stdout.write(
+                f'{libelle:<48}{moyenne:>8.1f}µs{statistics.median(durees):>8.1f}µs{p99:>8.1f}µs'
+                f'{reference / moyenne:>7.1f}x'
+                + (f'   (vidage de la file : {vidage:.0f} ms)' if vidage else '')
+            )
+        self.stdout.write(self.style.SUCCESS('\n✅ Mesure terminée (durées par requête, hors traitement métier)'))
+
+    def mesurer_print(self, request, sortie, iterations):
+        durees = []
+        with contextlib.redirect_stdout(sortie):
+            for _ in range(iterations):
+                debut = time.perf_counter()
+                traces_print(request)
+                durees.append((time.perf_counter() - debut) * 1e6)
+        return durees
+
+    def mesurer_logging(self, request, sortie, iterations, niveau, en_file=True, taux=1.0):
+        """(durées en µs, temps d'écriture restant après la dernière requête en ms)"""
+        handler = logging.StreamHandler(sortie)
+        handler.setFormatter(FormateurJSON())
+        handler.addFilter(EchantillonnageDebug(taux))
+        if en_file:
+            handler = mettre_en_file(handler)
+
+        logger = logging.getLogger('bench_logging')
+        logger.handlers = [handler]
+        logger.propagate = False
+        logger.setLevel(niveau)
+
+        durees = []
+        try:
+            for _ in range(iterations):
+                debut = time.perf_counter()
+                traces_logging(logger, request)
+                durees.append((time.perf_counter() - debut) * 1e6)
+        finally:
+            debut = time.perf_counter()
+            if en_file:
+                handler.queue.join()
+            vidage = (time.perf_counter() - debut) * 1000 if en_file else 0
+            if en_file and handler.perdus:
+                self.stdout.write(self.style.WARNING(
+                    f'⚠️  {handler.perdus} enregistrement(s) perdu(s) (file pleine) : réduisez --iterations'
+                ))
+            logger.handlers = []
+        return durees, vidage
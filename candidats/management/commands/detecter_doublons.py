@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from candidats.doublons import detecter_tout, recalculer_cles
+from candidats.models import DoublonCandidat
+
+
+class Command(BaseCommand):
+    help = 'Détecte les candidats inscrits plusieurs fois et alimente la file de revue des doublons'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--recalculer-cles',
+            action='store_true',
+            help='Recalcule la clé phonétique de tous les candidats (après un changement d\'algorithme)'
+        )
+        parser.add_argument(
+            '--taille-lot',
+            type=int,
+            default=5000,
+            help='Taille des lots de lecture et d\'écriture (défaut: 5000)'
+        )
+
+    def handle(self, *args, **options):
+        taille_lot = options['taille_lot']
+        if taille_lot <= 0:
+            raise CommandError('--taille-lot doit être supérieur à 0')
+
+        debut = time.perf_counter()
+        cles = recalculer_cles(tous=options['recalculer_cles'], taille_lot=taille_lot)
+        if cles:
+            self.stdout.write(f'🔑 {cles} clé(s) phonétique(s) calculée(s)')
+
+        self.stdout.write('🔄 Recherche des doublons...')
+        avant = DoublonCandidat.objects.count()
+        candidats, blocs, paires = detecter_tout(taille_lot=taille_lot)
+        nouvelles = DoublonCandidat.objects.count() - avant
+        duree = time.perf_counter() - debut
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\n✅ {candidats} candidat(s) analysé(s) en {duree:.1f}s'
+        ))
+        self.stdout.write(f'   • Blocs comparés: {blocs}')
+        self.stdout.write(f'   • Paires au-dessus du seuil: {paires}')
+        self.stdout.write(f'   • Nouvelles paires à vérifier: {nouvelles}')
+        en_attente = DoublonCandidat.objects.filter(statut='a_verifier').count()
+        if en_attente:
+            self.stdout.write(self.style.WARNING(f'\n⚠️  {en_attente} doublon(s) présumé(s) en attente de revue'))
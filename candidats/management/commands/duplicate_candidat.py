@@ -29,7 +29,7 @@ class Command(BaseCommand):
             for i in range(count):
                 # Générer un nouveau matricule
                 random_suffix = ''.join(random.choices(string.digits, k=5))
-                nouveau_matricule = f'CAND2026{random_suffix}'
+                nouveau_matricule = Candidat.generer_matricule()
                 
                 # Dupliquer le candidat
                 nouveau_candidat = Candidat.objects.create(
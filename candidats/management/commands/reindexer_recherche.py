@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from candidats.models import Candidat
+from candidats.recherche import indexer_lot
+
+
+class Command(BaseCommand):
+    help = "Reconstruit l'index de recherche des candidats (table candidat_recherche)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--taille-lot',
+            type=int,
+            default=2000,
+            help='Nombre de candidats traités par lot (défaut: 2000)'
+        )
+
+    def handle(self, *args, **options):
+        taille_lot = options['taille_lot']
+        if taille_lot <= 0:
+            raise CommandError('--taille-lot doit être supérieur à 0')
+
+        candidats = Candidat.objects.only('id', 'nom', 'prenom', 'matricule', 'email').order_by('pk')
+        total = Candidat.objects.count()
+        self.stdout.write(f'🔄 Indexation de {total} candidat(s)...')
+
+        debut = time.perf_counter()
+        traites = jetons = 0
+        dernier_pk = 0
+        while True:
+            lot = list(candidats.filter(pk__gt=dernier_pk)[:taille_lot])
+            if not lot:
+                break
+            jetons += indexer_lot(lot)
+            traites += len(lot)
+            dernier_pk = lot[-1].pk
+            self.stdout.write(f'   {traites}/{total}', ending='\r')
+        duree = time.perf_counter() - debut
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\n✅ {traites} candidat(s) indexé(s), {jetons} jeton(s) en {duree:.1f}s'
+        ))
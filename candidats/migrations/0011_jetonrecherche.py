@@ -0,0 +1,29 @@
+# Generated by Django 5.1.4 on 2026-10-19 18:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidats', '0010_notification_remove_enrollmenthistory_bac_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JetonRecherche',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jeton', models.CharField(max_length=100)),
+                ('champ', models.CharField(choices=[('nom', 'Nom'), ('prenom', 'Prénom'), ('matricule', 'Matricule'), ('email', 'Email')], max_length=10)),
+                ('candidat', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='jetons_recherche', to='candidats.candidat')),
+            ],
+            options={
+                'verbose_name': 'Jeton de recherche',
+                'verbose_name_plural': 'Jetons de recherche',
+                'db_table': 'candidat_recherche',
+                'indexes': [models.Index(fields=['jeton', 'candidat'], name='candidat_recherche_jeton_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.1.4 on 2026-10-19 18:11
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0006_codequitus_expire'),
+        ('candidats', '0011_jetonrecherche'),
+        ('configurations', '0008_alter_filiere_options_filiere_campus_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DoublonCandidat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(help_text='Similarité des noms (0 à 1)')),
+                ('statut', models.CharField(choices=[('a_verifier', 'À vérifier'), ('confirme', 'Doublon confirmé'), ('ecarte', 'Écarté')], default='a_verifier', max_length=20)),
+                ('traite_le', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Doublon présumé',
+                'verbose_name_plural': 'Doublons présumés',
+                'db_table': 'candidat_doublons',
+                'ordering': ['-score', '-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='candidat',
+            name='cle_phonetique',
+            field=models.CharField(blank=True, default='', editable=False, max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='candidat',
+            index=models.Index(fields=['cle_phonetique', 'date_naissance'], name='candidat_bloc_doublon_idx'),
+        ),
+        migrations.AddField(
+            model_name='doubloncandidat',
+            name='candidat',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='doublons_presumes', to='candidats.candidat'),
+        ),
+        migrations.AddField(
+            model_name='doubloncandidat',
+            name='doublon_de',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='candidats.candidat'),
+        ),
+        migrations.AddField(
+            model_name='doubloncandidat',
+            name='traite_par',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='doublons_traites', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='doubloncandidat',
+            index=models.Index(fields=['statut'], name='candidat_do_statut_6a647e_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='doubloncandidat',
+            constraint=models.UniqueConstraint(fields=('candidat', 'doublon_de'), name='candidat_doublon_unique'),
+        ),
+    ]
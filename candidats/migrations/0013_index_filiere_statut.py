@@ -0,0 +1,29 @@
+# Generated by Django 5.1.4 on 2026-10-19 18:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0006_codequitus_expire'),
+        ('candidats', '0012_doublons'),
+        ('configurations', '0008_alter_filiere_options_filiere_campus_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='candidat',
+            name='candidat_statut__944784_idx',
+        ),
+        migrations.AddIndex(
+            model_name='candidat',
+            index=models.Index(fields=['filiere', 'statut_dossier', 'created_at'], name='candidat_filiere_statut_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidat',
+            index=models.Index(fields=['statut_dossier', 'created_at'], name='candidat_statut_date_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.4 on 2026-10-19 18:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidats', '0013_index_filiere_statut'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['candidat', 'is_read'], name='notification_non_lues_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['candidat', 'created_at'], name='notification_candidat_date_idx'),
+        ),
+    ]
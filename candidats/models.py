@@ -1,10 +1,10 @@
 from django.db import models
 from django.conf import settings
 from django.utils import timezone
+from configurations import sequences
 from configurations.models import AnneeScolaire
 from authentication.models import CodeQuitus 
-import random
-import string
+from .utils.phonetique import cle_phonetique
 
 class Region(models.Model):
     nom = models.CharField(max_length=100)
@@ -149,6 +149,9 @@ class Candidat(models.Model):
     # Statut
     statut_dossier = models.CharField(max_length=20, choices=STATUT_CHOICES, default='incomplet')
     
+    # Détection des doublons (voir candidats/doublons.py)
+    cle_phonetique = models.CharField(max_length=10, blank=True, default='', editable=False)
+    
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -159,7 +162,11 @@ class Candidat(models.Model):
         indexes = [
             models.Index(fields=['matricule']),
             models.Index(fields=['nom', 'prenom']),
-            models.Index(fields=['statut_dossier']),
+            # Listes et statistiques par filière (mes_candidats, tableaux de bord, exports)
+            models.Index(fields=['filiere', 'statut_dossier', 'created_at'], name='candidat_filiere_statut_idx'),
+            # Dossiers par statut et ancienneté (remplace l'index sur statut_dossier seul)
+            models.Index(fields=['statut_dossier', 'created_at'], name='candidat_statut_date_idx'),
+            models.Index(fields=['cle_phonetique', 'date_naissance'], name='candidat_bloc_doublon_idx'),
         ]
 
     def __str__(self):
@@ -168,14 +175,15 @@ class Candidat(models.Model):
     def save(self, *args, **kwargs):
         if not self.matricule:
             self.matricule = self.generer_matricule()
+        self.cle_phonetique = cle_phonetique(self.nom)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'nom' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'cle_phonetique'}
         super().save(*args, **kwargs)
 
     @staticmethod
     def generer_matricule():
-        import datetime
-        annee = datetime.datetime.now().year
-        code = ''.join(random.choices(string.digits, k=5))
-        return f"CAND{annee}{code}"
+        return sequences.allouer('CAND')
 class Dossier(models.Model):
     STATUT_CHOICES = [
         ('ouvert', 'Ouvert'),
@@ -216,10 +224,7 @@ class Dossier(models.Model):
 
     @staticmethod
     def generer_numero_dossier():
-        import datetime
-        annee = datetime.datetime.now().year
-        code = ''.join(random.choices(string.digits, k=5))
-        return f"DOS{annee}{code}"
+        return sequences.allouer('DOS')
 
 class Document(models.Model):
     TYPE_CHOICES = [
@@ -291,7 +296,84 @@ class Notification(models.Model):
         ordering = ['-created_at']
         verbose_name = 'Notification'
         verbose_name_plural = 'Notifications'
+        indexes = [
+            # Compteur de non lues et liste paginée par curseur
+            models.Index(fields=['candidat', 'is_read'], name='notification_non_lues_idx'),
+            models.Index(fields=['candidat', 'created_at'], name='notification_candidat_date_idx'),
+        ]
     
     def __str__(self):
         return f"{self.titre} - {self.candidat.matricule}"
 
+
+
+class JetonRecherche(models.Model):
+    """
+    Index de recherche des candidats : un jeton normalisé (minuscules, sans
+    accents) par mot du nom, du prénom, de l'email et le matricule entier.
+    Maintenu par candidats/recherche.py (voir candidats/signals.py).
+    """
+    CHAMP_CHOICES = [
+        ('nom', 'Nom'),
+        ('prenom', 'Prénom'),
+        ('matricule', 'Matricule'),
+        ('email', 'Email'),
+    ]
+
+    candidat = models.ForeignKey(Candidat, on_delete=models.CASCADE, related_name='jetons_recherche')
+    jeton = models.CharField(max_length=100)
+    champ = models.CharField(max_length=10, choices=CHAMP_CHOICES)
+
+    class Meta:
+        db_table = 'candidat_recherche'
+        verbose_name = 'Jeton de recherche'
+        verbose_name_plural = 'Jetons de recherche'
+        indexes = [
+            # Recherche par préfixe (LIKE 'xxx%') puis regroupement par candidat
+            models.Index(fields=['jeton', 'candidat'], name='candidat_recherche_jeton_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.jeton} ({self.champ})"
+
+
+class DoublonCandidat(models.Model):
+    """
+    File de revue des doublons présumés : deux candidats de même clé
+    phonétique et de même date de naissance dont les noms sont proches.
+    La paire est stockée avec candidat.id < doublon_de.id.
+    """
+    STATUT_CHOICES = [
+        ('a_verifier', 'À vérifier'),
+        ('confirme', 'Doublon confirmé'),
+        ('ecarte', 'Écarté'),
+    ]
+
+    candidat = models.ForeignKey(Candidat, on_delete=models.CASCADE, related_name='doublons_presumes')
+    doublon_de = models.ForeignKey(Candidat, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField(help_text="Similarité des noms (0 à 1)")
+    statut = models.CharField(max_length=20, choices=STATUT_CHOICES, default='a_verifier')
+    traite_par = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='doublons_traites'
+    )
+    traite_le = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'candidat_doublons'
+        verbose_name = 'Doublon présumé'
+        verbose_name_plural = 'Doublons présumés'
+        ordering = ['-score', '-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['candidat', 'doublon_de'], name='candidat_doublon_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['statut']),
+        ]
+
+    def __str__(self):
+        return f"{self.candidat} ≈ {self.doublon_de} ({self.score:.2f})"
@@ -0,0 +1,150 @@
+# candidats/recherche.py
+"""
+Recherche plein texte des candidats.
+
+Chaque candidat est décomposé en jetons normalisés (minuscules, accents
+retirés) stockés dans JetonRecherche avec un index sur (jeton, candidat).
+Une recherche devient une suite de parcours d'index par préfixe
+(LIKE 'terme%'), au lieu de LIKE '%terme%' sur toute la table candidat.
+
+Tous les termes de la requête doivent correspondre (ET). Le score vaut 2
+par terme trouvé exactement et 1 par terme trouvé en préfixe.
+"""
+import re
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Max, Q, Value, When
+
+from .models import Candidat, JetonRecherche
+from .utils.phonetique import normaliser
+
+CHAMPS_INDEXES = ('nom', 'prenom', 'matricule', 'email')
+LONGUEUR_JETON = 100
+TERMES_MAX = 5
+# En dessous, un terme n'est comparé qu'exactement (un préfixe d'une lettre couvre trop de lignes)
+LONGUEUR_PREFIXE_MIN = 2
+
+_MOTS = re.compile(r'[a-z0-9]+')
+
+
+def decouper(texte):
+    """Mots normalisés d'un texte libre"""
+    return _MOTS.findall(normaliser(texte))
+
+
+def jetons_candidat(candidat):
+    """Couples (jeton, champ) à indexer pour un candidat"""
+    jetons = set()
+    for champ in ('nom', 'prenom'):
+        for mot in decouper(getattr(candidat, champ)):
+            jetons.add((mot[:LONGUEUR_JETON], champ))
+
+    matricule = ''.join(decouper(candidat.matricule))
+    if matricule:
+        jetons.add((matricule[:LONGUEUR_JETON], 'matricule'))
+
+    email = normaliser(candidat.email)
+    if email:
+        # Adresse complète + mots de la partie locale (pas le domaine, commun à tous)
+        jetons.add((email[:LONGUEUR_JETON], 'email'))
+        for mot in decouper(email.split('@')[0]):
+            jetons.add((mot[:LONGUEUR_JETON], 'email'))
+    return jetons
+
+
+def _lignes(candidat):
+    return [
+        JetonRecherche(candidat_id=candidat.pk, jeton=jeton, champ=champ)
+        for jeton, champ in jetons_candidat(candidat)
+    ]
+
+
+def indexer_candidat(candidat):
+    """Remplace les jetons d'un candidat"""
+    with transaction.atomic():
+        JetonRecherche.objects.filter(candidat_id=candidat.pk).delete()
+        JetonRecherche.objects.bulk_create(_lignes(candidat))
+
+
+def indexer_lot(candidats):
+    """Réindexe une liste de candidats en deux requêtes. Retourne le nombre de jetons."""
+    lignes = [ligne for candidat in candidats for ligne in _lignes(candidat)]
+    with transaction.atomic():
+        JetonRecherche.objects.filter(candidat_id__in=[c.pk for c in candidats]).delete()
+        JetonRecherche.objects.bulk_create(lignes, batch_size=1000)
+    return len(lignes)
+
+
+def _termes(requete):
+    termes = []
+    for mot in normaliser(requete).split():
+        # Une adresse email est indexée entière : gardée d'un seul tenant
+        for terme in [mot] if '@' in mot else decouper(mot):
+            terme = terme[:LONGUEUR_JETON]
+            if terme not in termes:
+                termes.append(terme)
+    return termes[:TERMES_MAX]
+
+
+def _correspondances(termes, filiere_id=None):
+    """
+    Une ligne par candidat (candidat_id, score) possédant tous les termes.
+    GROUP BY / HAVING sur les seuls jetons trouvés par l'index.
+    """
+    condition = Q()
+    scores = {}
+    for i, terme in enumerate(termes):
+        if len(terme) >= LONGUEUR_PREFIXE_MIN:
+            condition |= Q(jeton__startswith=terme)
+            cas = Case(
+                When(jeton=terme, then=Value(2)),
+                When(jeton__startswith=terme, then=Value(1)),
+                default=Value(0),
+                output_field=IntegerField(),
+            )
+        else:
+            condition |= Q(jeton=terme)
+            cas = Case(When(jeton=terme, then=Value(2)), default=Value(0), output_field=IntegerField())
+        scores[f't{i}'] = Max(cas)
+
+    jetons = JetonRecherche.objects.filter(condition)
+    if filiere_id is not None:
+        jetons = jetons.filter(candidat__filiere_id=filiere_id)
+
+    score = sum((F(nom) for nom in scores), Value(0))
+    return (
+        jetons.values('candidat_id')
+        .annotate(**scores)
+        .filter(**{f'{nom}__gt': 0 for nom in scores})
+        .annotate(score=score)
+    )
+
+
+def rechercher(requete, filiere_id=None, limite=20):
+    """Candidats correspondant à la requête, du plus pertinent au moins pertinent"""
+    termes = _termes(requete)
+    if not termes:
+        return []
+
+    classement = list(
+        _correspondances(termes, filiere_id)
+        .order_by('-score', '-candidat_id')
+        .values_list('candidat_id', 'score')[:limite]
+    )
+    candidats = Candidat.objects.select_related('filiere').in_bulk([pk for pk, _ in classement])
+
+    resultats = []
+    for pk, score in classement:
+        candidat = candidats.get(pk)
+        if candidat is not None:
+            candidat.score = score
+            resultats.append(candidat)
+    return resultats
+
+
+def filtrer(queryset, requete):
+    """Restreint un queryset de candidats à ceux qui correspondent à la requête"""
+    termes = _termes(requete)
+    if not termes:
+        return queryset
+    return queryset.filter(pk__in=_correspondances(termes).values('candidat_id'))
@@ -54,13 +54,8 @@ class CandidatEnrollementSerializer(serializers.Serializer):
         
         user = self.context['request'].user
         
-        print(f"\n{'='*80}")
-        print(f"🚀 DÉBUT SAUVEGARDE CANDIDAT")
-        print(f"{'='*80}")
-        
         # ✅ 1. RÉCUPÉRER OU CRÉER CANDIDAT
         candidat, created = Candidat.objects.get_or_create(user=user)
-        print(f"📋 Candidat {'créé' if created else 'existant'}: {candidat.matricule}")
         
         # ✅ 2. EXTRAIRE LES FICHIERS AVANT DE LES SUPPRIMER DE validated_data
         photo_file = validated_data.pop('photo_file')
@@ -68,11 +63,6 @@ class CandidatEnrollementSerializer(serializers.Serializer):
         diplome_file = validated_data.pop('diplome_file')
         code_quitus = validated_data.pop('code_quitus')
         
-        print(f"\n📂 FICHIERS EXTRAITS:")
-        print(f"  📸 Photo: {photo_file.name} ({photo_file.size} bytes)")
-        print(f"  🆔 CNI: {cni_file.name} ({cni_file.size} bytes)")
-        print(f"  🎓 Diplôme: {diplome_file.name} ({diplome_file.size} bytes)")
-        
         # ✅ 3. EXTRAIRE LES IDs DES FOREIGNKEYS
         region_id = validated_data.pop('region_id')
         departement_id = validated_data.pop('departement_id')
@@ -87,7 +77,6 @@ class CandidatEnrollementSerializer(serializers.Serializer):
         # ✅ 4. SAUVEGARDER TOUS LES CHAMPS SIMPLES
         for key, value in validated_data.items():
             setattr(candidat, key, value)
-            print(f"  ✅ {key}: {value}")
         
         # ✅ 5. ASSIGNER LES FOREIGNKEYS
         candidat.region_id = region_id
@@ -100,12 +89,6 @@ class CandidatEnrollementSerializer(serializers.Serializer):
         candidat.centre_examen_id = centre_examen_id
         candidat.centre_depot_id = centre_depot_id
         
-        print(f"\n🔗 FOREIGNKEYS ASSIGNÉES:")
-        print(f"  📍 Région: {region_id}, Département: {departement_id}")
-        print(f"  🎓 BAC: {bac_id}, Série: {serie_id}, Mention: {mention_id}")
-        print(f"  📚 Filière: {filiere_id}, Niveau: {niveau_id}")
-        print(f"  🏛️ Centre examen: {centre_examen_id}, Centre dépôt: {centre_depot_id}")
-        
         # ✅ 6. SAUVEGARDER PHYSIQUEMENT LA PHOTO ET METTRE À JOUR LE CHEMIN
         photo_dir = f"documents/photos/{candidat.matricule}"
         full_photo_dir = os.path.join(settings.MEDIA_ROOT, photo_dir)
@@ -120,14 +103,11 @@ class CandidatEnrollementSerializer(serializers.Serializer):
                 destination.write(chunk)
         
         candidat.photo_path = photo_path
-        print(f"\n📸 PHOTO SAUVEGARDÉE: {photo_path}")
         
         # ✅ 7. MARQUER LE DOSSIER COMME COMPLET
         candidat.statut_dossier = 'complet'
         candidat.save()
         
-        print(f"\n💾 CANDIDAT SAUVEGARDÉ: {candidat.matricule}")
-        
         # ✅ 8. CRÉER LE DOSSIER
         annee = AnneeScolaire.objects.filter(is_active=True).first()
         dossier, created = Dossier.objects.get_or_create(
@@ -138,7 +118,6 @@ class CandidatEnrollementSerializer(serializers.Serializer):
                 'statut': 'soumis'
             }
         )
-        print(f"\n📁 DOSSIER {'créé' if created else 'existant'}: {dossier.numero_dossier}")
         
         # ✅ 9. SAUVEGARDER LES 3 DOCUMENTS (CNI, PHOTO, DIPLÔME)
         documents_data = [
@@ -147,7 +126,6 @@ class CandidatEnrollementSerializer(serializers.Serializer):
             (diplome_file, 'diplome', None)
         ]
         
-        print(f"\n📄 SAUVEGARDE DES DOCUMENTS:")
         for file_obj, doc_type, existing_path in documents_data:
             # Créer le répertoire pour chaque type de document
             doc_dir = f"documents/{doc_type}/{candidat.matricule}"
@@ -186,13 +164,6 @@ class CandidatEnrollementSerializer(serializers.Serializer):
                 extension=os.path.splitext(file_obj.name)[1],
                 mime_type=file_obj.content_type
             )
-            doc_created = True
-            
-            print(f"  ✅ {doc_type.upper()}: {file_path} ({'créé' if doc_created else 'existant'})")
-        
-        print(f"\n{'='*80}")
-        print(f"✅ ENRÔLEMENT COMPLET: {candidat.matricule}")
-        print(f"{'='*80}\n")
         
         return candidat
 # ✅ UNE SEULE DocumentSerializer (SUPPRIME l'autre)
@@ -0,0 +1,83 @@
+# candidats/signals.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from . import events
+from .models import Candidat, Notification
+from .recherche import CHAMPS_INDEXES, indexer_candidat
+from .utils.notifications import invalider_compteurs
+
+
+def _champs_indexes(instance):
+    # __dict__ : un champ différé non chargé n'a pas pu changer
+    return tuple(instance.__dict__.get(champ) for champ in CHAMPS_INDEXES)
+
+
+@receiver(post_init, sender=Candidat)
+def memoriser_champs_indexes(sender, instance, **kwargs):
+    instance._champs_indexes = _champs_indexes(instance)
+
+
+@receiver(post_save, sender=Candidat)
+def indexer_candidat_recherche(sender, instance, created, update_fields=None, **kwargs):
+    """Tient l'index de recherche à jour quand nom, prénom, matricule ou email changent"""
+    if update_fields is not None and not set(update_fields) & set(CHAMPS_INDEXES):
+        return
+    valeurs = _champs_indexes(instance)
+    if not created and valeurs == getattr(instance, '_champs_indexes', None):
+        return  # ex. simple changement de statut_dossier
+    indexer_candidat(instance)
+    instance._champs_indexes = valeurs
+
+
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+def invalider_compteur_notifications(sender, instance, **kwargs):
+    """Compteur de non lues à recalculer (après commit, pour ne pas relire l'ancien état)"""
+    candidat_id = instance.candidat_id
+    transaction.on_commit(lambda: invalider_compteurs([candidat_id]))
+
+
+@receiver(post_save, sender=Notification)
+def pousser_notification(sender, instance, created, **kwargs):
+    """Nouvelle notification → canal SSE du candidat"""
+    if not created:
+        return
+    donnees = {
+        'id': instance.id,
+        'titre': instance.titre,
+        'type': instance.type,
+        'action_url': instance.action_url,
+        'created_at': instance.created_at,
+    }
+    canal = events.canal_candidat(instance.candidat_id)
+    transaction.on_commit(lambda: events.publier(canal, 'notification', donnees))
+
+
+@receiver(post_init, sender=Candidat)
+def memoriser_statut(sender, instance, **kwargs):
+    # __dict__ : lire un champ différé (.only(), .defer()) relancerait une requête par ligne
+    instance._statut_initial = instance.__dict__.get('statut_dossier')
+
+
+@receiver(post_save, sender=Candidat)
+def pousser_statut_dossier(sender, instance, created, **kwargs):
+    """Changement de statut_dossier → canaux SSE du candidat et de sa filière"""
+    if 'statut_dossier' not in instance.__dict__:
+        return  # champ différé, ni chargé ni modifié
+    ancien = getattr(instance, '_statut_initial', None)
+    instance._statut_initial = instance.statut_dossier
+    if created or ancien == instance.statut_dossier:
+        return
+
+    canaux = [events.canal_candidat(instance.pk)]
+    if instance.filiere_id:
+        canaux.append(events.canal_filiere(instance.filiere_id))
+    donnees = {
+        'candidat_id': instance.pk,
+        'matricule': instance.matricule,
+        'ancien': ancien,
+        'nouveau': instance.statut_dossier,
+    }
+    transaction.on_commit(lambda: events.publier(canaux, 'statut_dossier', donnees))
@@ -1,3 +1,378 @@
-from django.test import TestCase
+import datetime
+import io
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from authentication.models import ResponsableFiliere, User
+from configurations.models import Filiere
+from sgee_project.detecteur import sans_n_plus_un
+
+from . import doublons, recherche
+from .models import Candidat, DoublonCandidat, JetonRecherche, Notification
+from .utils.notifications import COMPTEUR_KEY, compteur_non_lues, diffuser
+from .utils.phonetique import cle_phonetique
+
+
+def creer_candidat(numero, **champs):
+    email = f'candidat{numero}@example.com'
+    user = User.objects.create_user(email, 'motdepasse123', role='candidat')
+    return Candidat.objects.create(**{
+        'user': user, 'nom': f'NOM{numero}', 'prenom': f'Prenom{numero}', 'email': email,
+        'date_naissance': datetime.date(2005, 1, 1), 'lieu_naissance': 'Yaoundé', 'sexe': 'M',
+        **champs
+    })
+
+
+# ============================================
+# SIGNAUX
+# ============================================
+
+class StatutDossierSignalTests(TestCase):
+    databases = {'default', 'sequences'}  # matricules (configurations.sequences)
+
+    def setUp(self):
+        for numero in range(3):
+            creer_candidat(numero)
+
+    def test_chargement_differe_sans_requete_supplementaire(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(len(list(Candidat.objects.only('id', 'nom'))), 3)
+
+    def test_statut_initial_memorise(self):
+        candidat = Candidat.objects.first()
+        self.assertEqual(candidat._statut_initial, candidat.statut_dossier)
+
+
+# ============================================
+# DIFFUSION DE NOTIFICATIONS
+# ============================================
+
+class DiffusionNotificationTests(TestCase):
+    databases = {'default', 'sequences'}
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            User.objects.create_user('admin@example.com', 'motdepasse123', role='super_admin')
+        )
+
+    def diffuser(self, **cibles):
+        return self.client.post(
+            '/api/candidats/notifications/broadcast/',
+            {'titre': 'Rappel', 'message': 'Dépôt avant vendredi', **cibles},
+            format='json',
+        )
+
+    def test_cibles_non_numeriques_refusees(self):
+        response = self.diffuser(filiere='abc', centre_examen='1', centre_depot='x')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.data), {'filiere', 'centre_depot'})
+
+    def test_statut_inconnu_refuse(self):
+        response = self.diffuser(statut='inexistant')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('statut', response.data)
+
+    def test_diffusion_acceptee(self):
+        filiere = Filiere.objects.create(code='INF', libelle='Informatique')
+        vises = [creer_candidat(numero, filiere=filiere) for numero in range(3)]
+        creer_candidat(3)  # hors filière
+
+        # Thread exécuté sur place ; la connexion du test ne doit pas être fermée
+        def thread(target, args, **kwargs):
+            return mock.Mock(start=lambda: target(*args))
+
+        with mock.patch('candidats.utils.notifications.threading.Thread', side_effect=thread), \
+                mock.patch('candidats.utils.notifications.connection'):
+            response = self.diffuser(filiere=str(filiere.pk))
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['statut'], 'en_attente')
+        self.assertEqual(response.data['total'], 3)
+        self.assertEqual(response.data['cibles'], {'filiere': filiere.pk})
+        self.assertTrue(response.data['suivi'].endswith(f"/{response.data['diffusion_id']}/"))
+
+        self.assertEqual(
+            sorted(Notification.objects.filter(titre='Rappel').values_list('candidat_id', flat=True)),
+            sorted(candidat.pk for candidat in vises),
+        )
+        suivi = self.client.get(response.data['suivi'])
+        self.assertEqual((suivi.data['statut'], suivi.data['envoyes']), ('termine', 3))
+
+
+# ============================================
+# REQUÊTES N+1 (sgee_project.detecteur)
+# ============================================
+
+class RequetesRepeteesTests(TestCase):
+    databases = {'default', 'sequences'}
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            User.objects.create_user('admin@example.com', 'motdepasse123', role='super_admin')
+        )
+        for numero in range(6):
+            filiere = Filiere.objects.create(code=f'F{numero}', libelle=f'Filière {numero}')
+            responsable = User.objects.create_user(f'rf{numero}@example.com', 'motdepasse123', role='responsable_filiere')
+            ResponsableFiliere.objects.create(user=responsable, filiere=filiere)
+            creer_candidat(numero, filiere=filiere)
+
+    def test_liste_des_utilisateurs_sans_n_plus_un(self):
+        with sans_n_plus_un():
+            response = self.client.get('/api/auth/users/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 12)
+
+    def test_stats_filieres_signale(self):
+        # Une série de requêtes par filière : à corriger, le détecteur doit la voir
+        with self.assertRaises(AssertionError) as contexte:
+            with sans_n_plus_un():
+                response = self.client.get('/api/candidats/admin-academique/stats-filieres/')
+                self.assertEqual(response.status_code, 200)
+        self.assertIn('Requêtes répétées', str(contexte.exception))
+
+
+# ============================================
+# COMPTEUR DE NOTIFICATIONS NON LUES
+# ============================================
+
+class CompteurNonLuesTests(TestCase):
+    databases = {'default', 'sequences'}
+    URL = '/api/candidats/notifications/unread-count/'
+
+    def setUp(self):
+        cache.clear()
+        self.candidat = creer_candidat(1)
+        self.client = APIClient()
+        self.client.force_authenticate(self.candidat.user)
+
+    def notifier(self, nombre=1):
+        with self.captureOnCommitCallbacks(execute=True):
+            return [
+                Notification.objects.create(candidat=self.candidat, titre=f'Info {i}', message='...')
+                for i in range(nombre)
+            ]
+
+    def badge(self, etag=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.get(self.URL, headers={'If-None-Match': etag} if etag else {})
+
+    def appeler(self, methode, url):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = getattr(self.client, methode)(url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_304_tant_que_rien_ne_change(self):
+        response = self.badge()
+        self.assertEqual(response.data, {'unread': 0})
+        self.assertEqual(self.badge(response['ETag']).status_code, 304)
+
+        self.notifier()
+        response = self.badge(response['ETag'])
+        self.assertEqual((response.status_code, response.data['unread']), (200, 1))
+        self.assertEqual(self.badge(response['ETag']).status_code, 304)
+
+    def test_invalidations(self):
+        lue, supprimee = self.notifier(2)
+        self.assertEqual(self.badge().data['unread'], 2)
+
+        self.appeler('post', f'/api/candidats/notifications/{lue.pk}/read/')
+        self.assertEqual(self.badge().data['unread'], 1)
+
+        self.appeler('delete', f'/api/candidats/notifications/{supprimee.pk}/')
+        self.assertEqual(self.badge().data['unread'], 0)
+
+        self.notifier(3)
+        self.assertEqual(self.badge().data['unread'], 3)
+        self.appeler('post', '/api/candidats/notifications/mark-all-read/')
+        self.assertEqual(self.badge().data['unread'], 0)
+
+        diffuser({}, titre='Rappel', message='Dépôt avant vendredi')
+        self.assertEqual(self.badge().data['unread'], 1)
+
+    def test_compteur_calcule_pendant_une_invalidation(self):
+        perime = compteur_non_lues(self.candidat.pk)
+        self.notifier()
+        # Un recalcul commencé avant l'invalidation écrit son résultat après elle
+        cache.set(COMPTEUR_KEY.format(candidat_id=self.candidat.pk), perime)
+        self.assertEqual(compteur_non_lues(self.candidat.pk)['non_lues'], 1)
+
+
+# ============================================
+# RECHERCHE
+# ============================================
+
+class RechercheTests(TestCase):
+    databases = {'default', 'sequences'}
+
+    def setUp(self):
+        self.informatique = Filiere.objects.create(code='INF', libelle='Informatique')
+        self.gestion = Filiere.objects.create(code='GES', libelle='Gestion')
+        self.eloise = creer_candidat(1, nom='NGONO', prenom='Éloïse', filiere=self.informatique)
+        self.paul = creer_candidat(2, nom='NGONOA', prenom='Paul', filiere=self.gestion)
+        self.marie = creer_candidat(3, nom='ATANGANA', prenom='Marie-Éloïse', filiere=self.gestion)
+
+    def noms(self, requete, **options):
+        return [candidat.nom for candidat in recherche.rechercher(requete, **options)]
+
+    def test_accents_et_casse_ignores(self):
+        self.assertEqual(self.noms('eloise ngono'), ['NGONO'])
+        self.assertEqual(self.noms('ÉLOÏSE NGONO'), ['NGONO'])
+
+    def test_prefixe(self):
+        self.assertCountEqual(self.noms('ngon'), ['NGONO', 'NGONOA'])
+        self.assertCountEqual(self.noms('ata'), ['ATANGANA'])
+        # Une seule lettre : comparaison exacte uniquement
+        self.assertEqual(self.noms('n'), [])
+
+    def test_classement_exact_avant_prefixe(self):
+        self.assertEqual(self.noms('ngono'), ['NGONO', 'NGONOA'])
+        resultats = recherche.rechercher('ngono')
+        self.assertGreater(resultats[0].score, resultats[1].score)
+
+    def test_tous_les_termes_requis(self):
+        self.assertEqual(self.noms('eloise atangana'), ['ATANGANA'])
+        self.assertEqual(self.noms('paul atangana'), [])
+
+    def test_restriction_a_la_filiere(self):
+        self.assertEqual(self.noms('eloise', filiere_id=self.informatique.pk), ['NGONO'])
+        self.assertEqual(self.noms('eloise', filiere_id=self.gestion.pk), ['ATANGANA'])
+        self.assertEqual(self.noms('paul', filiere_id=self.informatique.pk), [])
+
+    def test_matricule_et_email(self):
+        self.assertEqual(self.noms(self.paul.matricule), ['NGONOA'])
+        self.assertEqual(self.noms('candidat3@example.com'), ['ATANGANA'])
+
+    def test_reindexation_seulement_si_champ_indexe_modifie(self):
+        jetons = set(JetonRecherche.objects.filter(candidat=self.eloise).values_list('pk', flat=True))
+
+        self.eloise.statut_dossier = 'valide'
+        self.eloise.save()
+        Candidat.objects.get(pk=self.eloise.pk).save()
+        self.assertEqual(set(JetonRecherche.objects.filter(candidat=self.eloise).values_list('pk', flat=True)), jetons)
+
+        self.eloise.nom = 'MBARGA'
+        self.eloise.save()
+        self.assertEqual(self.noms('mbarga'), ['MBARGA'])
+        self.assertEqual(self.noms('eloise ngono'), [])
+
+
+# ============================================
+# DÉTECTION DES DOUBLONS
+# ============================================
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class DoublonsTests(TestCase):
+    databases = {'default', 'sequences'}
+
+    def setUp(self):
+        self.naissance = datetime.date(2004, 3, 12)
+
+    def candidat(self, numero, nom, prenom, naissance=None):
+        return creer_candidat(numero, nom=nom, prenom=prenom, date_naissance=naissance or self.naissance)
+
+    def paires(self):
+        return set(DoublonCandidat.objects.values_list('candidat_id', 'doublon_de_id'))
+
+    def test_cle_phonetique(self):
+        self.assertEqual(cle_phonetique('Éloundou'), cle_phonetique('ELOUNDOU'))
+        self.assertEqual(cle_phonetique('Éloundou'), cle_phonetique('Elundou'))
+        self.assertEqual(cle_phonetique('Philippe'), cle_phonetique('Filipe'))
+        self.assertNotEqual(cle_phonetique('Eloundou'), cle_phonetique('Mbarga'))
+        self.assertEqual(cle_phonetique('1234'), '')
+
+    def test_signature_et_similarite(self):
+        # Nom et prénom inversés : même signature
+        self.assertEqual(doublons.signature('Eloundou', 'Marie-Claire'), doublons.signature('Marie Claire', 'ÉLOUNDOU'))
+        self.assertGreaterEqual(doublons.similarite('eloundou marie', 'elundou marie'), 0.85)
+        self.assertEqual(doublons.similarite('eloundou marie', 'eloundou jean'), 0.0)
+
+    def test_cle_maintenue_a_l_enregistrement(self):
+        candidat = self.candidat(1, 'Eloundou', 'Marie')
+        self.assertEqual(candidat.cle_phonetique, cle_phonetique('Eloundou'))
+        candidat.nom = 'Mbarga'
+        candidat.save(update_fields=['nom'])
+        candidat.refresh_from_db()
+        self.assertEqual(candidat.cle_phonetique, cle_phonetique('Mbarga'))
+
+    def test_detection_incrementale(self):
+        original = self.candidat(1, 'Eloundou', 'Marie')
+        self.candidat(2, 'Eloundou', 'Jean')                                      # prénom différent
+        self.candidat(3, 'Eloundou', 'Marie', datetime.date(2004, 3, 13))        # autre bloc
+        self.candidat(4, 'Mbarga', 'Marie')                                      # autre clé
+        doublon = self.candidat(5, 'ELUNDOU', 'Marie')
+
+        self.assertEqual(doublons.detecter_pour(doublon), 1)
+        self.assertEqual(self.paires(), {(original.pk, doublon.pk)})
+        # Paire déjà connue : ignorée
+        doublons.detecter_pour(doublon)
+        self.assertEqual(DoublonCandidat.objects.count(), 1)
+
+    def test_passe_complete(self):
+        a = self.candidat(1, 'Eloundou', 'Marie')
+        b = self.candidat(2, 'Marie', 'Éloundou')
+        c = self.candidat(3, 'Nkoulou', 'Paul', datetime.date(2001, 1, 1))
+        d = self.candidat(4, 'Nkulou', 'Paul', datetime.date(2001, 1, 1))
+        self.candidat(5, 'Nkoulou', 'Paul', datetime.date(2001, 1, 2))
+        # Candidat antérieur à la colonne : clé vide, remplie par recalculer_cles
+        Candidat.objects.filter(pk=d.pk).update(cle_phonetique='')
+
+        self.assertEqual(doublons.recalculer_cles(), 1)
+        candidats, blocs, paires = doublons.detecter_tout(taille_lot=1)
+        self.assertEqual((candidats, blocs, paires), (5, 1, 1))
+        self.assertEqual(self.paires(), {(c.pk, d.pk)})
+        # a et b : nom et prénom inversés, clés (nom) différentes, donc pas dans le même bloc
+        self.assertNotIn((a.pk, b.pk), self.paires())
+
+    def test_bloc_trop_grand_ignore(self):
+        for i in range(3):
+            self.candidat(i, 'Eloundou', 'Marie')
+        with mock.patch.object(doublons, 'TAILLE_BLOC_MAX', 2), self.assertLogs('candidats.doublons', 'WARNING'):
+            self.assertEqual(doublons.detecter_tout(), (3, 0, 0))
+        self.assertFalse(DoublonCandidat.objects.exists())
+
+
+# ============================================
+# INDEX COMPOSITES ET AUDIT DES REQUÊTES
+# ============================================
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class AuditRequetesTests(TestCase):
+    databases = {'default', 'sequences'}
+
+    def setUp(self):
+        cache.clear()
+        self.filiere = Filiere.objects.create(code='INF', libelle='Informatique')
+        for i in range(3):
+            creer_candidat(i, filiere=self.filiere, statut_dossier='complet')
+        responsable = User.objects.create_user('resp@example.com', 'motdepasse123', role='responsable_filiere')
+        ResponsableFiliere.objects.create(user=responsable, filiere=self.filiere, telephone='690000000')
+        User.objects.create_user('academique@example.com', 'motdepasse123', role='admin_academique')
+
+    def test_index_des_listes_par_filiere(self):
+        plan = Candidat.objects.filter(filiere=self.filiere, statut_dossier='complet').order_by('-created_at').explain()
+        self.assertIn('candidat_filiere_statut_idx', plan)
+        plan = Candidat.objects.filter(statut_dossier='en_attente').order_by('created_at').explain()
+        self.assertIn('candidat_statut_date_idx', plan)
+
+    def test_commande(self):
+        sortie = io.StringIO()
+        with tempfile.NamedTemporaryFile(suffix='.txt') as rapport:
+            call_command('audit_requetes', '--filtre', 'mes-candidats', '--sortie', rapport.name, stdout=sortie)
+            contenu = rapport.read().decode('utf-8')
+
+        self.assertIn('/api/candidats/respfiliere/mes-candidats/ → HTTP 200', sortie.getvalue())
+        self.assertNotIn('dashboard-stats', sortie.getvalue())
+        self.assertTrue(contenu.startswith('# Audit des requêtes (sqlite)'))
+        self.assertIn('candidat_filiere_statut_idx', contenu)
+
+    def test_role_sans_utilisateur(self):
+        sortie = io.StringIO()
+        call_command('audit_requetes', '--filtre', '/api/auth/users/', stdout=sortie)
+        self.assertIn('aucun utilisateur « super_admin »', sortie.getvalue())
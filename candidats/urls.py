@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from . import views
@@ -14,12 +15,25 @@ urlpatterns = [
     path('enrollement/', views.enrollement_view, name='enrollement'),
     path('mon-profil/', views.mon_profil_view, name='mon-profil'),
     path('mon-dossier/', views.mon_dossier_view, name='mon-dossier'),
-    path('check-enrollment/', views.check_enrollment_status, name='check-enrollment'),
+    path(
+        'check-enrollment/',
+        views.acheck_enrollment_status if settings.VUES_ASYNCHRONES else views.check_enrollment_status,
+        name='check-enrollment'
+    ),
     path('notifications/', views.notifications_view, name='notifications'),
+    path('notifications/unread-count/', views.unread_count_view, name='notifications-unread-count'),
     path('notifications/<int:notification_id>/read/', views.mark_notification_read, name='mark-notification-read'),
     path('notifications/mark-all-read/', views.mark_all_notifications_read, name='mark-all-read'),
     path('notifications/<int:notification_id>/', views.delete_notification, name='delete-notification'),
     path('notifications/welcome/', views.create_welcome_notification, name='welcome-notification'),
+    path('notifications/broadcast/', views.broadcast_notification_view, name='broadcast-notification'),
+    path('notifications/broadcast/<str:diffusion_id>/', views.broadcast_status_view, name='broadcast-status'),
+    path('evenements/', views.evenements_view, name='evenements'),
+
+    # ========================================
+    # RECHERCHE
+    # ========================================
+    path('search/', views.recherche_candidats_view, name='recherche-candidats'),
 
     # ========================================
     # GESTION DOCUMENTS (si tu as ces vues)
@@ -0,0 +1,188 @@
+# candidats/utils/notifications.py
+"""
+Notifications : création unitaire et diffusion de masse.
+
+Une diffusion cible les candidats par filière, statut de dossier, centre
+d'examen ou centre de dépôt (ou tous). Les destinataires sont lus par
+lots d'identifiants (values_list + iterator) et les notifications
+insérées par bulk_create : la mémoire reste bornée par la taille d'un
+lot, quel que soit le nombre de destinataires.
+
+lancer_diffusion() exécute l'envoi dans un thread d'arrière-plan et publie
+l'avancement dans le cache (etat_diffusion()).
+
+Le nombre de notifications non lues de chaque candidat est gardé en cache
+(compteur_non_lues()) et invalidé à chaque création, lecture ou suppression.
+"""
+import logging
+import threading
+import time
+import uuid
+
+from django.core.cache import cache
+from django.db import connection
+
+from .. import events
+from ..models import Candidat, Notification
+from .utils import create_notification  # noqa: F401  (import historique des vues)
+
+logger = logging.getLogger(__name__)
+
+TAILLE_LOT = 1000
+CIBLES_DIFFUSION = {
+    'filiere': 'filiere_id',
+    'statut': 'statut_dossier',
+    'centre_examen': 'centre_examen_id',
+    'centre_depot': 'centre_depot_id',
+}
+SUIVI_KEY = 'notifications:diffusion:{id}'
+SUIVI_TTL = 24 * 3600
+COMPTEUR_KEY = 'notifications:non_lues:{candidat_id}'
+GENERATION_KEY = 'notifications:non_lues:{candidat_id}:generation'
+COMPTEUR_TTL = 24 * 3600
+
+
+def compteur_non_lues(candidat_id):
+    """
+    {'non_lues': n, 'version': v} pour un candidat, depuis le cache.
+    Recalculé (index candidat/is_read) après chaque invalidation ; la
+    version change à chaque recalcul et sert d'ETag.
+
+    Le compteur porte la génération lue avant le COUNT : s'il a été calculé
+    pendant une invalidation, sa génération n'est plus la courante et il
+    est recalculé à la lecture suivante au lieu de rester figé COMPTEUR_TTL.
+    """
+    cle = COMPTEUR_KEY.format(candidat_id=candidat_id)
+    cle_generation = GENERATION_KEY.format(candidat_id=candidat_id)
+    valeurs = cache.get_many([cle, cle_generation])
+    generation = valeurs.get(cle_generation)
+    compteur = valeurs.get(cle)
+    if compteur is None or compteur.get('generation') != generation:
+        compteur = {
+            'non_lues': Notification.objects.filter(candidat_id=candidat_id, is_read=False).count(),
+            'version': time.time_ns(),
+            'generation': generation,
+        }
+        cache.set(cle, compteur, timeout=COMPTEUR_TTL)
+    return compteur
+
+
+def invalider_compteurs(candidat_ids):
+    """À appeler après création, lecture ou suppression de notifications"""
+    # Sans expiration : si la génération disparaissait avant un compteur calculé
+    # sous l'ancienne, ce compteur redeviendrait valide
+    generation = time.time_ns()
+    cache.set_many(
+        {GENERATION_KEY.format(candidat_id=pk): generation for pk in candidat_ids}, timeout=None
+    )
+
+
+def destinataires(cibles):
+    """
+    Candidats visés. `cibles` : dict parmi filiere, statut, centre_examen,
+    centre_depot ; vide = tous les candidats.
+    """
+    filtres = {
+        CIBLES_DIFFUSION[cle]: valeur
+        for cle, valeur in cibles.items()
+        if cle in CIBLES_DIFFUSION and valeur not in (None, '')
+    }
+    return Candidat.objects.filter(**filtres)
+
+
+def _apres_lot(lot):
+    """bulk_create n'envoie pas de signaux : compteurs et SSE mis à jour ici"""
+    invalider_compteurs(n.candidat_id for n in lot)
+    donnees = {'titre': lot[0].titre, 'type': lot[0].type, 'action_url': lot[0].action_url}
+    for notification in lot:
+        events.publier(events.canal_candidat(notification.candidat_id), 'notification', donnees)
+
+
+def diffuser(cibles, titre, message, type='info', action_url=None, action_label=None,
+             taille_lot=TAILLE_LOT, progression=None):
+    """
+    Crée une notification par candidat visé, par lots de `taille_lot`.
+    `progression(envoyes)` est appelé après chaque lot. Retourne le total.
+    """
+    ids = destinataires(cibles).order_by('pk').values_list('pk', flat=True).iterator(chunk_size=taille_lot)
+
+    envoyes = 0
+    lot = []
+    for candidat_id in ids:
+        lot.append(Notification(
+            candidat_id=candidat_id,
+            titre=titre,
+            message=message,
+            type=type,
+            action_url=action_url,
+            action_label=action_label,
+        ))
+        if len(lot) >= taille_lot:
+            Notification.objects.bulk_create(lot)
+            _apres_lot(lot)
+            envoyes += len(lot)
+            lot = []
+            if progression:
+                progression(envoyes)
+
+    if lot:
+        Notification.objects.bulk_create(lot)
+        _apres_lot(lot)
+        envoyes += len(lot)
+        if progression:
+            progression(envoyes)
+    return envoyes
+
+
+def etat_diffusion(diffusion_id):
+    return cache.get(SUIVI_KEY.format(id=diffusion_id))
+
+
+def _publier(diffusion_id, **champs):
+    cle = SUIVI_KEY.format(id=diffusion_id)
+    etat = cache.get(cle) or {'diffusion_id': diffusion_id}
+    etat.update(champs)
+    cache.set(cle, etat, timeout=SUIVI_TTL)
+
+
+def _executer(diffusion_id, cibles, contenu):
+    try:
+        _publier(diffusion_id, statut='en_cours')
+        envoyes = diffuser(
+            cibles,
+            progression=lambda n: _publier(diffusion_id, envoyes=n),
+            **contenu
+        )
+        _publier(diffusion_id, statut='termine', envoyes=envoyes)
+    except Exception as e:
+        logger.exception('Diffusion %s interrompue', diffusion_id)
+        _publier(diffusion_id, statut='erreur', erreur=str(e))
+    finally:
+        connection.close()
+
+
+def lancer_diffusion(cibles, titre, message, type='info', action_url=None, action_label=None):
+    """Démarre une diffusion en arrière-plan ; retourne son état initial (avec diffusion_id)"""
+    diffusion_id = uuid.uuid4().hex
+    etat = {
+        'diffusion_id': diffusion_id,
+        'statut': 'en_attente',
+        'total': destinataires(cibles).count(),
+        'envoyes': 0,
+    }
+    cache.set(SUIVI_KEY.format(id=diffusion_id), etat, timeout=SUIVI_TTL)
+
+    contenu = {
+        'titre': titre,
+        'message': message,
+        'type': type,
+        'action_url': action_url,
+        'action_label': action_label,
+    }
+    threading.Thread(
+        target=_executer,
+        args=(diffusion_id, cibles, contenu),
+        name=f'diffusion-{diffusion_id[:8]}',
+        daemon=True,
+    ).start()
+    return etat
@@ -0,0 +1,54 @@
+# candidats/utils/phonetique.py
+"""
+Normalisation et clé phonétique des noms (sans dépendance aux modèles).
+
+La clé est un Soundex adapté : accents et casse ignorés, quelques graphies
+équivalentes unifiées (ph/f, c/k/q, ou/u...), voyelles supprimées après la
+première lettre et consonnes proches regroupées. « Éloundou », « ELOUNDOU »
+et « Elundou » donnent la même clé.
+"""
+import unicodedata
+
+CODES = {
+    **dict.fromkeys('bfpv', '1'),
+    **dict.fromkeys('cgjkqsxz', '2'),
+    **dict.fromkeys('dt', '3'),
+    'l': '4',
+    **dict.fromkeys('mn', '5'),
+    'r': '6',
+}
+EQUIVALENCES = (
+    ('ph', 'f'), ('qu', 'k'), ('ck', 'k'), ('ch', 's'), ('sh', 's'),
+    ('ou', 'u'), ('gu', 'g'), ('c', 'k'), ('q', 'k'),
+)
+LONGUEUR_CLE = 6
+
+
+def normaliser(texte):
+    """'  Éloundou-NGONO ' → 'eloundou-ngono' (minuscules, sans accents)"""
+    if not texte:
+        return ''
+    decompose = unicodedata.normalize('NFKD', str(texte))
+    return ''.join(c for c in decompose if not unicodedata.combining(c)).lower().strip()
+
+
+def cle_phonetique(texte):
+    """Clé phonétique courte d'un nom ('' si aucun caractère alphabétique)"""
+    lettres = ''.join(c for c in normaliser(texte) if 'a' <= c <= 'z')
+    if not lettres:
+        return ''
+    for graphie, equivalent in EQUIVALENCES:
+        lettres = lettres.replace(graphie, equivalent)
+
+    cle = lettres[0]
+    precedent = CODES.get(lettres[0], '')
+    for lettre in lettres[1:]:
+        code = CODES.get(lettre, '')
+        if code and code != precedent:
+            cle += code
+            if len(cle) == LONGUEUR_CLE:
+                break
+        # h, w et y ne séparent pas deux consonnes identiques, les voyelles si
+        if lettre not in 'hwy':
+            precedent = code
+    return cle
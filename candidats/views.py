@@ -1,21 +1,35 @@
 # candidats/views.py
+import json
+import logging
+import time
 from rest_framework import status, viewsets
 from rest_framework.decorators import api_view, permission_classes, parser_classes, action
 from rest_framework.response import Response
 from django.db.models import Count, Q, F, Avg, Sum
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.exceptions import NotAuthenticated, NotFound
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import AccessToken
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
 from django.db.models import Q
 from authentication.models import User
 from django.utils import timezone
 from datetime import date, timedelta
 from candidats.utils.utils import create_notification
+from candidats.utils.notifications import (
+    CIBLES_DIFFUSION, compteur_non_lues, etat_diffusion, invalider_compteurs, lancer_diffusion
+)
 from candidats.utils.pdf_generator import generer_fiche_enrollement
 from django.core.mail import EmailMessage
 from django.core.mail import send_mail
 from django.template.loader import render_to_string
 from django.conf import settings
 from .permissions import IsAdminAcademique
+from sgee_project.http import reponse_json, utilisateur_du_jeton
+from sgee_project.routers import lecture_sur_replique
 import qrcode
 from io import BytesIO
 import base64
@@ -30,6 +44,12 @@ from .serializers import (
 from .permissions import IsResponsableFiliere, IsAdminAcademique
 from authentication.models import CodeQuitus
 from configurations.models import Filiere
+from sgee_project.http import appliquer_validateurs, calculer_etag, reponse_non_modifiee
+from sgee_project.pagination import KeysetPagination
+from . import doublons, events, recherche
+
+logger = logging.getLogger(__name__)
+
 def send_validation_email_async(candidat_id):
     """Envoyer l'email de validation en arrière-plan (NON BLOQUANT)"""
     try:
@@ -41,16 +61,11 @@ def send_validation_email_async(candidat_id):
         from django.conf import settings
         import socket
         
-        print(f"\n🧵 [THREAD EMAIL] Démarré pour candidat ID={candidat_id}")
-        
         # Récupérer le candidat
         candidat = Candidat.objects.get(id=candidat_id)
-        print(f"   ✅ Candidat: {candidat.matricule}")
         
         # Générer le PDF
-        print("   📄 Génération PDF...")
         pdf_buffer = generer_fiche_enrollement(candidat)
-        print(f"   ✅ PDF: {len(pdf_buffer.getvalue())} octets")
         
         # Préparer le contexte
         context = {
@@ -59,15 +74,12 @@ def send_validation_email_async(candidat_id):
         }
         
         # Rendre le template HTML
-        print("   📧 Rendu template...")
         html_message = render_to_string(
             'emails/validation_enrollement.html',
             context
         )
-        print(f"   ✅ Template: {len(html_message)} caractères")
         
         # Créer l'email
-        print("   📧 Création EmailMessage...")
         email = EmailMessage(
             subject=f'✅ Validation enrôlement - {candidat.filiere.libelle}',
             body=html_message,
@@ -79,27 +91,25 @@ def send_validation_email_async(candidat_id):
         # Attacher le PDF
         filename = f'Fiche_Enrollement_{candidat.matricule}.pdf'
         email.attach(filename, pdf_buffer.getvalue(), 'application/pdf')
-        print(f"   ✅ PDF attaché")
         
         # 🔥 ENVOYER AVEC TIMEOUT
-        print("   📤 Envoi email (timeout 15s)...")
         socket.setdefaulttimeout(15)  # Timeout de 15 secondes
         
         result = email.send(fail_silently=False)
         
         if result == 1:
-            print(f"   ✅ ✅ ✅ EMAIL ENVOYÉ avec succès à {candidat.email}")
+            logger.info('Email de validation envoyé', extra={'candidat_id': candidat_id})
         else:
-            print(f"   ⚠️ Résultat: {result}")
+            logger.warning('Email de validation non envoyé (résultat %s)', result, extra={'candidat_id': candidat_id})
         
     except socket.timeout:
-        print(f"   ❌ TIMEOUT lors de l'envoi email (serveur SMTP ne répond pas)")
-    except Exception as e:
-        print(f"   ❌ Erreur email thread: {type(e).__name__}: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.error('Timeout SMTP : email de validation non envoyé', extra={'candidat_id': candidat_id})
+    except Exception:
+        logger.exception('Erreur email de validation', extra={'candidat_id': candidat_id})
     finally:
-        print(f"🧵 [THREAD EMAIL] Terminé\n")
+        # Connexion propre au thread : fermée (ou rendue au pool) explicitement
+        from django.db import connection
+        connection.close()
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -107,14 +117,9 @@ def check_enrollment_status(request):
     """Vérifier si le candidat est déjà enrôlé"""
     try:
         user = request.user
-        print(f"\n{'='*60}")
-        print(f"🔍 CHECK ENROLLMENT STATUS")
-        print(f"{'='*60}")
-        print(f"👤 User: {user.email} (role: {user.role})")
         
         # Vérifier si c'est un candidat
         if user.role != 'candidat':
-            print(f"❌ Pas un candidat (role: {user.role})")
             return Response({
                 'is_enrolled': False,
                 'message': 'Utilisateur non candidat'
@@ -123,44 +128,64 @@ def check_enrollment_status(request):
         # Chercher le candidat
         try:
             candidat = Candidat.objects.get(user=user)
-            print(f"✅ Candidat trouvé: {candidat.matricule}")
-            print(f"   Statut: {candidat.statut_dossier}")
-            print(f"   Nom: {candidat.prenom} {candidat.nom}")
-            
-            # Un candidat est considéré comme "enrôlé" si son dossier existe
-            # peut être en_attente, complet, valide ou même rejete
-            is_enrolled = candidat.statut_dossier in ['en_attente', 'complet', 'valide', 'rejete']
-            
-            print(f"📊 Is enrolled: {is_enrolled}")
-            print(f"{'='*60}\n")
-            
-            return Response({
-                'is_enrolled': is_enrolled,
-                'statut_dossier': candidat.statut_dossier,
-                'matricule': candidat.matricule,
-                'nom_complet': f"{candidat.prenom} {candidat.nom}",
-                'filiere': candidat.filiere.libelle if candidat.filiere else None,
-                'photo_url': request.build_absolute_uri(
-                    settings.MEDIA_URL + candidat.photo_path
-                ) if candidat.photo_path else None
-            })
-            
         except Candidat.DoesNotExist:
-            print(f"❌ Aucun candidat trouvé pour user {user.id}")
-            print(f"{'='*60}\n")
-            return Response({
-                'is_enrolled': False,
-                'message': 'Aucun profil candidat trouvé'
-            })
+            candidat = None
+        return Response(_etat_enrolement(request, candidat))
             
     except Exception as e:
-        print(f"❌ Erreur check enrollment: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception('Erreur check enrollment', extra={'user_id': request.user.id})
         return Response({
             'is_enrolled': False,
             'error': str(e)
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def _etat_enrolement(request, candidat):
+    """Réponse de check-enrollment pour un utilisateur candidat"""
+    if candidat is None:
+        return {
+            'is_enrolled': False,
+            'message': 'Aucun profil candidat trouvé'
+        }
+    
+    # Un candidat est considéré comme "enrôlé" si son dossier existe
+    # peut être en_attente, complet, valide ou même rejete
+    is_enrolled = candidat.statut_dossier in ['en_attente', 'complet', 'valide', 'rejete']
+    
+    return {
+        'is_enrolled': is_enrolled,
+        'statut_dossier': candidat.statut_dossier,
+        'matricule': candidat.matricule,
+        'nom_complet': f"{candidat.prenom} {candidat.nom}",
+        'filiere': candidat.filiere.libelle if candidat.filiere else None,
+        'photo_url': request.build_absolute_uri(
+            settings.MEDIA_URL + candidat.photo_path
+        ) if candidat.photo_path else None
+    }
+
+
+@require_GET
+async def acheck_enrollment_status(request):
+    """
+    check_enrollment_status pour le serveur ASGI (VUES_ASYNCHRONES) :
+    utilisateur, candidat et filière lus en une requête de l'ORM asynchrone.
+    """
+    user = None
+    user_id = utilisateur_du_jeton(request)
+    if user_id is not None:
+        user = await User.objects.select_related('candidat__filiere').filter(pk=user_id, is_active=True).afirst()
+    if user is None:
+        # Même réponse que IsAuthenticated
+        response = reponse_json({'detail': NotAuthenticated().detail}, status=status.HTTP_401_UNAUTHORIZED)
+        response['WWW-Authenticate'] = 'Bearer realm="api"'
+        return response
+    
+    if user.role != 'candidat':
+        return reponse_json({
+            'is_enrolled': False,
+            'message': 'Utilisateur non candidat'
+        })
+    return reponse_json(_etat_enrolement(request, getattr(user, 'candidat', None)))
 @api_view(['GET', 'PUT'])
 @permission_classes([IsAuthenticated])
 def mon_profil_view(request):
@@ -214,34 +239,21 @@ def enrollement_view(request):
     """Compléter profil candidat - USER AUTHENTIFIÉ"""
     
     user = request.user
-    print(f"\n{'='*80}")
-    print(f"👤 USER AUTHENTIFIÉ: {user.email} (role: {user.role})")
-    print(f"{'='*80}")
     
     # ✅ 1. VÉRIFIER RÔLE
     if user.role != 'candidat':
-        print("❌ User n'est pas candidat")
         return Response({
             'error': 'Accès refusé',
             'message': 'Seuls les candidats peuvent accéder à cette fonctionnalité.'
         }, status=status.HTTP_403_FORBIDDEN)
     
-    # ✅ 2. LOG STATUT ACTUEL
-    try:
-        candidat_existant = Candidat.objects.get(user=user)
-        print(f"📋 Candidat existant: {candidat_existant.matricule} | Statut: {candidat_existant.statut_dossier}")
-    except Candidat.DoesNotExist:
-        print("📋 Aucun candidat trouvé")
-    
-    # ✅ 3. DEBUG FICHIERS (CRITIQUE)
-    print(f"\n📂 FICHIERS REÇUS ({len(request.FILES)}):")
-    for key in request.FILES.keys():
-        file = request.FILES[key]
-        print(f"  ✅ {key}: {file.name} ({file.size} bytes)")
-    
-    print(f"\n📥 DONNÉES ({len(request.data)}):")
-    for key, value in request.data.items():
-        print(f"  📝 {key}: {value}")
+    # ✅ 2. TRACE DE LA SOUMISSION (noms de champs et tailles, jamais les valeurs)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug('Enrôlement soumis', extra={
+            'user_id': user.id,
+            'champs': sorted(request.POST.keys()),
+            'fichiers': {key: file.size for key, file in request.FILES.items()},
+        })
     
     # 🔥 FIX CRITIQUE : CRÉER UN DICT STANDARD AU LIEU DE .copy()
     # request.data contient déjà les fichiers ET les données
@@ -250,14 +262,18 @@ def enrollement_view(request):
     # ✅ 4. VALIDATION SERIALIZER DIRECTEMENT AVEC request.data
     serializer = CandidatEnrollementSerializer(data=request.data, context={'request': request})
     
-    print(f"\n🔍 VALIDATION...")
     if serializer.is_valid():
-        print("✅ VALIDATION OK")
-        
         try:
-            print(f"\n💾 SAUVEGARDE...")
             candidat = serializer.save()
-            print(f"✅ SUCCÈS: {candidat.matricule} | Statut: {candidat.statut_dossier}")
+            logger.info('Enrôlement enregistré', extra={
+                'user_id': user.id, 'candidat_id': candidat.pk, 'statut': candidat.statut_dossier,
+            })
+            
+            # Détection incrémentale des doublons (ne bloque jamais l'enrôlement)
+            try:
+                doublons.detecter_pour(candidat)
+            except Exception:
+                logger.exception('Détection des doublons échouée pour le candidat %s', candidat.pk)
             
             return Response({
                 'success': True,
@@ -274,9 +290,7 @@ def enrollement_view(request):
             }, status=status.HTTP_201_CREATED)
             
         except Exception as e:
-            print(f"❌ ERREUR SAUVEGARDE: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception('Erreur sauvegarde enrôlement', extra={'user_id': user.id})
             return Response({
                 'error': 'Erreur sauvegarde',
                 'message': str(e),
@@ -284,7 +298,9 @@ def enrollement_view(request):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
     # ❌ ERREURS
-    print(f"❌ ERREURS: {serializer.errors}")
+    logger.info('Enrôlement refusé : données invalides', extra={
+        'user_id': user.id, 'champs_en_erreur': sorted(serializer.errors),
+    })
     return Response({
         'error': 'Données invalides',
         'details': serializer.errors,
@@ -478,6 +494,12 @@ def notifications_view(request):
     
     notifications = Notification.objects.filter(candidat=candidat).order_by('-created_at')
     
+    # Pagination par curseur (optionnelle) : ?cursor=&per_page=
+    paginator = None
+    if KeysetPagination.demandee(request):
+        paginator = KeysetPagination()
+        notifications = paginator.paginate_queryset(notifications, request)
+    
     notifications_data = [{
         'id': notif.id,
         'titre': notif.titre,
@@ -490,13 +512,127 @@ def notifications_view(request):
         'read_at': notif.read_at
     } for notif in notifications]
     
+    unread = compteur_non_lues(candidat.id)['non_lues']
+    if paginator is not None:
+        return Response({
+            **paginator.get_meta(),
+            'notifications': notifications_data,
+            'unread': unread
+        }, status=status.HTTP_200_OK)
+    
     return Response({
         'notifications': notifications_data,
         'total': len(notifications_data),
-        'unread': sum(1 for n in notifications_data if not n['is_read'])
+        'unread': unread
     }, status=status.HTTP_200_OK)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def unread_count_view(request):
+    """
+    Nombre de notifications non lues (badge), pour le polling.
+    Répond 304 tant que le compteur n'a pas changé (If-None-Match).
+    """
+    try:
+        candidat_id = request.user.candidat.id
+    except Candidat.DoesNotExist:
+        return Response({
+            'error': 'Profil candidat non trouvé'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    compteur = compteur_non_lues(candidat_id)
+    etag = calculer_etag(str(candidat_id), str(compteur['version']), str(compteur['non_lues']))
+    non_modifiee = reponse_non_modifiee(request, etag, prive=True)
+    if non_modifiee is not None:
+        return non_modifiee
+    
+    return appliquer_validateurs(Response({'unread': compteur['non_lues']}), etag, prive=True)
+
+
+# ==========================================
+# ÉVÉNEMENTS EN DIRECT (SSE)
+# ==========================================
+
+def _utilisateur_evenements(request):
+    """
+    (user_id, expiration) depuis le jeton d'accès JWT, lu dans l'en-tête
+    Authorization ou dans ?token= (EventSource ne permet pas d'en-têtes).
+    """
+    entete = request.headers.get('Authorization', '')
+    jeton = entete[7:] if entete.startswith('Bearer ') else request.GET.get('token')
+    if not jeton:
+        return None, None
+    try:
+        acces = AccessToken(jeton)
+    except TokenError:
+        return None, None
+    return acces.get(settings.SIMPLE_JWT.get('USER_ID_CLAIM', 'user_id')), acces['exp']
+
+
+async def evenements_view(request):
+    """
+    Flux Server-Sent Events (text/event-stream) :
+    - candidat : ses nouvelles notifications et les changements de statut de son dossier ;
+    - responsable de filière : les changements de statut des dossiers de sa filière.
+
+    Remplace le polling de notifications/unread-count/. Nécessite le
+    serveur ASGI (sgee_project/asgi.py) : sous WSGI chaque flux bloquerait
+    un worker. Le flux se termine à l'expiration du jeton, le client se
+    reconnecte alors avec un jeton rafraîchi.
+    """
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Méthode non autorisée'}, status=405)
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({'error': 'Flux disponible uniquement via le serveur ASGI'}, status=501)
+
+    user_id, expiration = _utilisateur_evenements(request)
+    if user_id is None:
+        return JsonResponse({'error': 'Jeton invalide ou absent'}, status=401)
+    try:
+        user = await User.objects.select_related(
+            'candidat', 'responsable_filiere_profile'
+        ).aget(pk=user_id, is_active=True)
+    except User.DoesNotExist:
+        return JsonResponse({'error': 'Utilisateur introuvable'}, status=401)
+
+    canaux = []
+    if user.role == 'candidat' and hasattr(user, 'candidat'):
+        canaux.append(events.canal_candidat(user.candidat.id))
+    elif user.role == 'responsable_filiere' and hasattr(user, 'responsable_filiere_profile'):
+        if user.responsable_filiere_profile.filiere_id:
+            canaux.append(events.canal_filiere(user.responsable_filiere_profile.filiere_id))
+    if not canaux:
+        return JsonResponse({'error': 'Aucun flux pour ce profil'}, status=403)
+
+    heartbeat = settings.EVENEMENTS_HEARTBEAT
+
+    async def flux():
+        # Abonnement au premier envoi : une réponse jamais lue ne laisse rien derrière elle
+        abonnement = await events.get_backend().abonner(canaux)
+        try:
+            yield 'retry: 5000\n\n'
+            while True:
+                restant = expiration - time.time()
+                if restant <= 0:
+                    yield 'event: expiration\ndata: {}\n\n'
+                    return
+                message = await abonnement.recevoir(min(heartbeat, restant))
+                if message is None:
+                    yield ': ping\n\n'
+                    continue
+                type_evenement = json.loads(message).get('type', 'message')
+                yield f'event: {type_evenement}\ndata: {message}\n\n'
+        finally:
+            # Fin normale ou déconnexion du client (annulation)
+            await abonnement.fermer()
+
+    response = StreamingHttpResponse(flux(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # pas de mise en tampon derrière nginx
+    return response
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def mark_notification_read(request, notification_id):
@@ -533,6 +669,8 @@ def mark_all_notifications_read(request):
             is_read=True,
             read_at=timezone.now()
         )
+        if updated:
+            invalider_compteurs([candidat.id])
         
         return Response({
             'message': f'{updated} notification(s) marquée(s) comme lue(s)'
@@ -579,11 +717,121 @@ def create_welcome_notification(request):
         """,              
     )
     return Response({"message": "Notification d'accueil créée !"}, status=201)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def broadcast_notification_view(request):
+    """
+    Diffusion d'une notification à un groupe de candidats (en arrière-plan)
+    POST /api/candidats/notifications/broadcast/
+    Cibles (optionnelles, cumulables) : filiere, statut, centre_examen, centre_depot
+    """
+    user = request.user
+    cibles = {cle: request.data.get(cle) for cle in CIBLES_DIFFUSION if request.data.get(cle) not in (None, '')}
+
+    if user.role == 'responsable_filiere' and hasattr(user, 'responsable_filiere_profile'):
+        # Un RF ne peut notifier que sa filière
+        cibles['filiere'] = user.responsable_filiere_profile.filiere_id
+        if cibles['filiere'] is None:
+            return Response({'error': 'Aucune filière assignée'}, status=status.HTTP_400_BAD_REQUEST)
+    elif user.role not in ['super_admin', 'admin_academique']:
+        return Response({'error': 'Accès refusé'}, status=status.HTTP_403_FORBIDDEN)
+
+    titre = (request.data.get('titre') or '').strip()
+    message = (request.data.get('message') or '').strip()
+    type_notification = request.data.get('type') or 'info'
+    erreurs = {}
+    if not titre:
+        erreurs['titre'] = ['Ce champ est obligatoire.']
+    if not message:
+        erreurs['message'] = ['Ce champ est obligatoire.']
+    if type_notification not in dict(Notification.TYPE_CHOICES):
+        erreurs['type'] = [f"Type invalide : {type_notification}"]
+    for cle, valeur in cibles.items():
+        if cle == 'statut':
+            if valeur not in dict(Candidat.STATUT_CHOICES):
+                erreurs[cle] = [f"Statut invalide : {valeur}"]
+            continue
+        try:
+            cibles[cle] = int(valeur)
+        except (TypeError, ValueError):
+            erreurs[cle] = [f"Identifiant invalide : {valeur}"]
+    if erreurs:
+        return Response(erreurs, status=status.HTTP_400_BAD_REQUEST)
+
+    etat = lancer_diffusion(
+        cibles,
+        titre=titre[:255],
+        message=message,
+        type=type_notification,
+        action_url=request.data.get('action_url') or None,
+        action_label=request.data.get('action_label') or None,
+    )
+    return Response({
+        **etat,
+        'cibles': cibles,
+        'suivi': request.build_absolute_uri(f"{request.path}{etat['diffusion_id']}/"),
+    }, status=status.HTTP_202_ACCEPTED)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def broadcast_status_view(request, diffusion_id):
+    """Avancement d'une diffusion : statut, total, envoyes"""
+    if request.user.role not in ['super_admin', 'admin_academique', 'responsable_filiere']:
+        return Response({'error': 'Accès refusé'}, status=status.HTTP_403_FORBIDDEN)
+
+    etat = etat_diffusion(diffusion_id)
+    if etat is None:
+        return Response({'error': 'Diffusion inconnue ou expirée'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(etat)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@lecture_sur_replique
+def recherche_candidats_view(request):
+    """
+    Recherche classée des candidats : GET /api/candidats/search/?q=&limit=
+    Préfixes acceptés, accents et casse ignorés. Un RF ne voit que sa filière.
+    """
+    user = request.user
+    if user.role in ['super_admin', 'admin_academique']:
+        filiere_id = None
+    elif user.role == 'responsable_filiere' and hasattr(user, 'responsable_filiere_profile'):
+        filiere_id = user.responsable_filiere_profile.filiere_id
+        if filiere_id is None:
+            return Response({'count': 0, 'results': []})
+    else:
+        return Response({'error': 'Accès refusé'}, status=status.HTTP_403_FORBIDDEN)
+
+    try:
+        limite = max(1, min(int(request.query_params.get('limit', 20)), 100))
+    except ValueError:
+        limite = 20
+
+    candidats = recherche.rechercher(request.query_params.get('q', ''), filiere_id=filiere_id, limite=limite)
+    results = [{
+        'id': candidat.id,
+        'matricule': candidat.matricule,
+        'nom': candidat.nom,
+        'prenom': candidat.prenom,
+        'email': candidat.email,
+        'statut_dossier': candidat.statut_dossier,
+        'filiere': candidat.filiere.libelle if candidat.filiere else None,
+        'score': candidat.score,
+    } for candidat in candidats]
+
+    return Response({'count': len(results), 'results': results})
+
+
 class ResponsableFiliereViewSet(viewsets.ViewSet):
     """ViewSet pour les responsables de filière"""
     permission_classes = [IsAuthenticated, IsResponsableFiliere]
     
     @action(detail=False, methods=['get'], url_path='dashboard-stats')
+    @lecture_sur_replique
     def dashboard_stats(self, request):
         """Statistiques du tableau de bord du RF"""
         try:
@@ -591,7 +839,6 @@ class ResponsableFiliereViewSet(viewsets.ViewSet):
             rf_profile = user.responsable_filiere_profile
             filiere = rf_profile.filiere
             
-            print(f"📊 Chargement stats pour {user.email} - Filière: {filiere.libelle}")
             
             # Candidats de la filière
             candidats_filiere = Candidat.objects.filter(filiere=filiere)
@@ -628,25 +875,22 @@ class ResponsableFiliereViewSet(viewsets.ViewSet):
                 }
             }
             
-            print(f"✅ Stats: Total={total}, Validés={valides}, Complets={complets}")
             return Response(stats)
             
         except AttributeError as e:
-            print(f"❌ Erreur AttributeError: {e}")
             return Response(
                 {'error': 'Profil responsable de filière non trouvé'},
                 status=status.HTTP_404_NOT_FOUND
             )
         except Exception as e:
-            print(f"❌ Erreur: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception('Erreur stats tableau de bord RF')
             return Response(
                 {'error': str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
     @action(detail=False, methods=['get'], url_path='mes-candidats')
+    @lecture_sur_replique
     def mes_candidats(self, request):
         """Liste des candidats de la filière du RF avec filtres"""
         try:
@@ -654,7 +898,6 @@ class ResponsableFiliereViewSet(viewsets.ViewSet):
             rf_profile = user.responsable_filiere_profile
             filiere = rf_profile.filiere
             
-            print(f"👥 Chargement candidats pour filière: {filiere.libelle}")
             
             # Filtres
             statut = request.query_params.get('statut', None)
@@ -670,23 +913,23 @@ class ResponsableFiliereViewSet(viewsets.ViewSet):
             if statut:
                 candidats = candidats.filter(statut_dossier=statut)
             
-            # Recherche
+            # Recherche (index candidat_recherche, par préfixe)
             if search:
-                candidats = candidats.filter(
-                    Q(nom__icontains=search) |
-                    Q(prenom__icontains=search) |
-                    Q(matricule__icontains=search) |
-                    Q(email__icontains=search)
-                )
-            
-            # Pagination
-            page = int(request.query_params.get('page', 1))
-            per_page = int(request.query_params.get('per_page', 20))
-            start = (page - 1) * per_page
-            end = start + per_page
-            
-            total = candidats.count()
-            candidats_page = candidats.order_by('-created_at')[start:end]
+                candidats = recherche.filtrer(candidats, search)
+            
+            # Pagination par curseur (optionnelle) : ?cursor=&per_page=&count=exact|estime
+            paginator = None
+            if KeysetPagination.demandee(request):
+                paginator = KeysetPagination()
+                candidats_page = paginator.paginate_queryset(candidats, request)
+            else:
+                page = int(request.query_params.get('page', 1))
+                per_page = int(request.query_params.get('per_page', 20))
+                start = (page - 1) * per_page
+                end = start + per_page
+                
+                total = candidats.count()
+                candidats_page = candidats.order_by('-created_at', '-id')[start:end]
             
             # Construire la réponse manuellement
             results = []
@@ -713,7 +956,9 @@ class ResponsableFiliereViewSet(viewsets.ViewSet):
                     'updated_at': candidat.updated_at,
                 })
             
-            print(f"✅ {len(results)} candidats trouvés")
+            
+            if paginator is not None:
+                return Response({'results': results, **paginator.get_meta()})
             
             return Response({
                 'results': results,
@@ -723,16 +968,17 @@ class ResponsableFiliereViewSet(viewsets.ViewSet):
                 'total_pages': (total + per_page - 1) // per_page
             })
             
+        except NotFound:
+            raise
         except Exception as e:
-            print(f"❌ Erreur: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception('Erreur liste candidats RF')
             return Response(
                 {'error': str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
     @action(detail=True, methods=['get'], url_path='candidat-detail')
+    @lecture_sur_replique
     def candidat_detail(self, request, pk=None):
         """Détails complets d'un candidat"""
         try:
@@ -850,14 +1096,14 @@ class ResponsableFiliereViewSet(viewsets.ViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception('Erreur détail candidat', extra={'candidat_id': pk})
             return Response(
                 {'error': str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
     @action(detail=False, methods=['get'], url_path='profil-filiere')
+    @lecture_sur_replique
     def profil_filiere(self, request):
         """Informations détaillées sur la filière du RF"""
         try:
@@ -865,7 +1111,6 @@ class ResponsableFiliereViewSet(viewsets.ViewSet):
             rf_profile = user.responsable_filiere_profile
             filiere = rf_profile.filiere
             
-            print(f"📋 Chargement profil filière: {filiere.libelle}")
             
             # Candidats de la filière
             candidats_filiere = Candidat.objects.filter(filiere=filiere)
@@ -945,19 +1190,17 @@ class ResponsableFiliereViewSet(viewsets.ViewSet):
                 }
             }
             
-            print(f"✅ Profil chargé avec {data['statistiques']['total_candidats']} candidats")
             return Response(data)
             
         except Exception as e:
-            print(f"❌ Erreur: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception('Erreur profil filière')
             return Response(
                 {'error': str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
     @action(detail=False, methods=['get'], url_path='export-stats')
+    @lecture_sur_replique
     def export_stats(self, request):
         """Exporter les statistiques complètes en CSV"""
         try:
@@ -1024,8 +1267,7 @@ class ResponsableFiliereViewSet(viewsets.ViewSet):
             return response
             
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception('Erreur export stats RF')
             return Response(
                 {'error': str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -1034,44 +1276,30 @@ class ResponsableFiliereViewSet(viewsets.ViewSet):
     @action(detail=True, methods=['post'], url_path='valider-dossier')
     def valider_dossier(self, request, pk=None):
         """Valider le dossier d'un candidat"""
-        print("\n" + "="*80)
-        print("🚀 DÉBUT VALIDATION")
-        print("="*80)
         
         try:
-            print("1️⃣ Récupération user...")
             user = request.user
-            print(f"   User: {user.email}")
             
-            print("2️⃣ Récupération profil RF...")
             rf_profile = user.responsable_filiere_profile
-            print(f"   RF Filière: {rf_profile.filiere.libelle}")
             
-            print(f"3️⃣ Recherche candidat ID={pk}...")
             candidat = Candidat.objects.get(
                 id=pk,
                 filiere=rf_profile.filiere
             )
-            print(f"   ✅ Candidat trouvé: {candidat.matricule}")
-            print(f"   Statut: {candidat.statut_dossier}")
             
             if candidat.statut_dossier != 'complet': 
-                print(f"   ❌ Statut invalide!")
                 return Response(
                     {'error': 'Le dossier doit être complet pour être validé'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            print("4️⃣ Mise à jour statut en BD...")
             candidat.statut_dossier = 'valide'
             candidat.date_validation = timezone.now()
             if hasattr(candidat, 'valide_par'):
                 candidat.valide_par = user
             candidat.save()
-            print("   ✅ Statut sauvegardé en BD")
             
             # ✅ CRÉER LA NOTIFICATION DE VALIDATION
-            print("4️⃣bis Création notification...")
             try:
                 from candidats.utils.notifications import create_notification
                 
@@ -1083,89 +1311,55 @@ class ResponsableFiliereViewSet(viewsets.ViewSet):
                     action_url='/Mon-dossier',
                     action_label='Voir mon dossier'
                 )
-                print("   ✅ Notification créée")
-            except Exception as notif_error:
-                print(f"   ⚠️ Erreur création notification: {notif_error}")
+            except Exception:
+                logger.exception('Erreur création notification', extra={'candidat_id': candidat.id})
             
-            print("5️⃣ DÉBUT GÉNÉRATION EMAIL...")
             try:
-                print("   📄 Import pdf_generator...")
                 from candidats.utils.pdf_generator import generer_fiche_enrollement
-                print("   ✅ Import OK")
                 
-                print("   📄 Appel generer_fiche_enrollement()...")
                 pdf_buffer = generer_fiche_enrollement(candidat)
-                print("   ✅ Fonction retournée")
                 
-                print("   📦 Lecture contenu PDF...")
                 pdf_size = len(pdf_buffer.getvalue())
-                print(f"   ✅ PDF: {pdf_size} octets")
                 
                 if pdf_size == 0:
-                    print("   ❌ PDF VIDE!")
                     raise ValueError("PDF vide")
                 
-                print("   📧 Import render_to_string...")
                 from django.template.loader import render_to_string
-                print("   ✅ Import OK")
                 
-                print("   📧 Préparation contexte...")
                 context = {
                     'candidat': candidat,
                     'filiere': candidat.filiere
                 }
-                print("   ✅ Contexte OK")
                 
-                print("   📧 Rendu template...")
                 html_message = render_to_string(
                     'emails/validation_enrollement.html',
                     context
                 )
-                print(f"   ✅ Template rendu: {len(html_message)} caractères")
                 
-                print("   📧 Import EmailMessage...")
                 from django.core.mail import EmailMessage
                 from django.conf import settings
-                print("   ✅ Import OK")
                 
-                print("   📧 Création EmailMessage...")
                 email = EmailMessage(
                     subject=f'✅ Validation de votre enrôlement - {candidat.filiere.libelle}',
                     body=html_message,
                     from_email=settings.DEFAULT_FROM_EMAIL,
                     to=[candidat.email],
                 )
-                print("   ✅ Email créé")
                 
-                print("   📧 Définition content_subtype...")
                 email.content_subtype = "html"
-                print("   ✅ Content type défini")
                 
-                print("   📎 Attachement PDF...")
                 filename = f'Fiche_Enrollement_{candidat.matricule}.pdf'
                 email.attach(filename, pdf_buffer.getvalue(), 'application/pdf')
-                print(f"   ✅ PDF attaché: {filename}")
-                print(f"   📋 Pièces jointes: {len(email.attachments)}")
                 
-                print("   📤 Envoi email...")
                 result = email.send(fail_silently=False)
-                print(f"   ✅ Envoi terminé: result={result}")
                 
-                if result == 1:
-                    print(f"   🎉 EMAIL ENVOYÉ à {candidat.email}")
-                else:
-                    print(f"   ⚠️ result={result} (attendu 1)")
+                if result != 1:
+                    logger.warning('Email de validation non envoyé (résultat %s)', result,
+                                   extra={'candidat_id': candidat.id})
                 
-            except Exception as email_error:
-                print(f"\n❌ ERREUR DANS BLOC EMAIL:")
-                print(f"   Type: {type(email_error).__name__}")
-                print(f"   Message: {str(email_error)}")
-                import traceback
-                traceback.print_exc()
-                print("   ⚠️ DOSSIER VALIDÉ mais email NON envoyé")
+            except Exception:
+                logger.exception('Dossier validé mais email non envoyé', extra={'candidat_id': candidat.id})
             
-            print("6️⃣ Retour Response...")
-            print("="*80 + "\n")
             
             return Response({
                 'success': True,
@@ -1178,15 +1372,12 @@ class ResponsableFiliereViewSet(viewsets.ViewSet):
             })
             
         except Candidat.DoesNotExist:
-            print("❌ Candidat non trouvé")
             return Response(
                 {'error': 'Candidat non trouvé'},
                 status=status.HTTP_404_NOT_FOUND
             )
         except Exception as e:
-            print(f"❌ ERREUR GÉNÉRALE: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception('Erreur validation dossier', extra={'candidat_id': pk})
             return Response(
                 {'error': str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -1222,7 +1413,6 @@ class ResponsableFiliereViewSet(viewsets.ViewSet):
             candidat.save()
             
             # ✅ CRÉER LA NOTIFICATION DE REJET
-            print("📢 Création notification de rejet...")
             try:
                 from candidats.utils.notifications import create_notification
                 
@@ -1234,9 +1424,8 @@ class ResponsableFiliereViewSet(viewsets.ViewSet):
                     action_url='/Mon-dossier',
                     action_label='Consulter mon dossier'
                 )
-                print("   ✅ Notification créée")
-            except Exception as notif_error:
-                print(f"   ⚠️ Erreur création notification: {notif_error}")
+            except Exception:
+                logger.exception('Erreur création notification', extra={'candidat_id': candidat.id})
             
             # Envoyer l'email
             try:
@@ -1265,12 +1454,8 @@ class ResponsableFiliereViewSet(viewsets.ViewSet):
                 email.content_subtype = "html"
                 email.send(fail_silently=False)
                 
-                print(f"✅ Email de rejet envoyé à {candidat.email}")
-                
-            except Exception as email_error:
-                print(f"❌ Erreur envoi email: {email_error}")
-                import traceback
-                traceback.print_exc()
+            except Exception:
+                logger.exception('Email de rejet non envoyé', extra={'candidat_id': candidat.id})
             
             return Response({
                 'success': True,
@@ -1289,8 +1474,7 @@ class ResponsableFiliereViewSet(viewsets.ViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception('Erreur rejet dossier', extra={'candidat_id': pk})
             return Response(
                 {'error': str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -1301,6 +1485,7 @@ class AdminAcademiqueViewSet(viewsets.ViewSet):
     permission_classes = [IsAuthenticated, IsAdminAcademique]
 
     @action(detail=False, methods=['get'], url_path='dashboard-stats')
+    @lecture_sur_replique
     def dashboard_stats(self, request):
         """Statistiques du dashboard admin académique"""
         try:
@@ -1375,15 +1560,14 @@ class AdminAcademiqueViewSet(viewsets.ViewSet):
             return Response(stats)
             
         except Exception as e:
-            print(f"❌ Erreur dashboard stats: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception('Erreur dashboard stats')
             return Response(
                 {'error': str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
     @action(detail=False, methods=['get'], url_path='stats-filieres')
+    @lecture_sur_replique
     def stats_filieres(self, request):
         """Statistiques détaillées par filière"""
         try:
@@ -1427,15 +1611,14 @@ class AdminAcademiqueViewSet(viewsets.ViewSet):
             return Response(stats)
             
         except Exception as e:
-            print(f"❌ Erreur stats filières: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception('Erreur stats filières')
             return Response(
                 {'error': str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
     @action(detail=False, methods=['get'], url_path='filieres-responsables')
+    @lecture_sur_replique
     def filieres_responsables(self, request):
         """Liste des filières avec leurs responsables et statistiques"""
         try:
@@ -1471,8 +1654,8 @@ class AdminAcademiqueViewSet(viewsets.ViewSet):
                             'email': resp_user.email,
                             'telephone': getattr(resp_user.responsable_filiere_profile, 'telephone', ''),
                         }
-                except Exception as e:
-                    print(f"Erreur récupération responsable pour filière {filiere.id}: {e}")
+                except Exception:
+                    logger.exception('Erreur récupération responsable', extra={'filiere_id': filiere.id})
                     responsable_info = None
                 
                 candidats = Candidat.objects.filter(filiere=filiere)
@@ -1501,19 +1684,17 @@ class AdminAcademiqueViewSet(viewsets.ViewSet):
             return Response(data)
             
         except Exception as e:
-            print(f"❌ Erreur filieres_responsables: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception('Erreur filieres_responsables')
             return Response(
                 {'error': str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
     @action(detail=False, methods=['get'], url_path='utilisateurs')
+    @lecture_sur_replique
     def get_users(self, request):
         """Liste tous les utilisateurs avec filtres"""
         try:
-            print("📋 Chargement utilisateurs...")
             
             role = request.query_params.get('role')
             is_active = request.query_params.get('is_active')
@@ -1538,23 +1719,20 @@ class AdminAcademiqueViewSet(viewsets.ViewSet):
                     'created_at': user.created_at.isoformat() if user.created_at else None,
                 })
             
-            print(f"✅ {len(data)} utilisateurs trouvés")
             return Response(data)
             
         except Exception as e:
-            print(f"❌ Erreur get_users: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception('Erreur get_users')
             return Response(
                 {'error': str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
     @action(detail=False, methods=['get'], url_path='export-users')
+    @lecture_sur_replique
     def export_users(self, request):
         """Export Excel de tous les utilisateurs"""
         try:
-            print("📥 Export utilisateurs Excel demandé")
             
             from openpyxl import Workbook
             from openpyxl.styles import Font, PatternFill, Alignment
@@ -1614,19 +1792,17 @@ class AdminAcademiqueViewSet(viewsets.ViewSet):
             # Sauvegarder dans la réponse
             wb.save(response)
             
-            print(f"✅ Export Excel de {users.count()} utilisateurs")
             return response
             
         except Exception as e:
-            print(f"❌ Erreur export_users: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception('Erreur export_users')
             return Response(
                 {'error': str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
     @action(detail=False, methods=['get'], url_path='export-stats')
+    @lecture_sur_replique
     def export_stats(self, request):
         """Exporter les statistiques globales en CSV"""
         try:
@@ -1672,8 +1848,7 @@ class AdminAcademiqueViewSet(viewsets.ViewSet):
             return response
             
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception('Erreur export stats')
             return Response(
                 {'error': str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -0,0 +1,160 @@
+# communications/catalogue.py
+"""
+Catalogue des anciennes épreuves mis en cache.
+
+Le catalogue est public et quasi statique : on le calcule une fois par
+combinaison de filtres (filiere, annee, session) et on le garde en cache
+jusqu'à la prochaine modification d'une épreuve (voir signals.py).
+"""
+import hashlib
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+from sgee_project.routers import sur_primaire
+
+from .models import Epreuve
+from .serializers import EpreuveSerializer
+
+VERSION_KEY = 'epreuves:catalogue:version'
+
+
+# ============================================
+# VERSION DU CATALOGUE (INVALIDATION)
+# ============================================
+
+def get_version():
+    """Version courante du catalogue (créée au besoin)"""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = int(time.time() * 1000)
+        # add() : ne pas écraser une version posée en parallèle
+        if not cache.add(VERSION_KEY, version, timeout=None):
+            version = cache.get(VERSION_KEY, version)
+    return version
+
+
+def invalider_catalogue():
+    """Rend obsolètes toutes les entrées du catalogue en changeant de version"""
+    cache.set(VERSION_KEY, int(time.time() * 1000), timeout=None)
+
+
+# ============================================
+# CONSTRUCTION DU CATALOGUE
+# ============================================
+
+def _normaliser(valeur):
+    return (valeur or '').strip()
+
+
+def _cle(version, filiere, annee, session):
+    # Les filtres viennent de l'URL : on les hache pour obtenir une clé
+    # valide quel que soit le backend (memcached refuse espaces et clés longues)
+    filtres = hashlib.md5(f'{filiere}|{annee}|{session}'.encode('utf-8')).hexdigest()
+    return f'epreuves:catalogue:{version}:{filtres}'
+
+
+def _requetes(filiere, annee):
+    """(épreuves, facette années, facette filières) : querysets non évalués"""
+    queryset = Epreuve.objects.filter(is_published=True).select_related('filiere')
+    for valeur, champ in ((filiere, 'filiere'), (annee, 'annee')):
+        if not valeur:
+            continue
+        if not valeur.isdigit():
+            queryset = queryset.none()
+            break
+        queryset = queryset.filter(**{champ: int(valeur)})
+
+    # Facettes précalculées (nombre d'épreuves par année et par filière)
+    annees = queryset.order_by().values('annee').annotate(total=Count('id')).order_by('-annee')
+    filieres = queryset.order_by().values('filiere', 'filiere__libelle') \
+        .annotate(total=Count('id')).order_by('filiere__libelle')
+    return queryset, annees, filieres
+
+
+def _construire(filiere, annee):
+    queryset, annees, filieres = _requetes(filiere, annee)
+    derniere_maj = queryset.order_by().aggregate(m=Max('updated_at'))['m']
+    return _assembler(queryset, annees, filieres, derniere_maj)
+
+
+async def _aconstruire(filiere, annee):
+    """_construire avec l'ORM asynchrone"""
+    queryset, annees, filieres = _requetes(filiere, annee)
+    derniere_maj = (await queryset.order_by().aaggregate(m=Max('updated_at')))['m']
+    return _assembler(
+        [epreuve async for epreuve in queryset],
+        [row async for row in annees],
+        [row async for row in filieres],
+        derniere_maj,
+    )
+
+
+def _assembler(epreuves, annees, filieres, derniere_maj):
+    # Sans request dans le contexte, fichier_url reste relatif ; il est
+    # rendu absolu au moment de la réponse.
+    resultats = EpreuveSerializer(epreuves, many=True).data
+    resultats = json.loads(json.dumps(resultats, default=str))
+
+    facettes = {
+        'annees': [{'annee': row['annee'], 'total': row['total']} for row in annees],
+        'filieres': [
+            {'id': row['filiere'], 'libelle': row['filiere__libelle'], 'total': row['total']}
+            for row in filieres
+        ],
+    }
+
+    last_modified = int(derniere_maj.timestamp()) if derniere_maj else None
+
+    empreinte = hashlib.sha1(
+        json.dumps([resultats, facettes], sort_keys=True, separators=(',', ':')).encode('utf-8')
+    ).hexdigest()
+
+    return {
+        'results': resultats,
+        'facets': facettes,
+        'last_modified': last_modified,
+        'digest': empreinte,
+    }
+
+
+def get_catalogue(filiere=None, annee=None, session=None):
+    """
+    Retourne le catalogue filtré :
+    {'results': [...], 'facets': {...}, 'last_modified': int|None, 'digest': str}
+
+    Le paramètre `session` est conservé dans la clé pour la compatibilité
+    des URLs existantes, mais n'est plus un critère de filtrage : le champ
+    a été retiré du modèle Epreuve (migration 0003).
+    """
+    filiere, annee, session = _normaliser(filiere), _normaliser(annee), _normaliser(session)
+    cle = _cle(get_version(), filiere, annee, session)
+
+    catalogue = cache.get(cle)
+    if catalogue is None:
+        # Primaire : une réplique en retard figerait un état périmé
+        with sur_primaire():
+            catalogue = _construire(filiere, annee)
+        cache.set(cle, catalogue, timeout=settings.EPREUVES_CATALOGUE_TTL)
+    return catalogue
+
+
+async def aget_catalogue(filiere=None, annee=None, session=None):
+    """get_catalogue pour les vues asynchrones (cache et ORM asynchrones)"""
+    filiere, annee, session = _normaliser(filiere), _normaliser(annee), _normaliser(session)
+    version = await cache.aget(VERSION_KEY)
+    if version is None:
+        version = await sync_to_async(get_version)()
+    cle = _cle(version, filiere, annee, session)
+
+    catalogue = await cache.aget(cle)
+    if catalogue is None:
+        # Primaire : une réplique en retard figerait un état périmé
+        with sur_primaire():
+            catalogue = await _aconstruire(filiere, annee)
+        await cache.aset(cle, catalogue, timeout=settings.EPREUVES_CATALOGUE_TTL)
+    return catalogue
@@ -82,8 +82,11 @@ class Epreuve(models.Model):
         super().save(*args, **kwargs)
     
     def incrementer_telechargements(self):
+        # Incrément fait par la base : pas de téléchargement perdu entre deux requêtes simultanées
+        Epreuve.objects.filter(pk=self.pk).update(
+            nombre_telechargements=models.F('nombre_telechargements') + 1
+        )
         self.nombre_telechargements += 1
-        self.save(update_fields=['nombre_telechargements'])
 
 class Actualite(models.Model):
     titre = models.CharField(max_length=255)
@@ -48,6 +48,9 @@ class EpreuveSerializer(serializers.ModelSerializer):
     
     def get_fichier_url(self, obj):
         request = self.context.get('request')
-        if obj.fichier and request:
+        if not obj.fichier:
+            return None
+        if request:
             return request.build_absolute_uri(obj.fichier.url)
-        return None
+        # Sans requête (catalogue en cache) : URL relative
+        return obj.fichier.url
@@ -0,0 +1,29 @@
+# communications/signals.py
+"""Invalidation du catalogue des épreuves à chaque modification"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from configurations.models import Filiere
+
+from .catalogue import invalider_catalogue
+from .models import Epreuve
+
+
+@receiver(post_save, sender=Epreuve)
+def epreuve_modifiee(sender, instance, update_fields=None, **kwargs):
+    # Le simple compteur de téléchargements ne justifie pas de vider le cache
+    if update_fields and set(update_fields) == {'nombre_telechargements'}:
+        return
+    invalider_catalogue()
+
+
+@receiver(post_delete, sender=Epreuve)
+def epreuve_supprimee(sender, instance, **kwargs):
+    invalider_catalogue()
+
+
+@receiver(post_save, sender=Filiere)
+@receiver(post_delete, sender=Filiere)
+def filiere_modifiee(sender, instance, **kwargs):
+    # Le libellé de la filière est recopié dans le catalogue
+    invalider_catalogue()
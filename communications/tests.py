@@ -1,3 +1,109 @@
-from django.test import TestCase
+import shutil
+import tempfile
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+
+from configurations.models import Filiere
+
+from .models import Epreuve
+
+MEDIA_TEST = tempfile.mkdtemp(prefix='sgee-media-')
+
+
+def tearDownModule():
+    shutil.rmtree(MEDIA_TEST, ignore_errors=True)
+
+
+def creer_epreuve(filiere, titre='Mathématiques', annee=2025, **champs):
+    return Epreuve.objects.create(
+        titre=titre, filiere=filiere, annee=annee,
+        fichier=SimpleUploadedFile(f'{titre}.pdf', b'%PDF-1.4 test', content_type='application/pdf'),
+        **champs
+    )
+
+
+# ============================================
+# TÉLÉCHARGEMENT DES ÉPREUVES
+# ============================================
+
+@override_settings(MEDIA_ROOT=MEDIA_TEST)
+class TelechargementEpreuveTests(TestCase):
+
+    def setUp(self):
+        self.epreuve = creer_epreuve(Filiere.objects.create(code='INF', libelle='Informatique'))
+
+    def test_compteur_incremente(self):
+        for _ in range(2):
+            response = self.client.get(f'/api/epreuves/{self.epreuve.pk}/telecharger/')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(b''.join(response.streaming_content), b'%PDF-1.4 test')
+        self.epreuve.refresh_from_db()
+        self.assertEqual(self.epreuve.nombre_telechargements, 2)
+
+    def test_epreuve_non_publiee_introuvable(self):
+        self.epreuve.is_published = False
+        self.epreuve.save()
+        self.assertEqual(self.client.get(f'/api/epreuves/{self.epreuve.pk}/telecharger/').status_code, 404)
+
+
+# ============================================
+# CATALOGUE EN CACHE (ETag / Last-Modified)
+# ============================================
+
+@override_settings(MEDIA_ROOT=MEDIA_TEST)
+class CatalogueEpreuvesTests(TestCase):
+    URL = '/api/epreuves/'
+
+    def setUp(self):
+        cache.clear()
+        self.informatique = Filiere.objects.create(code='INF', libelle='Informatique')
+        self.gestion = Filiere.objects.create(code='GES', libelle='Gestion')
+        creer_epreuve(self.informatique, 'Algorithmique', 2024)
+        creer_epreuve(self.informatique, 'Réseaux', 2025)
+        creer_epreuve(self.gestion, 'Comptabilité', 2025)
+
+    def test_validateurs_et_304(self):
+        response = self.client.get(self.URL)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 3)
+        self.assertTrue(response.has_header('Last-Modified'))
+        self.assertIn('must-revalidate', response['Cache-Control'])
+
+        revalidation = self.client.get(self.URL, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(revalidation.status_code, 304)
+        self.assertEqual(revalidation['ETag'], response['ETag'])
+
+    def test_servi_depuis_le_cache(self):
+        self.client.get(self.URL)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.URL).status_code, 200)
+
+    def test_invalide_par_une_nouvelle_epreuve(self):
+        etag = self.client.get(self.URL)['ETag']
+        creer_epreuve(self.gestion, 'Marketing', 2025)
+
+        response = self.client.get(self.URL, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 4)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_telechargement_n_invalide_pas(self):
+        etag = self.client.get(self.URL)['ETag']
+        epreuve = Epreuve.objects.first()
+        b''.join(self.client.get(f'/api/epreuves/{epreuve.pk}/telecharger/').streaming_content)
+        self.assertEqual(self.client.get(self.URL, headers={'If-None-Match': etag}).status_code, 304)
+
+    def test_filtres_et_facettes(self):
+        donnees = self.client.get(self.URL, {'filiere': self.informatique.pk}).json()
+        self.assertEqual(donnees['count'], 2)
+        self.assertEqual(donnees['facets']['annees'], [{'annee': 2025, 'total': 1}, {'annee': 2024, 'total': 1}])
+        self.assertEqual(donnees['facets']['filieres'], [{'id': self.informatique.pk, 'libelle': 'Informatique', 'total': 2}])
+        self.assertEqual(self.client.get(self.URL, {'annee': 'abc'}).json()['count'], 0)
+
+    def test_etag_propre_a_chaque_url(self):
+        tous = self.client.get(self.URL)['ETag']
+        filtres = self.client.get(self.URL, {'annee': 2025})
+        self.assertNotEqual(filtres['ETag'], tous)
+        self.assertEqual(self.client.get(self.URL, {'annee': 2025}, headers={'If-None-Match': tous}).status_code, 200)
@@ -1,11 +1,17 @@
 # communications/urls.py
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import EpreuveViewSet
+from .views import EpreuveViewSet, aepreuves_list
 
 router = DefaultRouter()
 router.register(r'epreuves', EpreuveViewSet, basename='epreuve')
 
 urlpatterns = [
     path('', include(router.urls)),
-]
\ No newline at end of file
+]
+
+# Sous ASGI (VUES_ASYNCHRONES), la liste passe par la vue asynchrone
+# (avant le router ; détail et téléchargement restent dans le ViewSet)
+if settings.VUES_ASYNCHRONES:
+    urlpatterns.insert(0, path('epreuves/', aepreuves_list, name='epreuve-list'))
\ No newline at end of file
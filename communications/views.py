@@ -1,8 +1,14 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from django.http import FileResponse
+from django.views.decorators.http import require_GET
+from sgee_project.http import appliquer_validateurs, calculer_etag, reponse_json, reponse_non_modifiee
+from sgee_project.routers import lecture_sur_replique
+from .catalogue import aget_catalogue, get_catalogue
 from .models import Epreuve
 from .serializers import EpreuveSerializer
 
@@ -23,17 +29,49 @@ class EpreuveViewSet(viewsets.ReadOnlyModelViewSet):
         # Filtres optionnels
         filiere = self.request.query_params.get('filiere')
         annee = self.request.query_params.get('annee')
-        session = self.request.query_params.get('session')
         
         if filiere:
             queryset = queryset.filter(filiere=filiere)
         if annee:
             queryset = queryset.filter(annee=annee)
-        if session:
-            queryset = queryset.filter(session=session)
         
         return queryset
     
+    def list(self, request, *args, **kwargs):
+        """
+        Liste servie depuis le catalogue en cache.
+        ETag fort + Last-Modified : le client revalide et reçoit un 304
+        tant que le catalogue n'a pas changé.
+        """
+        catalogue = get_catalogue(
+            filiere=request.query_params.get('filiere'),
+            annee=request.query_params.get('annee'),
+            session=request.query_params.get('session'),
+        )
+        
+        # L'URL complète (page, filtres) fait partie de la représentation
+        etag = calculer_etag(catalogue['digest'], request.get_host(), request.get_full_path())
+        last_modified = catalogue['last_modified']
+        
+        non_modifiee = reponse_non_modifiee(request, etag, last_modified)
+        if non_modifiee is not None:
+            return non_modifiee
+        
+        page = self.paginate_queryset(catalogue['results'])
+        lignes = _urls_absolues(request, page if page is not None else catalogue['results'])
+        
+        if page is not None:
+            response = self.get_paginated_response(lignes)
+            response.data['facets'] = catalogue['facets']
+        else:
+            response = Response({'results': lignes, 'facets': catalogue['facets']})
+        
+        return appliquer_validateurs(response, etag, last_modified)
+    
+    @lecture_sur_replique
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+    
     @action(detail=True, methods=['get'])
     def telecharger(self, request, pk=None):
         """Télécharger une épreuve"""
@@ -43,5 +81,49 @@ class EpreuveViewSet(viewsets.ReadOnlyModelViewSet):
         response = FileResponse(epreuve.fichier.open('rb'))
         response['Content-Disposition'] = f'attachment; filename="{epreuve.slug}.pdf"'
         return response
+
+
+def _urls_absolues(request, lignes):
+    """Le catalogue garde des fichier_url relatifs : rendus absolus pour la requête"""
+    return [
+        {**ligne, 'fichier_url': request.build_absolute_uri(ligne['fichier_url'])}
+        if ligne.get('fichier_url') else ligne
+        for ligne in lignes
+    ]
+
+
+@require_GET
+async def aepreuves_list(request):
+    """
+    EpreuveViewSet.list pour le serveur ASGI (VUES_ASYNCHRONES) : même
+    catalogue (cache et ORM asynchrones), mêmes validateurs, même pagination.
+    """
+    catalogue = await aget_catalogue(
+        filiere=request.GET.get('filiere'),
+        annee=request.GET.get('annee'),
+        session=request.GET.get('session'),
+    )
+    
+    etag = calculer_etag(catalogue['digest'], request.get_host(), request.get_full_path())
+    last_modified = catalogue['last_modified']
+    
+    non_modifiee = reponse_non_modifiee(request, etag, last_modified)
+    if non_modifiee is not None:
+        return non_modifiee
+    
+    paginator = EpreuveViewSet.pagination_class()
+    try:
+        page = paginator.paginate_queryset(catalogue['results'], Request(request))
+    except NotFound as exc:
+        return reponse_json({'detail': exc.detail}, status=status.HTTP_404_NOT_FOUND)
+    lignes = _urls_absolues(request, page if page is not None else catalogue['results'])
+    
+    if page is not None:
+        donnees = paginator.get_paginated_response(lignes).data
+        donnees['facets'] = catalogue['facets']
+    else:
+        donnees = {'results': lignes, 'facets': catalogue['facets']}
+    
+    return appliquer_validateurs(reponse_json(donnees), etag, last_modified)
    
     
\ No newline at end of file
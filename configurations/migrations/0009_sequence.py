@@ -0,0 +1,29 @@
+# Generated by Django 5.1.4 on 2026-10-19 18:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('configurations', '0008_alter_filiere_options_filiere_campus_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Sequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prefixe', models.CharField(max_length=10)),
+                ('annee', models.PositiveIntegerField()),
+                ('dernier', models.PositiveBigIntegerField(default=0, help_text='Dernier numéro réservé')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Séquence',
+                'verbose_name_plural': 'Séquences',
+                'db_table': 'sequence',
+                'unique_together': {('prefixe', 'annee')},
+            },
+        ),
+    ]
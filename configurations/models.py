@@ -389,3 +389,24 @@ class SerieFiliere(models.Model):  # Table de liaison Serie → Filiere
 
     class Meta:
         unique_together = ['serie', 'filiere', 'niveau']
+
+
+class Sequence(models.Model):
+    """
+    Compteur de numéros par préfixe et par année (matricules, dossiers,
+    inscriptions). Les processus en réservent des blocs : voir
+    configurations/sequences.py.
+    """
+    prefixe = models.CharField(max_length=10)
+    annee = models.PositiveIntegerField()
+    dernier = models.PositiveBigIntegerField(default=0, help_text="Dernier numéro réservé")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'sequence'
+        verbose_name = 'Séquence'
+        verbose_name_plural = 'Séquences'
+        unique_together = ['prefixe', 'annee']
+
+    def __str__(self):
+        return f"{self.prefixe}{self.annee} → {self.dernier}"
@@ -0,0 +1,278 @@
+# configurations/registry.py
+"""
+Registre en mémoire des données de référence (bacs, séries, filières...).
+
+Ces données changent quelques fois par an mais sont lues à chaque étape
+du formulaire d'enrôlement. On les charge une fois par processus dans des
+structures immuables (tuples + MappingProxyType) indexées par identifiant.
+
+Invalidation :
+- une clé de version est stockée dans le cache partagé ;
+- chaque save/delete d'un modèle de configuration change cette version
+  (voir signals.py) ;
+- chaque processus compare sa version locale à celle du cache et
+  reconstruit son instantané si elles diffèrent.
+
+Avec le cache LocMem (défaut), la clé de version est propre à chaque
+processus : une modification faite dans un worker n'invalide pas les
+autres, qui ne se mettent à jour qu'au bout de REFERENTIEL_TTL. Avec
+plusieurs workers, configurer un cache partagé (Redis/Memcached).
+"""
+import dataclasses
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.utils.encoders import JSONEncoder
+
+from sgee_project.routers import sur_primaire
+
+from candidats.models import Region, Departement
+from .models import (
+    Filiere, Niveau, Diplome, FiliereDiplome, CentreExamen, CentreDepot,
+    Bac, Serie, Mention, SerieFiliere
+)
+from .serializers import (
+    FiliereSerializer, NiveauSerializer, DiplomeSerializer,
+    CentreExamenSerializer, CentreDepotSerializer,
+    BacSerializer, SerieSerializer, MentionSerializer,
+    RegionSerializer, DepartementSerializer
+)
+
+VERSION_KEY = 'configurations:registre:version'
+
+VIDE = ()
+
+
+@dataclass(frozen=True)
+class Instantane:
+    """Photographie immuable des données de référence"""
+    version: int
+    charge_le: float
+
+    # Listes simples (mêmes filtres que les vues ListAPIView)
+    filieres: tuple
+    niveaux: tuple
+    diplomes: tuple
+    centres_examen: tuple
+    centres_depot: tuple
+    bacs: tuple
+    series: tuple
+    mentions: tuple
+    regions: tuple
+    departements: tuple
+
+    # Index de la cascade
+    series_par_bac: MappingProxyType          # bac_id -> (serie, ...)
+    mentions_par_bac: MappingProxyType        # bac_id -> (mention, ...)
+    filieres_par_serie: MappingProxyType      # serie_id -> (filiere, ...)
+    niveaux_par_serie_filiere: MappingProxyType    # (serie_id, filiere_id) -> (niveau, ...)
+    diplomes_par_filiere_niveau: MappingProxyType  # (filiere_id, niveau_id) -> (diplome, ...)
+
+    # Document "bootstrap" précalculé (JSON compact) et son ETag
+    bootstrap: bytes = b''
+    bootstrap_etag: str = ''
+
+
+# ============================================
+# VERSION (PARTAGÉE ENTRE PROCESSUS)
+# ============================================
+
+def get_version():
+    """Version courante du référentiel (créée au besoin)"""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = int(time.time() * 1000)
+        if not cache.add(VERSION_KEY, version, timeout=None):
+            version = cache.get(VERSION_KEY, version)
+    return version
+
+
+def invalider_registre():
+    """Force la reconstruction du registre dans tous les processus"""
+    cache.set(VERSION_KEY, int(time.time() * 1000), timeout=None)
+
+
+# ============================================
+# CONSTRUCTION
+# ============================================
+
+def _lignes(serializer_class, queryset):
+    """Sérialise un queryset en tuple de dicts simples"""
+    return tuple(dict(ligne) for ligne in serializer_class(queryset, many=True).data)
+
+
+def _indexer(paires):
+    """[(clé, ligne), ...] -> MappingProxyType {clé: (ligne, ...)} (ordre conservé)"""
+    index = {}
+    for cle, ligne in paires:
+        index.setdefault(cle, []).append(ligne)
+    return MappingProxyType({cle: tuple(lignes) for cle, lignes in index.items()})
+
+
+def _ids(index):
+    """{clé: (ligne, ...)} -> {"clé": [id, ...]} (clés composées jointes par ':')"""
+    return {
+        ':'.join(map(str, cle)) if isinstance(cle, tuple) else str(cle): [ligne['id'] for ligne in lignes]
+        for cle, lignes in index.items()
+    }
+
+
+def _document_bootstrap(instantane):
+    """
+    Document unique décrivant tout le formulaire d'enrôlement.
+    Les objets apparaissent une seule fois ; la cascade ne référence que
+    leurs identifiants. La version est l'empreinte du contenu : elle est
+    identique dans tous les processus et ne change que si les données changent.
+    """
+    contenu = {
+        'bacs': instantane.bacs,
+        'series': instantane.series,
+        'mentions': instantane.mentions,
+        'filieres': instantane.filieres,
+        'niveaux': instantane.niveaux,
+        'diplomes': instantane.diplomes,
+        'centres_examen': instantane.centres_examen,
+        'centres_depot': instantane.centres_depot,
+        'regions': instantane.regions,
+        'departements': instantane.departements,
+        'cascade': {
+            'series_par_bac': _ids(instantane.series_par_bac),
+            'mentions_par_bac': _ids(instantane.mentions_par_bac),
+            'filieres_par_serie': _ids(instantane.filieres_par_serie),
+            'niveaux_par_serie_filiere': _ids(instantane.niveaux_par_serie_filiere),
+            'diplomes_par_filiere_niveau': _ids(instantane.diplomes_par_filiere_niveau),
+        },
+    }
+    brut = json.dumps(contenu, cls=JSONEncoder, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+    empreinte = hashlib.sha1(brut.encode('utf-8')).hexdigest()
+    document = json.dumps(
+        {'version': empreinte[:16], **contenu},
+        cls=JSONEncoder, ensure_ascii=False, separators=(',', ':')
+    ).encode('utf-8')
+    return document, f'"{empreinte}"'
+
+
+def _construire(version):
+    filieres = _lignes(FiliereSerializer, Filiere.objects.filter(is_active=True))
+    niveaux = _lignes(NiveauSerializer, Niveau.objects.order_by('ordre'))
+    diplomes = _lignes(DiplomeSerializer, Diplome.objects.order_by('pk'))
+    bacs = _lignes(BacSerializer, Bac.objects.order_by('pk'))
+    series = _lignes(SerieSerializer, Serie.objects.order_by('pk'))
+    mentions = _lignes(
+        MentionSerializer,
+        Mention.objects.filter(is_active=True).select_related('bac')
+    )
+
+    filieres_par_id = {f['id']: f for f in filieres}
+    niveaux_par_id = {n['id']: n for n in niveaux}
+    diplomes_par_id = {d['id']: d for d in diplomes}
+
+    # Séries -> filières (actives, sans doublon, triées comme Filiere.Meta)
+    liens = list(
+        SerieFiliere.objects.order_by().values_list('serie_id', 'filiere_id', 'niveau_id')
+    )
+    filieres_par_serie = {}
+    niveaux_par_serie_filiere = {}
+    for serie_id, filiere_id, niveau_id in liens:
+        if filiere_id in filieres_par_id:
+            filieres_par_serie.setdefault(serie_id, set()).add(filiere_id)
+        if niveau_id in niveaux_par_id:
+            niveaux_par_serie_filiere.setdefault((serie_id, filiere_id), set()).add(niveau_id)
+
+    ordre_filiere = {f['id']: i for i, f in enumerate(filieres)}
+    ordre_niveau = {n['id']: i for i, n in enumerate(niveaux)}
+
+    # Filière + niveau -> diplômes
+    diplomes_par_filiere_niveau = {}
+    for filiere_id, niveau_id, diplome_id in FiliereDiplome.objects.order_by().values_list(
+        'filiere_id', 'niveau_id', 'diplome_id'
+    ):
+        if diplome_id in diplomes_par_id:
+            diplomes_par_filiere_niveau.setdefault((filiere_id, niveau_id), set()).add(diplome_id)
+
+    instantane = Instantane(
+        version=version,
+        charge_le=time.monotonic(),
+        filieres=filieres,
+        niveaux=niveaux,
+        diplomes=diplomes,
+        centres_examen=_lignes(
+            CentreExamenSerializer, CentreExamen.objects.filter(is_active=True).order_by('pk')
+        ),
+        centres_depot=_lignes(
+            CentreDepotSerializer, CentreDepot.objects.filter(is_active=True).order_by('pk')
+        ),
+        bacs=bacs,
+        series=series,
+        mentions=mentions,
+        regions=_lignes(RegionSerializer, Region.objects.order_by('pk')),
+        departements=_lignes(DepartementSerializer, Departement.objects.order_by('pk')),
+        series_par_bac=_indexer((s['bac'], s) for s in series),
+        mentions_par_bac=_indexer((m['bac'], m) for m in mentions),
+        filieres_par_serie=MappingProxyType({
+            serie_id: tuple(filieres_par_id[i] for i in sorted(ids, key=ordre_filiere.get))
+            for serie_id, ids in filieres_par_serie.items()
+        }),
+        niveaux_par_serie_filiere=MappingProxyType({
+            cle: tuple(niveaux_par_id[i] for i in sorted(ids, key=ordre_niveau.get))
+            for cle, ids in niveaux_par_serie_filiere.items()
+        }),
+        diplomes_par_filiere_niveau=MappingProxyType({
+            cle: tuple(diplomes_par_id[i] for i in sorted(ids))
+            for cle, ids in diplomes_par_filiere_niveau.items()
+        }),
+    )
+    document, etag = _document_bootstrap(instantane)
+    return dataclasses.replace(instantane, bootstrap=document, bootstrap_etag=etag)
+
+
+# ============================================
+# ACCÈS
+# ============================================
+
+_instantane = None
+_verrou = threading.Lock()
+
+
+def get_registre():
+    """
+    Retourne l'instantané courant, reconstruit si la version partagée a
+    changé ou s'il est plus vieux que REFERENTIEL_TTL (filet de sécurité
+    pour les modifications faites sans signal : update() en masse, SQL).
+    """
+    global _instantane
+
+    version = get_version()
+    courant = _instantane
+    if courant is not None and courant.version == version \
+            and time.monotonic() - courant.charge_le < settings.REFERENTIEL_TTL:
+        return courant
+
+    with _verrou:
+        courant = _instantane
+        if courant is None or courant.version != version \
+                or time.monotonic() - courant.charge_le >= settings.REFERENTIEL_TTL:
+            # Primaire : une réplique en retard figerait un état périmé
+            with sur_primaire():
+                courant = _construire(version)
+            _instantane = courant
+    return courant
+
+
+async def aget_registre():
+    """
+    get_registre pour les vues asynchrones : l'instantané à jour est rendu
+    sans quitter la boucle, seule une reconstruction passe par un thread.
+    """
+    courant = _instantane
+    if courant is not None and courant.version == await cache.aget(VERSION_KEY) \
+            and time.monotonic() - courant.charge_le < settings.REFERENTIEL_TTL:
+        return courant
+    return await sync_to_async(get_registre)()
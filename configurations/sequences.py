@@ -0,0 +1,107 @@
+# configurations/sequences.py
+"""
+Numéros séquentiels sans collision : matricules, dossiers, inscriptions.
+
+Format : PREFIXE + année + numéro sur 6 chiffres + chiffre de contrôle,
+par exemple CAND + 2026 + 000042 + 6 → CAND20260000426.
+
+Chaque processus réserve un bloc de SEQUENCE_TAILLE_BLOC numéros en une
+seule requête verrouillée sur la ligne Sequence(prefixe, annee), puis les
+distribue en mémoire. La réservation passe par la connexion « sequences »
+et est validée tout de suite : si la transaction de l'appelant échoue, le
+bloc reste réservé (au pire un trou dans la numérotation, jamais un
+doublon). Sans cette connexion, ou sous SQLite (un seul écrivain à la
+fois : la seconde connexion attendrait la fin de la transaction en cours),
+chaque numéro est réservé un par un dans la transaction courante.
+
+Le chiffre de contrôle (algorithme de Damm) détecte toute erreur sur un
+chiffre et toute inversion de deux chiffres voisins.
+"""
+import threading
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+from .models import Sequence
+
+ALIAS = 'sequences'
+LARGEUR_NUMERO = 6
+
+_DAMM = (
+    (0, 3, 1, 7, 5, 9, 8, 6, 4, 2),
+    (7, 0, 9, 2, 1, 5, 4, 8, 6, 3),
+    (4, 2, 0, 6, 8, 7, 1, 3, 5, 9),
+    (1, 7, 5, 0, 9, 8, 3, 4, 2, 6),
+    (6, 1, 2, 3, 0, 4, 5, 9, 7, 8),
+    (3, 6, 7, 4, 2, 0, 9, 5, 8, 1),
+    (5, 8, 6, 9, 7, 2, 0, 1, 3, 4),
+    (8, 9, 4, 5, 3, 6, 2, 0, 1, 7),
+    (9, 4, 3, 8, 6, 1, 7, 2, 0, 5),
+    (2, 5, 8, 1, 4, 3, 6, 7, 9, 0),
+)
+
+_blocs = {}  # (prefixe, annee) -> [prochain, dernier]
+_verrou = threading.Lock()
+
+
+def chiffre_controle(chiffres):
+    """Chiffre de contrôle de Damm d'une chaîne de chiffres"""
+    interim = 0
+    for c in chiffres:
+        interim = _DAMM[interim][int(c)]
+    return str(interim)
+
+
+def est_valide(identifiant, prefixe):
+    """True si l'identifiant a le format attendu et un chiffre de contrôle correct"""
+    chiffres = identifiant[len(prefixe):] if identifiant.startswith(prefixe) else ''
+    return (
+        len(chiffres) == 4 + LARGEUR_NUMERO + 1
+        and chiffres.isdigit()
+        and chiffre_controle(chiffres) == '0'
+    )
+
+
+def _connexion_dediee():
+    return ALIAS in settings.DATABASES and connections[ALIAS].vendor != 'sqlite'
+
+
+def _reserver(prefixe, annee, taille):
+    """Réserve `taille` numéros ; retourne (premier, dernier)"""
+    alias = ALIAS if _connexion_dediee() else DEFAULT_DB_ALIAS
+    with transaction.atomic(using=alias):
+        sequence, _ = (
+            Sequence.objects.using(alias)
+            .select_for_update()
+            .get_or_create(prefixe=prefixe, annee=annee)
+        )
+        premier = sequence.dernier + 1
+        sequence.dernier += taille
+        sequence.save(using=alias, update_fields=['dernier', 'updated_at'])
+    return premier, sequence.dernier
+
+
+def prochain_numero(prefixe, annee):
+    if not _connexion_dediee():
+        # Réservation liée à la transaction courante : pas de cache possible
+        return _reserver(prefixe, annee, 1)[0]
+
+    cle = (prefixe, annee)
+    with _verrou:
+        bloc = _blocs.get(cle)
+        if bloc is None or bloc[0] > bloc[1]:
+            bloc = _blocs[cle] = list(_reserver(prefixe, annee, settings.SEQUENCE_TAILLE_BLOC))
+        numero = bloc[0]
+        bloc[0] += 1
+    return numero
+
+
+def allouer(prefixe):
+    """Nouvel identifiant unique pour ce préfixe, ex. allouer('CAND')"""
+    annee = timezone.now().year
+    numero = prochain_numero(prefixe, annee)
+    if numero >= 10 ** LARGEUR_NUMERO:
+        raise ValueError(f"Séquence {prefixe}{annee} épuisée")
+    chiffres = f"{annee}{numero:0{LARGEUR_NUMERO}d}"
+    return f"{prefixe}{chiffres}{chiffre_controle(chiffres)}"
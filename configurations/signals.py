@@ -0,0 +1,24 @@
+# configurations/signals.py
+"""Invalidation du registre des données de référence"""
+from django.db.models.signals import post_delete, post_save
+
+from candidats.models import Region, Departement
+from .models import (
+    Filiere, Niveau, Diplome, FiliereDiplome, CentreExamen, CentreDepot,
+    Bac, Serie, Mention, SerieFiliere
+)
+from .registry import invalider_registre
+
+MODELES_REFERENTIEL = (
+    Filiere, Niveau, Diplome, FiliereDiplome, CentreExamen, CentreDepot,
+    Bac, Serie, Mention, SerieFiliere, Region, Departement,
+)
+
+
+def referentiel_modifie(sender, **kwargs):
+    invalider_registre()
+
+
+for modele in MODELES_REFERENTIEL:
+    post_save.connect(referentiel_modifie, sender=modele, dispatch_uid=f'registre_save_{modele._meta.label}')
+    post_delete.connect(referentiel_modifie, sender=modele, dispatch_uid=f'registre_delete_{modele._meta.label}')
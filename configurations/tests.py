@@ -1,3 +1,139 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 
-# Create your tests here.
+from candidats.models import Region
+from . import registry
+from .models import Bac, Filiere, Mention, Niveau, Serie, SerieFiliere
+
+
+class ReferentielMixin:
+    """Petit référentiel : un BAC, deux séries, deux filières, deux niveaux"""
+
+    def setUp(self):
+        cache.clear()
+        registry._instantane = None
+        self.bac = Bac.objects.create(code='C', libelle='Baccalauréat C')
+        self.serie_c = Serie.objects.create(code='C', libelle='Série C', bac=self.bac)
+        self.serie_d = Serie.objects.create(code='D', libelle='Série D', bac=self.bac)
+        self.informatique = Filiere.objects.create(code='INF', libelle='Informatique')
+        self.genie_civil = Filiere.objects.create(code='GC', libelle='Génie civil')
+        self.l1 = Niveau.objects.create(code='L1', libelle='Première année', ordre=1)
+        self.l3 = Niveau.objects.create(code='L3', libelle='Troisième année', ordre=3)
+        for filiere in (self.informatique, self.genie_civil):
+            SerieFiliere.objects.create(serie=self.serie_c, filiere=filiere, niveau=self.l3)
+            SerieFiliere.objects.create(serie=self.serie_c, filiere=filiere, niveau=self.l1)
+        Mention.objects.create(bac=self.bac, code='TB', libelle='Très Bien', minimum_points=16, maximum_points=20)
+
+    def tearDown(self):
+        registry._instantane = None
+
+
+# ============================================
+# REGISTRE EN MÉMOIRE
+# ============================================
+
+class RegistreTests(ReferentielMixin, TestCase):
+
+    def ids(self, url):
+        """Identifiants renvoyés par un endpoint de la cascade (liste non paginée)"""
+        return [ligne['id'] for ligne in self.client.get(url).json()]
+
+    def test_cascade(self):
+        self.assertEqual(self.ids(f'/api/config/bacs/{self.bac.pk}/series/'), [self.serie_c.pk, self.serie_d.pk])
+        self.assertEqual(self.ids(f'/api/config/bacs/{self.bac.pk}/mentions/'), [Mention.objects.get().pk])
+        # Ordre de Filiere.Meta, sans doublon malgré les deux niveaux
+        self.assertEqual(
+            self.ids(f'/api/config/series/{self.serie_c.pk}/filieres/'),
+            list(Filiere.objects.values_list('pk', flat=True)),
+        )
+        self.assertEqual(
+            self.ids(f'/api/config/series/{self.serie_c.pk}/filieres/{self.informatique.pk}/niveaux/'),
+            [self.l1.pk, self.l3.pk],
+        )
+        self.assertEqual(self.ids(f'/api/config/series/{self.serie_d.pk}/filieres/'), [])
+        self.assertEqual(self.ids('/api/config/bacs/999/series/'), [])
+
+    def test_listes_paginees(self):
+        donnees = self.client.get('/api/config/filieres/').json()
+        self.assertEqual(donnees['count'], 2)
+        self.assertEqual({ligne['code'] for ligne in donnees['results']}, {'INF', 'GC'})
+
+    def test_servi_sans_requete(self):
+        self.client.get('/api/config/filieres/')
+        with self.assertNumQueries(0):
+            self.client.get('/api/config/filieres/')
+            self.client.get(f'/api/config/series/{self.serie_c.pk}/filieres/')
+            self.client.get(f'/api/config/bacs/{self.bac.pk}/series/')
+
+    def test_invalide_par_save_et_delete(self):
+        self.assertEqual(self.client.get('/api/config/filieres/').json()['count'], 2)
+
+        self.genie_civil.is_active = False
+        self.genie_civil.save()
+        self.assertEqual(self.ids(f'/api/config/series/{self.serie_c.pk}/filieres/'), [self.informatique.pk])
+
+        self.serie_d.delete()
+        self.assertEqual(self.ids(f'/api/config/bacs/{self.bac.pk}/series/'), [self.serie_c.pk])
+
+        Region.objects.create(nom='Centre', code='CE')
+        self.assertEqual(self.client.get('/api/config/regions/').json()['count'], 1)
+
+    def test_instantane_immuable(self):
+        instantane = registry.get_registre()
+        self.assertIs(registry.get_registre(), instantane)
+        with self.assertRaises(TypeError):
+            instantane.series_par_bac[self.bac.pk] = ()
+
+    def test_reconstruit_apres_ttl(self):
+        # update() en masse : pas de signal, seul le TTL rattrape la modification
+        self.assertEqual(self.client.get('/api/config/filieres/').json()['count'], 2)
+        Filiere.objects.filter(pk=self.genie_civil.pk).update(is_active=False)
+        self.assertEqual(self.client.get('/api/config/filieres/').json()['count'], 2)
+
+        with override_settings(REFERENTIEL_TTL=0):
+            self.assertEqual(self.client.get('/api/config/filieres/').json()['count'], 1)
+
+
+# ============================================
+# BOOTSTRAP DU FORMULAIRE
+# ============================================
+
+class BootstrapTests(ReferentielMixin, TestCase):
+    URL = '/api/config/bootstrap/'
+
+    def test_document_complet(self):
+        response = self.client.get(self.URL)
+        self.assertEqual(response.status_code, 200)
+        document = response.json()
+        self.assertEqual(len(document['version']), 16)
+        self.assertEqual({s['id'] for s in document['series']}, {self.serie_c.pk, self.serie_d.pk})
+        cascade = document['cascade']
+        self.assertEqual(cascade['series_par_bac'], {str(self.bac.pk): [self.serie_c.pk, self.serie_d.pk]})
+        self.assertEqual(
+            cascade['niveaux_par_serie_filiere'][f'{self.serie_c.pk}:{self.informatique.pk}'],
+            [self.l1.pk, self.l3.pk],
+        )
+        self.assertNotIn(str(self.serie_d.pk), cascade['filieres_par_serie'])
+
+    def test_etag_et_304(self):
+        response = self.client.get(self.URL)
+        self.assertRegex(response['ETag'], r'^"[0-9a-f]{40}"$')
+        self.assertIn('must-revalidate', response['Cache-Control'])
+
+        with self.assertNumQueries(0):
+            revalidation = self.client.get(self.URL, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(revalidation.status_code, 304)
+        self.assertEqual(revalidation['ETag'], response['ETag'])
+
+    def test_etag_suit_le_contenu(self):
+        etag = self.client.get(self.URL)['ETag']
+
+        # Nouvelle version sans changement de données : même ETag (empreinte du contenu)
+        registry.invalider_registre()
+        self.assertEqual(self.client.get(self.URL, headers={'If-None-Match': etag}).status_code, 304)
+
+        Serie.objects.create(code='E', libelle='Série E', bac=self.bac)
+        response = self.client.get(self.URL, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(len(response.json()['series']), 3)
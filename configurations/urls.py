@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from . import views
@@ -6,6 +7,12 @@ from . import views
 router = DefaultRouter()
 router.register(r'filieres-admin', views.FiliereViewSet, basename='filiere-admin')
 
+
+def cascade(nom):
+    """Vue cascade : version asynchrone (préfixe a) sous ASGI si VUES_ASYNCHRONES"""
+    return getattr(views, f'a{nom}' if settings.VUES_ASYNCHRONES else nom)
+
+
 urlpatterns = [
     # ========================================
     # FILIÈRES ADMIN (ViewSet CRUD complet)
@@ -36,13 +43,18 @@ urlpatterns = [
     path('regions/', views.RegionListView.as_view(), name='regions'),
     path('departements/', views.DepartementListView.as_view(), name='departements'),
     
+    # ========================================
+    # BOOTSTRAP (toute la cascade en un seul document)
+    # ========================================
+    path('bootstrap/', views.bootstrap, name='bootstrap'),
+    
     # ========================================
     # ENDPOINTS CASCADE
     # ========================================
-    path('bacs/<int:bac_id>/mentions/', views.mentions_by_bac, name='mentions_by_bac'),
-    path('bacs/<int:bac_id>/series/', views.series_by_bac, name='series_by_bac'),
-    path('series/<int:serie_id>/filieres/', views.filieres_by_serie, name='filieres_by_serie'),
-    path('series/<int:serie_id>/filieres/<int:filiere_id>/niveaux/', views.niveaux_by_serie_filiere, name='niveaux_by_serie_filiere'),
-    path('filieres/<int:filiere_id>/niveaux/<int:niveau_id>/diplomes/', views.diplomes_by_niveau_filiere, name='diplomes_by_niveau_filiere'),
+    path('bacs/<int:bac_id>/mentions/', cascade('mentions_by_bac'), name='mentions_by_bac'),
+    path('bacs/<int:bac_id>/series/', cascade('series_by_bac'), name='series_by_bac'),
+    path('series/<int:serie_id>/filieres/', cascade('filieres_by_serie'), name='filieres_by_serie'),
+    path('series/<int:serie_id>/filieres/<int:filiere_id>/niveaux/', cascade('niveaux_by_serie_filiere'), name='niveaux_by_serie_filiere'),
+    path('filieres/<int:filiere_id>/niveaux/<int:niveau_id>/diplomes/', cascade('diplomes_by_niveau_filiere'), name='diplomes_by_niveau_filiere'),
 ]
 
@@ -10,6 +10,7 @@ from django.http import HttpResponse
 from django.db.models import Count, Q
 from django.utils import timezone
 import csv
+import logging
 
 from candidats.models import Region, Departement, Candidat
 from authentication.permissions import IsAdminAcademique
@@ -24,6 +25,8 @@ from .serializers import (
     RegionSerializer, DepartementSerializer
 )
 
+logger = logging.getLogger(__name__)
+
 class FiliereViewSet(viewsets.ViewSet):
     """
     ViewSet pour la gestion complète des filières
@@ -66,9 +69,7 @@ class FiliereViewSet(viewsets.ViewSet):
             return Response(data)
             
         except Exception as e:
-            print(f"❌ Erreur liste filières: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception('Erreur liste filières')
             return Response(
                 {'error': str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -123,9 +124,7 @@ class FiliereViewSet(viewsets.ViewSet):
             }, status=status.HTTP_201_CREATED)
             
         except Exception as e:
-            print(f"❌ Erreur création filière: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception('Erreur création filière')
             return Response(
                 {'error': str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -179,9 +178,7 @@ class FiliereViewSet(viewsets.ViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
         except Exception as e:
-            print(f"❌ Erreur détails filière: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception('Erreur détails filière')
             return Response(
                 {'error': str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -236,9 +233,7 @@ class FiliereViewSet(viewsets.ViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
         except Exception as e:
-            print(f"❌ Erreur modification filière: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception('Erreur modification filière')
             return Response(
                 {'error': str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -282,9 +277,7 @@ class FiliereViewSet(viewsets.ViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
         except Exception as e:
-            print(f"❌ Erreur suppression: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception('Erreur suppression')
             return Response(
                 {'error': str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -415,8 +408,7 @@ class FiliereViewSet(viewsets.ViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception('Erreur export candidats filière', extra={'filiere_id': pk})
             return Response(
                 {'error': str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -447,6 +439,9 @@ from .serializers import (
     BacSerializer, SerieSerializer, MentionSerializer,
     RegionSerializer, DepartementSerializer
 )
+from django.views.decorators.http import require_GET
+from sgee_project.http import appliquer_validateurs, reponse_json, reponse_non_modifiee
+from .registry import aget_registre, get_registre, VIDE
 
 
 # ============================================
@@ -462,105 +457,156 @@ class FiliereViewSet(viewsets.ViewSet):
 # ============================================
 # VUES LISTES SIMPLES
 # ============================================
-class FiliereListView(generics.ListAPIView):
+class ReferentielListMixin:
+    """
+    Sert la liste depuis le registre en mémoire (configurations.registry)
+    au lieu d'interroger la base. La pagination DRF reste appliquée.
+    """
+    referentiel = None  # Nom de l'attribut de l'instantané
+
+    def list(self, request, *args, **kwargs):
+        lignes = getattr(get_registre(), self.referentiel)
+        page = self.paginate_queryset(lignes)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return Response(lignes)
+
+class FiliereListView(ReferentielListMixin, generics.ListAPIView):
     queryset = Filiere.objects.filter(is_active=True)
     serializer_class = FiliereSerializer
     permission_classes = [permissions.AllowAny]
+    referentiel = 'filieres'
 
-class NiveauListView(generics.ListAPIView):
+class NiveauListView(ReferentielListMixin, generics.ListAPIView):
     queryset = Niveau.objects.all().order_by('ordre')
     serializer_class = NiveauSerializer
     permission_classes = [permissions.AllowAny]
+    referentiel = 'niveaux'
 
-class DiplomeListView(generics.ListAPIView):
+class DiplomeListView(ReferentielListMixin, generics.ListAPIView):
     queryset = Diplome.objects.all()
     serializer_class = DiplomeSerializer
     permission_classes = [permissions.AllowAny]
+    referentiel = 'diplomes'
 
-class CentreExamenListView(generics.ListAPIView):
+class CentreExamenListView(ReferentielListMixin, generics.ListAPIView):
     queryset = CentreExamen.objects.filter(is_active=True)
     serializer_class = CentreExamenSerializer
     permission_classes = [permissions.AllowAny]
+    referentiel = 'centres_examen'
 
-class CentreDepotListView(generics.ListAPIView):
+class CentreDepotListView(ReferentielListMixin, generics.ListAPIView):
     queryset = CentreDepot.objects.filter(is_active=True)
     serializer_class = CentreDepotSerializer
     permission_classes = [permissions.AllowAny]
+    referentiel = 'centres_depot'
 
-class BacListView(generics.ListAPIView):
+class BacListView(ReferentielListMixin, generics.ListAPIView):
     queryset = Bac.objects.all()
     serializer_class = BacSerializer
     permission_classes = [permissions.AllowAny]
+    referentiel = 'bacs'
 
-class SerieListView(generics.ListAPIView):
+class SerieListView(ReferentielListMixin, generics.ListAPIView):
     queryset = Serie.objects.all()
     serializer_class = SerieSerializer
     permission_classes = [permissions.AllowAny]
+    referentiel = 'series'
 
-class MentionListView(generics.ListAPIView):
+class MentionListView(ReferentielListMixin, generics.ListAPIView):
     queryset = Mention.objects.filter(is_active=True)
     serializer_class = MentionSerializer
     permission_classes = [permissions.AllowAny]
+    referentiel = 'mentions'
 
-class RegionListView(generics.ListAPIView):
+class RegionListView(ReferentielListMixin, generics.ListAPIView):
     queryset = Region.objects.all()
     serializer_class = RegionSerializer
     permission_classes = [permissions.AllowAny]
+    referentiel = 'regions'
 
-class DepartementListView(generics.ListAPIView):
+class DepartementListView(ReferentielListMixin, generics.ListAPIView):
     queryset = Departement.objects.all()
     serializer_class = DepartementSerializer
     permission_classes = [permissions.AllowAny]
+    referentiel = 'departements'
 
 
 # ============================================
-# FONCTIONS CASCADE
+# FONCTIONS CASCADE (servies par le registre en mémoire)
 # ============================================
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def series_by_bac(request, bac_id):
     """Séries d'un BAC donné"""
-    series = Serie.objects.filter(bac_id=bac_id)
-    serializer = SerieSerializer(series, many=True)
-    return Response(serializer.data)
+    return Response(get_registre().series_par_bac.get(bac_id, VIDE))
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def filieres_by_serie(request, serie_id):
     """Filières accessibles via une série donnée"""
-    serie_filieres = SerieFiliere.objects.filter(serie_id=serie_id)
-    filieres = Filiere.objects.filter(
-        id__in=serie_filieres.values_list('filiere_id', flat=True)
-    ).filter(is_active=True).distinct()
-    
-    serializer = FiliereSerializer(filieres, many=True)
-    return Response(serializer.data)
+    return Response(get_registre().filieres_par_serie.get(serie_id, VIDE))
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def niveaux_by_serie_filiere(request, serie_id, filiere_id):
     """Niveaux pour une série et filière données"""
-    serie_filieres = SerieFiliere.objects.filter(serie_id=serie_id, filiere_id=filiere_id)
-    niveaux = Niveau.objects.filter(series_filieres__in=serie_filieres).distinct().order_by('ordre')
-    serializer = NiveauSerializer(niveaux, many=True)
-    return Response(serializer.data)
+    return Response(get_registre().niveaux_par_serie_filiere.get((serie_id, filiere_id), VIDE))
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def diplomes_by_niveau_filiere(request, niveau_id, filiere_id):
     """Diplômes pour un niveau et filière donnés"""
-    diplomes = Diplome.objects.filter(
-        filieres__filiere_id=filiere_id,
-        filieres__niveau_id=niveau_id
-    ).distinct()
-    serializer = DiplomeSerializer(diplomes, many=True)
-    return Response(serializer.data)
+    return Response(get_registre().diplomes_par_filiere_niveau.get((filiere_id, niveau_id), VIDE))
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def mentions_by_bac(request, bac_id):
     """Mentions d'un BAC donné"""
-    mentions = Mention.objects.filter(bac_id=bac_id, is_active=True)
-    serializer = MentionSerializer(mentions, many=True)
-    return Response(serializer.data)
+    return Response(get_registre().mentions_par_bac.get(bac_id, VIDE))
+
+
+# ============================================
+# FONCTIONS CASCADE ASYNCHRONES (ASGI, VUES_ASYNCHRONES)
+# ============================================
+# Mêmes réponses que ci-dessus, sans passer par un thread de travail
+@require_GET
+async def aseries_by_bac(request, bac_id):
+    return reponse_json((await aget_registre()).series_par_bac.get(bac_id, VIDE))
+
+@require_GET
+async def afilieres_by_serie(request, serie_id):
+    return reponse_json((await aget_registre()).filieres_par_serie.get(serie_id, VIDE))
+
+@require_GET
+async def aniveaux_by_serie_filiere(request, serie_id, filiere_id):
+    return reponse_json((await aget_registre()).niveaux_par_serie_filiere.get((serie_id, filiere_id), VIDE))
+
+@require_GET
+async def adiplomes_by_niveau_filiere(request, niveau_id, filiere_id):
+    return reponse_json((await aget_registre()).diplomes_par_filiere_niveau.get((filiere_id, niveau_id), VIDE))
+
+@require_GET
+async def amentions_by_bac(request, bac_id):
+    return reponse_json((await aget_registre()).mentions_par_bac.get(bac_id, VIDE))
+
+
+# ============================================
+# BOOTSTRAP DU FORMULAIRE D'ENRÔLEMENT
+# ============================================
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def bootstrap(request):
+    """
+    Toute la configuration du formulaire en une seule requête.
+    Document précalculé dans le registre ; le client le garde en cache et
+    revalide avec If-None-Match (304 tant que la version ne change pas).
+    """
+    registre = get_registre()
+
+    non_modifiee = reponse_non_modifiee(request, registre.bootstrap_etag)
+    if non_modifiee is not None:
+        return non_modifiee
 
+    response = HttpResponse(registre.bootstrap, content_type='application/json; charset=utf-8')
+    return appliquer_validateurs(response, registre.bootstrap_etag)
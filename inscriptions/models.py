@@ -2,9 +2,8 @@ from django.db import models
 from django.conf import settings
 from django.utils import timezone
 from candidats.models import Candidat, Dossier
+from configurations import sequences
 from configurations.models import AnneeScolaire, Filiere, Niveau, CentreExamen, CentreDepot, Diplome
-import random
-import string
 
 
 class Inscription(models.Model):
@@ -80,7 +79,4 @@ class Inscription(models.Model):
     @staticmethod
     def generer_numero_inscription():
         """Générer un numéro d'inscription unique"""
-        import datetime
-        annee = datetime.datetime.now().year
-        code = ''.join(random.choices(string.digits, k=6))
-        return f"INS{annee}{code}"
\ No newline at end of file
+        return sequences.allouer('INS')
\ No newline at end of file
@@ -31,4 +31,49 @@ class InscriptionSerializer(serializers.ModelSerializer):
             "pays_obtention_diplome", "etablissement_origine",
             "ville_etablissement", "moyenne_generale", "mention",
         ]
-        read_only_fields = ["id"]
\ No newline at end of file
+        read_only_fields = ["id"]
+
+
+# ============================================
+# TESTS
+# ============================================
+import datetime
+
+from django.test import TestCase
+
+from authentication.models import User
+from configurations import sequences
+
+
+class NumeroInscriptionTests(TestCase):
+    # Les numéros sont réservés sur la connexion dédiée (configurations.sequences)
+    databases = {'default', 'sequences'}
+
+    def setUp(self):
+        user = User.objects.create_user('paul@example.cm', 'motdepasse123', role='candidat')
+        self.candidat = Candidat.objects.create(
+            user=user, nom='NGUEMA', prenom='Paul', date_naissance=datetime.date(2005, 1, 1),
+            lieu_naissance='Yaoundé', sexe='M', email='paul@example.cm',
+        )
+        self.annee = AnneeScolaire.objects.create(
+            libelle='2026-2027', date_debut=datetime.date(2026, 9, 1), date_fin=datetime.date(2027, 7, 31)
+        )
+        self.dossier = Dossier.objects.create(candidat=self.candidat, annee_scolaire=self.annee)
+        self.filiere = Filiere.objects.create(code='INF', libelle='Informatique')
+        self.niveau = Niveau.objects.create(code='L1', libelle='Première Année', ordre=1)
+
+    def creer_inscription(self):
+        return Inscription.objects.create(
+            candidat=self.candidat, dossier=self.dossier, annee_scolaire=self.annee,
+            filiere=self.filiere, niveau=self.niveau,
+        )
+
+    def test_save_attribue_un_numero_valide(self):
+        inscription = self.creer_inscription()
+        self.assertTrue(sequences.est_valide(inscription.numero_inscription, 'INS'))
+
+    def test_numeros_distincts(self):
+        self.assertNotEqual(
+            self.creer_inscription().numero_inscription,
+            self.creer_inscription().numero_inscription,
+        )
@@ -5,6 +5,21 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
+
+Point d'entrée requis pour le flux SSE /api/candidats/evenements/ (vue
+asynchrone) : uvicorn sgee_project.asgi:application, ou daphne. Le reste
+de l'API fonctionne aussi en WSGI.
+
+Sous ASGI, VUES_ASYNCHRONES=True sert les endpoints publics les plus
+sollicités (vérification quitus, cascade de configuration, liste des
+épreuves, check-enrollment) par leurs versions asynchrones :
+
+    VUES_ASYNCHRONES=True uvicorn sgee_project.asgi:application --workers 4
+
+Les requêtes SQL de l'ORM asynchrone s'exécutent toujours dans un thread
+(un par requête) : le gain vient des clients en attente qui n'occupent
+plus de thread, et des chemins rapides (filtre quitus, registre,
+catalogue en cache) servis sans quitter la boucle. Mesure : bench_async.
 """
 
 import os
@@ -0,0 +1,142 @@
+# sgee_project/detecteur.py
+"""
+Détection des requêtes N+1 et des requêtes lentes.
+
+Chaque requête SQL est réduite à une empreinte (littéraux remplacés par ?,
+listes IN repliées) : la même empreinte exécutée DETECTEUR_N_PLUS_UN_SEUIL
+fois ou plus pendant une requête HTTP signale une boucle qui interroge la
+base ligne par ligne. Les requêtes plus longues que DETECTEUR_LENTE_MS
+sont aussi relevées. Chaque alerte indique la ligne du projet qui a
+déclenché la requête.
+
+- DetecteurRequetesMiddleware (sgee_project/middleware.py) journalise les
+  alertes de chaque requête quand DETECTEUR_REQUETES est activé
+  (développement, préproduction) ;
+- dans un test :
+
+      with sans_n_plus_un():
+          client.get('/api/candidats/admin-academique/stats-filieres/', **entetes)
+
+  lève AssertionError avec le détail des empreintes répétées.
+"""
+import re
+import time
+import traceback
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+
+# Littéraux et paramètres (%s) remplacés pour regrouper les requêtes de même forme
+_LITTERAUX = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|%s")
+_LISTES_IN = re.compile(r'\bIN \((?:\?, )*\?\)', re.IGNORECASE)
+
+# Cadres jamais retenus comme origine : ce module et les middlewares qui l'installent
+_INTERNES = {Path(__file__).resolve(), Path(__file__).resolve().with_name('middleware.py')}
+_IGNORES = ('site-packages', 'dist-packages')
+
+
+def forme(sql):
+    """Requête dont les littéraux et paramètres sont remplacés par ?"""
+    return _LITTERAUX.sub('?', sql)
+
+
+def empreinte(sql):
+    """Forme de la requête, listes IN (…) repliées : même empreinte = même requête en boucle"""
+    return _LISTES_IN.sub('IN (...)', forme(sql))
+
+
+def origine():
+    """Dernière ligne du projet dans la pile d'appels, ex. 'candidats/views.py:1510 in dashboard_stats'"""
+    racine = Path(settings.BASE_DIR).resolve()
+    for cadre in reversed(traceback.extract_stack()):
+        if any(motif in cadre.filename for motif in _IGNORES):
+            continue
+        chemin = Path(cadre.filename).resolve()
+        if chemin not in _INTERNES and chemin.is_relative_to(racine):
+            return f'{chemin.relative_to(racine)}:{cadre.lineno} in {cadre.name}'
+    return '(hors du projet)'
+
+
+class Rapport:
+    """Requêtes exécutées sous un Detecteur, regroupées par empreinte"""
+
+    def __init__(self, seuil_repetition, seuil_lent):
+        self.seuil_repetition = seuil_repetition
+        self.seuil_lent = seuil_lent
+        self.empreintes = {}  # empreinte -> {'nombre', 'duree', 'exemple', 'origine'}
+        self.lentes = []      # (durée en s, sql, origine)
+        self.total = 0
+
+    @property
+    def repetitions(self):
+        """Empreintes exécutées au moins `seuil_repetition` fois, les plus fréquentes d'abord"""
+        return sorted(
+            (e for e in self.empreintes.values() if e['nombre'] >= self.seuil_repetition),
+            key=lambda e: -e['nombre']
+        )
+
+    @property
+    def alertes(self):
+        return bool(self.lentes or self.repetitions)
+
+    def lignes(self):
+        for e in self.repetitions:
+            yield f"N+1 : {e['nombre']} × {e['exemple'][:200]} (depuis {e['origine']})"
+        for duree, sql, lieu in self.lentes:
+            yield f'Lente : {duree * 1000:.0f} ms {sql[:200]} (depuis {lieu})'
+
+    def __str__(self):
+        return '\n'.join(self.lignes()) or 'Aucune alerte'
+
+
+class Detecteur:
+    """execute_wrapper qui alimente un Rapport"""
+
+    def __init__(self, seuil_repetition=None, seuil_lent=None):
+        if seuil_repetition is None:
+            seuil_repetition = settings.DETECTEUR_N_PLUS_UN_SEUIL
+        if seuil_lent is None:
+            seuil_lent = settings.DETECTEUR_LENTE_MS / 1000
+        self.rapport = Rapport(seuil_repetition, seuil_lent)
+
+    def __call__(self, execute, sql, params, many, context):
+        debut = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duree = time.perf_counter() - debut
+            self.enregistrer(sql, duree)
+
+    def enregistrer(self, sql, duree):
+        rapport = self.rapport
+        rapport.total += 1
+        cle = empreinte(sql)
+        entree = rapport.empreintes.get(cle)
+        if entree is None:
+            # Pile lue une seule fois par empreinte : c'est la partie coûteuse
+            entree = rapport.empreintes[cle] = {'nombre': 0, 'duree': 0.0, 'exemple': sql, 'origine': origine()}
+        entree['nombre'] += 1
+        entree['duree'] += duree
+        if duree >= rapport.seuil_lent:
+            rapport.lentes.append((duree, sql, origine()))
+
+
+@contextmanager
+def detecter(seuil_repetition=None, seuil_lent=None):
+    """Installe un Detecteur sur toutes les connexions du thread ; produit son Rapport"""
+    detecteur = Detecteur(seuil_repetition, seuil_lent)
+    with ExitStack() as pile:
+        for connexion in connections.all():
+            pile.enter_context(connexion.execute_wrapper(detecteur))
+        yield detecteur.rapport
+
+
+@contextmanager
+def sans_n_plus_un(seuil=None):
+    """Pour les tests : AssertionError si une empreinte est exécutée `seuil` fois ou plus"""
+    with detecter(seuil_repetition=seuil, seuil_lent=float('inf')) as rapport:
+        yield rapport
+    if rapport.repetitions:
+        raise AssertionError(f'Requêtes répétées ({rapport.total} au total) :\n{rapport}')
@@ -0,0 +1,72 @@
+# sgee_project/http.py
+"""
+Outils HTTP partagés : ETag, Last-Modified et réponses conditionnelles (304),
+réponses JSON et identification JWT des vues asynchrones (hors DRF).
+"""
+import hashlib
+
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+def calculer_etag(*parties):
+    """ETag fort (entre guillemets) calculé à partir des parties fournies"""
+    empreinte = hashlib.sha1()
+    for partie in parties:
+        if isinstance(partie, str):
+            partie = partie.encode('utf-8')
+        empreinte.update(partie)
+        empreinte.update(b'\x00')
+    return f'"{empreinte.hexdigest()}"'
+
+
+def reponse_non_modifiee(request, etag, last_modified=None, prive=False):
+    """
+    Retourne une réponse 304 (ou 412) si les préconditions du client
+    (If-None-Match / If-Modified-Since) sont satisfaites, sinon None.
+
+    `last_modified` est un timestamp (secondes epoch).
+    """
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        appliquer_validateurs(response, etag, last_modified, prive=prive)
+    return response
+
+
+def appliquer_validateurs(response, etag, last_modified=None, max_age=0, prive=False):
+    """
+    Ajoute ETag, Last-Modified et Cache-Control (revalidation) à la réponse.
+    `prive` pour les données propres à l'utilisateur (jamais en cache partagé).
+    """
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified)
+    if prive:
+        patch_cache_control(response, private=True, max_age=max_age, must_revalidate=True)
+    else:
+        patch_cache_control(response, public=True, max_age=max_age, must_revalidate=True)
+    return response
+
+
+def reponse_json(donnees, status=200):
+    """JsonResponse encodée comme le JSONRenderer de DRF (même sortie que les vues synchrones)"""
+    return JsonResponse(
+        donnees, status=status, safe=False, encoder=JSONEncoder,
+        json_dumps_params={'ensure_ascii': False, 'separators': (',', ':')},
+    )
+
+
+def utilisateur_du_jeton(request):
+    """Identifiant utilisateur du JWT d'accès (en-tête Authorization), sans requête SQL ; None sinon"""
+    entete = request.META.get('HTTP_AUTHORIZATION', '').split()
+    if len(entete) != 2 or entete[0] not in api_settings.AUTH_HEADER_TYPES:
+        return None
+    try:
+        return AccessToken(entete[1]).get(api_settings.USER_ID_CLAIM)
+    except TokenError:
+        return None
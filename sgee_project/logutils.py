@@ -0,0 +1,140 @@
+# sgee_project/logutils.py
+"""
+Journalisation structurée et non bloquante.
+
+- FormateurJSON : une ligne JSON par enregistrement (horodatage, niveau,
+  logger, message, emplacement, champs passés via `extra=`, exception).
+- EchantillonnageDebug : ne laisse passer qu'une fraction des messages
+  DEBUG (LOG_DEBUG_ECHANTILLON), pour activer le debug en production sans
+  noyer les sorties.
+- configurer() : remplace logging.config.dictConfig (LOGGING_CONFIG). Après
+  la configuration, chaque handler des loggers déclarés est placé derrière
+  une file (QueueHandler) vidée par un thread QueueListener : la requête
+  ne fait plus que déposer l'enregistrement, l'écriture a lieu ailleurs.
+  Si la file est pleine, l'enregistrement est abandonné plutôt que de
+  bloquer la requête.
+"""
+import atexit
+import copy
+import json
+import logging
+import logging.config
+import logging.handlers
+import queue
+import random
+from datetime import datetime
+
+TAILLE_FILE = 10000
+
+# Attributs standards d'un LogRecord : tout le reste vient de `extra=`
+_ATTRIBUTS_STANDARDS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_ecouteurs = []
+
+
+class FormateurJSON(logging.Formatter):
+    def format(self, record):
+        entree = {
+            'horodatage': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'niveau': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'emplacement': f'{record.module}:{record.lineno}',
+            'processus': record.process,
+            'thread': record.threadName,
+        }
+        for cle, valeur in vars(record).items():
+            if cle not in _ATTRIBUTS_STANDARDS and not cle.startswith('_'):
+                entree[cle] = valeur
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entree['exception'] = record.exc_text
+        if record.stack_info:
+            entree['pile'] = self.formatStack(record.stack_info)
+        return json.dumps(entree, ensure_ascii=False, default=str)
+
+
+class EchantillonnageDebug(logging.Filter):
+    """Garde une proportion `taux` (0 à 1) des messages DEBUG, tous les autres"""
+
+    def __init__(self, taux=1.0):
+        super().__init__()
+        self.taux = float(taux)
+
+    def filter(self, record):
+        return record.levelno > logging.DEBUG or random.random() < self.taux
+
+
+class HandlerFile(logging.handlers.QueueHandler):
+    """QueueHandler qui n'attend jamais : file pleine = enregistrement perdu (compté)"""
+
+    def __init__(self, file):
+        super().__init__(file)
+        self.perdus = 0
+
+    def prepare(self, record):
+        # Fige le message et la trace maintenant (les arguments peuvent changer
+        # après le retour de la requête) sans perdre les champs structurés
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.perdus += 1
+
+
+def mettre_en_file(handler, taille=TAILLE_FILE):
+    """HandlerFile qui transmet à `handler` depuis un thread dédié"""
+    file = queue.Queue(maxsize=taille)
+    handler_file = HandlerFile(file)
+    handler_file.setLevel(handler.level)
+    # Filtres appliqués avant la file : ce qui est écarté n'y entre pas
+    handler_file.filters, handler.filters = handler.filters, []
+    ecouteur = logging.handlers.QueueListener(file, handler, respect_handler_level=True)
+    ecouteur.start()
+    _ecouteurs.append(ecouteur)
+    return handler_file
+
+
+def arreter():
+    """Vide les files et arrête les threads d'écriture"""
+    while _ecouteurs:
+        _ecouteurs.pop().stop()
+
+
+def configurer(config):
+    """
+    LOGGING_CONFIG : dictConfig, puis mise en file des handlers des loggers
+    déclarés dans `config` si config['asynchrone'] est vrai (clé propre à ce
+    module, retirée avant dictConfig).
+    """
+    config = dict(config)
+    asynchrone = config.pop('asynchrone', False)
+    logging.config.dictConfig(config)
+    if not asynchrone:
+        return
+
+    arreter()
+    loggers = [logging.getLogger()] if 'root' in config else []
+    loggers += [logging.getLogger(nom) for nom in config.get('loggers', {})]
+
+    en_file = {}
+    for logger in loggers:
+        for handler in list(logger.handlers):
+            if isinstance(handler, logging.handlers.QueueHandler):
+                continue
+            if handler not in en_file:
+                en_file[handler] = mettre_en_file(handler)
+            logger.removeHandler(handler)
+            logger.addHandler(en_file[handler])
+
+
+atexit.register(arreter)
@@ -0,0 +1,196 @@
+# sgee_project/metriques.py
+"""
+Métriques par endpoint, au format texte Prometheus.
+
+PerformanceMiddleware (sgee_project/middleware.py) mesure chaque requête :
+durée totale, nombre et durée des requêtes SQL, taille de la réponse. Les
+mesures sont agrégées par (méthode, route, classe de statut) dans le
+registre du processus, sous forme d'histogrammes à seaux fixes.
+
+Chaque worker publie son registre dans le cache toutes les
+METRIQUES_PUBLICATION secondes ; /api/metrics/ additionne les registres
+de tous les workers (il faut un cache partagé, Redis ou Memcached, pour
+voir plus que le worker qui répond).
+"""
+import hmac
+import os
+import socket
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from rest_framework.exceptions import APIException
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+SEAUX_DUREE = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)  # secondes
+SEAUX_REQUETES = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+INDEX_KEY = 'metriques:processus'
+PROCESSUS_KEY = 'metriques:processus:{id}'
+ROLES_AUTORISES = ('super_admin', 'admin_academique')
+
+
+class Serie:
+    """Agrégats d'un endpoint (méthode, route, statut)"""
+    __slots__ = ('nombre', 'duree', 'requetes', 'duree_bd', 'taille', 'seaux_duree', 'seaux_requetes')
+
+    def __init__(self):
+        self.nombre = 0
+        self.duree = 0.0
+        self.requetes = 0
+        self.duree_bd = 0.0
+        self.taille = 0
+        self.seaux_duree = [0] * len(SEAUX_DUREE)
+        self.seaux_requetes = [0] * len(SEAUX_REQUETES)
+
+    def observer(self, duree, requetes, duree_bd, taille):
+        self.nombre += 1
+        self.duree += duree
+        self.requetes += requetes
+        self.duree_bd += duree_bd
+        self.taille += taille
+        # Seaux non cumulés ici, cumulés à l'export
+        for i, borne in enumerate(SEAUX_DUREE):
+            if duree <= borne:
+                self.seaux_duree[i] += 1
+                break
+        for i, borne in enumerate(SEAUX_REQUETES):
+            if requetes <= borne:
+                self.seaux_requetes[i] += 1
+                break
+
+    def en_dict(self):
+        return {nom: getattr(self, nom) for nom in self.__slots__}
+
+
+class Registre:
+    def __init__(self):
+        self._series = {}
+        self._verrou = threading.Lock()
+        self._publie_le = 0.0
+        self.identifiant = f'{socket.gethostname()}:{os.getpid()}'
+
+    def observer(self, methode, route, statut, duree, requetes, duree_bd, taille):
+        cle = (methode, route, f'{statut // 100}xx')
+        with self._verrou:
+            serie = self._series.get(cle)
+            if serie is None:
+                serie = self._series[cle] = Serie()
+            serie.observer(duree, requetes, duree_bd, taille)
+
+    def instantane(self):
+        with self._verrou:
+            return {cle: serie.en_dict() for cle, serie in self._series.items()}
+
+    def publier_si_necessaire(self):
+        """Copie le registre dans le cache au plus toutes les METRIQUES_PUBLICATION secondes"""
+        maintenant = time.monotonic()
+        if maintenant - self._publie_le < settings.METRIQUES_PUBLICATION:
+            return
+        self._publie_le = maintenant
+        self.publier()
+
+    def publier(self):
+        duree_vie = settings.METRIQUES_PUBLICATION * 6
+        cache.set(PROCESSUS_KEY.format(id=self.identifiant), self.instantane(), timeout=duree_vie)
+        processus = cache.get(INDEX_KEY) or []
+        if self.identifiant not in processus:
+            cache.set(INDEX_KEY, processus + [self.identifiant], timeout=None)
+
+
+registre = Registre()
+
+
+def agreger():
+    """Somme des registres de tous les workers (le nôtre à jour, les autres depuis le cache)"""
+    processus = [p for p in cache.get(INDEX_KEY) or [] if p != registre.identifiant]
+    publies = cache.get_many([PROCESSUS_KEY.format(id=p) for p in processus])
+
+    # Workers disparus : retirés de l'index une fois leur entrée expirée
+    actifs = [p for p in processus if PROCESSUS_KEY.format(id=p) in publies]
+    if len(actifs) != len(processus):
+        cache.set(INDEX_KEY, actifs + [registre.identifiant], timeout=None)
+
+    total = {}
+    for series in [registre.instantane(), *publies.values()]:
+        for cle, serie in series.items():
+            cumul = total.get(cle)
+            if cumul is None:
+                total[cle] = {nom: list(v) if isinstance(v, list) else v for nom, v in serie.items()}
+                continue
+            for nom, valeur in serie.items():
+                if isinstance(valeur, list):
+                    cumul[nom] = [a + b for a, b in zip(cumul[nom], valeur)]
+                else:
+                    cumul[nom] += valeur
+    return total
+
+
+def _echapper(valeur):
+    return str(valeur).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _histogramme(lignes, nom, libelles, bornes, seaux, somme, nombre):
+    cumul = 0
+    for borne, compte in zip(bornes, seaux):
+        cumul += compte
+        lignes.append(f'{nom}_bucket{{{libelles},le="{borne}"}} {cumul}')
+    lignes.append(f'{nom}_bucket{{{libelles},le="+Inf"}} {nombre}')
+    lignes.append(f'{nom}_sum{{{libelles}}} {somme}')
+    lignes.append(f'{nom}_count{{{libelles}}} {nombre}')
+
+
+def exposition_prometheus(series):
+    """Format d'exposition texte Prometheus (version 0.0.4)"""
+    duree, requetes, duree_bd, taille = [], [], [], []
+    for (methode, route, statut), s in sorted(series.items()):
+        libelles = f'methode="{_echapper(methode)}",route="{_echapper(route)}",statut="{statut}"'
+        _histogramme(duree, 'sgee_requete_duree_secondes', libelles,
+                     SEAUX_DUREE, s['seaux_duree'], s['duree'], s['nombre'])
+        _histogramme(requetes, 'sgee_requete_sql_requetes', libelles,
+                     SEAUX_REQUETES, s['seaux_requetes'], s['requetes'], s['nombre'])
+        duree_bd.append(f'sgee_requete_sql_duree_secondes_total{{{libelles}}} {s["duree_bd"]}')
+        taille.append(f'sgee_reponse_taille_octets_total{{{libelles}}} {s["taille"]}')
+
+    lignes = [
+        '# HELP sgee_requete_duree_secondes Durée des requêtes HTTP',
+        '# TYPE sgee_requete_duree_secondes histogram',
+        *duree,
+        '# HELP sgee_requete_sql_requetes Nombre de requêtes SQL par requête HTTP',
+        '# TYPE sgee_requete_sql_requetes histogram',
+        *requetes,
+        '# HELP sgee_requete_sql_duree_secondes_total Temps cumulé passé en base de données',
+        '# TYPE sgee_requete_sql_duree_secondes_total counter',
+        *duree_bd,
+        '# HELP sgee_reponse_taille_octets_total Octets envoyés (corps des réponses)',
+        '# TYPE sgee_reponse_taille_octets_total counter',
+        *taille,
+    ]
+    return '\n'.join(lignes) + '\n'
+
+
+def _autorise(request):
+    """Jeton de scraping (METRIQUES_JETON) ou JWT d'un administrateur"""
+    entete = request.META.get('HTTP_AUTHORIZATION', '')
+    jeton = settings.METRIQUES_JETON
+    if jeton and hmac.compare_digest(entete.encode(), f'Bearer {jeton}'.encode()):
+        return True
+    try:
+        resultat = JWTAuthentication().authenticate(request)
+    except APIException:
+        return False
+    return resultat is not None and resultat[0].role in ROLES_AUTORISES
+
+
+def metrics_view(request):
+    """GET /api/metrics/ : métriques de tous les workers, réservé aux administrateurs"""
+    if request.method != 'GET':
+        return HttpResponse(status=405)
+    if not _autorise(request):
+        return HttpResponse('Accès refusé\n', status=403, content_type='text/plain; charset=utf-8')
+    return HttpResponse(
+        exposition_prometheus(agreger()),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
@@ -0,0 +1,287 @@
+# sgee_project/middleware.py
+"""
+Middlewares transverses du projet.
+
+Tous acceptent les deux modes (sync_capable, async_capable) : sous ASGI,
+un middleware uniquement synchrone ferait exécuter les vues asynchrones
+(VUES_ASYNCHRONES) dans un thread, comme une vue synchrone.
+"""
+import gzip
+import logging
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.utils.cache import patch_vary_headers
+
+from . import detecteur
+from .metriques import registre
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli
+except ImportError:  # brotli est optionnel
+    brotli = None
+
+
+# ============================================
+# COMPRESSION DES RÉPONSES
+# ============================================
+
+# Types déjà compressés : les recompresser coûte du CPU sans gain
+TYPES_DEJA_COMPRESSES = (
+    'image/', 'video/', 'audio/', 'font/woff',
+    'application/pdf', 'application/zip', 'application/gzip',
+    'application/x-gzip', 'application/x-7z-compressed', 'application/x-rar',
+    'application/octet-stream',
+    'application/vnd.openxmlformats-officedocument',
+)
+
+
+def encodages_acceptes(accept_encoding):
+    """
+    Analyse l'en-tête Accept-Encoding -> {encodage: q}
+
+    >>> encodages_acceptes('gzip, br;q=0.8, *;q=0')
+    {'gzip': 1.0, 'br': 0.8, '*': 0.0}
+    """
+    acceptes = {}
+    for partie in accept_encoding.split(','):
+        morceaux = [m.strip() for m in partie.split(';')]
+        nom = morceaux[0].lower()
+        if not nom:
+            continue
+        q = 1.0
+        for parametre in morceaux[1:]:
+            if parametre.startswith('q='):
+                try:
+                    q = float(parametre[2:])
+                except ValueError:
+                    q = 0.0
+        acceptes[nom] = q
+    return acceptes
+
+
+def choisir_encodage(accept_encoding):
+    """Meilleur encodage disponible côté serveur ('br', 'gzip' ou None)"""
+    acceptes = encodages_acceptes(accept_encoding)
+    disponibles = ['br', 'gzip'] if brotli is not None else ['gzip']
+
+    meilleur, meilleur_q = None, 0.0
+    for encodage in disponibles:  # ordre = préférence à q égal
+        q = acceptes.get(encodage, acceptes.get('*', 0.0))
+        if q > meilleur_q:
+            meilleur, meilleur_q = encodage, q
+    return meilleur
+
+
+def compresser(contenu, encodage):
+    if encodage == 'br':
+        return brotli.compress(contenu, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(contenu, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+class MiddlewareHybride:
+    """
+    Base des middlewares du projet : __call__ pour WSGI, __acall__ sous
+    ASGI quand la suite de la chaîne est asynchrone (comme MiddlewareMixin).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.traiter(request)
+
+    def traiter(self, request):
+        raise NotImplementedError
+
+    async def __acall__(self, request):
+        raise NotImplementedError
+
+
+class CompressionMiddleware(MiddlewareHybride):
+    """
+    Compresse les réponses (brotli si disponible, sinon gzip) selon
+    l'Accept-Encoding du client.
+
+    Ne compresse pas :
+    - les réponses en streaming (fichiers téléchargés) ;
+    - les contenus déjà compressés (PDF, images, XLSX...) ;
+    - les réponses plus petites que COMPRESSION_MIN_SIZE ;
+    - les requêtes porteuses d'un cookie de session ou CSRF (BREACH).
+
+    BREACH : compresser une réponse qui contient à la fois un secret et une
+    valeur choisie par l'attaquant laisse deviner le secret à la taille de
+    la réponse, si l'attaquant peut faire émettre la requête par le
+    navigateur de la victime. L'API s'authentifie par un JWT dans l'en-tête
+    Authorization, qu'une page tierce ne peut pas faire envoyer : ses
+    réponses JSON restent compressées. Les pages authentifiées par cookie
+    (admin Django, jeton CSRF dans le HTML) ne le sont pas.
+
+    À placer au-dessus de ConditionalGetMiddleware : l'ETag est calculé sur
+    le contenu non compressé, puis affaibli ici (W/) comme le fait GZipMiddleware.
+    """
+
+    def traiter(self, request):
+        return self.compresser_reponse(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.compresser_reponse(request, await self.get_response(request))
+
+    def compresser_reponse(self, request, response):
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        if settings.SESSION_COOKIE_NAME in request.COOKIES or settings.CSRF_COOKIE_NAME in request.COOKIES:
+            return response
+
+        content_type = response.get('Content-Type', '').lower()
+        if content_type.startswith(TYPES_DEJA_COMPRESSES):
+            return response
+
+        # La réponse dépend de l'Accept-Encoding dès qu'elle est compressible
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        if len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+
+        encodage = choisir_encodage(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encodage is None:
+            return response
+
+        compresse = compresser(response.content, encodage)
+        if len(compresse) >= len(response.content):
+            return response
+
+        response.content = compresse
+        response['Content-Length'] = str(len(compresse))
+        response['Content-Encoding'] = encodage
+
+        # Représentation différente : ETag faible
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+
+        return response
+
+
+# ============================================
+# MESURE DES PERFORMANCES
+# ============================================
+
+class MesureSQL:
+    """execute_wrapper : compte les requêtes SQL et cumule leur durée"""
+
+    def __init__(self):
+        self.nombre = 0
+        self.duree = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        debut = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duree += time.perf_counter() - debut
+            self.nombre += 1
+
+
+def brancher(pile, wrapper):
+    """Pose `wrapper` (execute_wrapper) sur toutes les connexions du thread, jusqu'à la fermeture de `pile`"""
+    for connexion in connections.all():
+        pile.enter_context(connexion.execute_wrapper(wrapper))
+
+
+class PerformanceMiddleware(MiddlewareHybride):
+    """
+    Mesure chaque requête (durée, requêtes SQL, temps en base, taille de la
+    réponse), l'ajoute au registre de sgee_project.metriques et, si
+    METRIQUES_SERVER_TIMING (DEBUG par défaut), renvoie le détail dans
+    l'en-tête Server-Timing (visible dans l'onglet Réseau du navigateur).
+
+    À placer en tête de MIDDLEWARE pour couvrir toute la chaîne et mesurer
+    la taille après compression. Pour une réponse en streaming, la durée
+    s'arrête au début de l'envoi et la taille n'est pas comptée.
+    """
+
+    def traiter(self, request):
+        if not settings.METRIQUES_ACTIVES:
+            return self.get_response(request)
+
+        mesure = MesureSQL()
+        debut = time.perf_counter()
+        with ExitStack() as pile:
+            brancher(pile, mesure)
+            response = self.get_response(request)
+        return self.enregistrer(request, response, mesure, time.perf_counter() - debut)
+
+    async def __acall__(self, request):
+        if not settings.METRIQUES_ACTIVES:
+            return await self.get_response(request)
+
+        mesure = MesureSQL()
+        debut = time.perf_counter()
+        with ExitStack() as pile:
+            # Sous ASGI, le SQL (vues synchrones, ORM asynchrone) s'exécute dans
+            # le thread synchrone propre à la requête : le wrapper y est posé
+            await sync_to_async(brancher)(pile, mesure)
+            response = await self.get_response(request)
+        return self.enregistrer(request, response, mesure, time.perf_counter() - debut)
+
+    def enregistrer(self, request, response, mesure, duree):
+        match = request.resolver_match
+        registre.observer(
+            request.method,
+            match.route if match is not None else 'non_resolu',
+            response.status_code,
+            duree,
+            mesure.nombre,
+            mesure.duree,
+            0 if response.streaming else len(response.content),
+        )
+        registre.publier_si_necessaire()
+
+        if settings.METRIQUES_SERVER_TIMING:
+            response['Server-Timing'] = (
+                f'app;dur={duree * 1000:.1f}, '
+                f'db;dur={mesure.duree * 1000:.1f};desc="{mesure.nombre} requetes SQL"'
+            )
+        return response
+
+
+class DetecteurRequetesMiddleware(MiddlewareHybride):
+    """
+    Journalise (WARNING) les requêtes N+1 et les requêtes lentes de chaque
+    requête HTTP, avec la ligne du projet qui les a déclenchées. Ajouté à
+    MIDDLEWARE seulement si DETECTEUR_REQUETES est activé : la lecture de
+    la pile d'appels a un coût réservé au développement et à la préproduction.
+    """
+
+    def traiter(self, request):
+        with detecteur.detecter() as rapport:
+            response = self.get_response(request)
+        return self.signaler(request, response, rapport)
+
+    async def __acall__(self, request):
+        with ExitStack() as pile:
+            # Comme PerformanceMiddleware : posé dans le thread synchrone de la requête
+            rapport = await sync_to_async(pile.enter_context)(detecteur.detecter())
+            response = await self.get_response(request)
+        return self.signaler(request, response, rapport)
+
+    def signaler(self, request, response, rapport):
+        if rapport.alertes:
+            logger.warning(
+                'Requêtes à revoir sur %s %s (%s requête(s) SQL) :\n%s',
+                request.method, request.path, rapport.total, rapport,
+                extra={'n_plus_un': len(rapport.repetitions), 'lentes': len(rapport.lentes)},
+            )
+        return response
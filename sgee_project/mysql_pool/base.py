@@ -0,0 +1,108 @@
+# sgee_project/mysql_pool/base.py
+"""
+Backend MySQL avec pool de connexions (ENGINE 'sgee_project.mysql_pool').
+
+Django ne propose de pool natif que pour PostgreSQL. Ici, une connexion
+fermée par Django (fin de requête avec CONN_MAX_AGE = 0, fin d'un thread
+d'arrière-plan qui appelle connection.close()) est rendue au pool de son
+alias au lieu d'être coupée, et la suivante est reprise dans ce pool sans
+nouvelle poignée de main ni nouvel init_command.
+
+POOL_TAILLE (dans DATABASES[alias]) borne le nombre de connexions
+inactives gardées par processus ; au-delà elles sont fermées. Ce n'est pas
+une limite du nombre de connexions ouvertes. Une connexion restée
+inactive plus de VERIFICATION_APRES secondes est testée (ping) avant
+d'être reprise. Une connexion au milieu d'une transaction ou ayant levé
+une erreur n'est jamais remise dans le pool.
+"""
+import queue
+import threading
+import time
+
+from django.db.backends.mysql import base
+
+VERIFICATION_APRES = 30  # secondes d'inactivité avant un ping de contrôle
+
+_pools = {}
+_verrou = threading.Lock()
+
+
+def _fermer(connexion):
+    try:
+        connexion.close()
+    except Exception:
+        pass
+
+
+class Pool:
+    def __init__(self, taille):
+        # LIFO : les connexions les plus récentes, les plus sûrement vivantes, d'abord
+        self._libres = queue.LifoQueue(maxsize=taille)
+
+    def prendre(self):
+        """Connexion inactive en bon état, ou None"""
+        while True:
+            try:
+                connexion, rendue_le = self._libres.get_nowait()
+            except queue.Empty:
+                return None
+            if time.monotonic() - rendue_le < VERIFICATION_APRES:
+                return connexion
+            try:
+                connexion.ping()
+                return connexion
+            except Exception:
+                _fermer(connexion)
+
+    def rendre(self, connexion):
+        try:
+            self._libres.put_nowait((connexion, time.monotonic()))
+        except queue.Full:
+            _fermer(connexion)
+
+    def vider(self):
+        while True:
+            try:
+                connexion, _ = self._libres.get_nowait()
+            except queue.Empty:
+                return
+            _fermer(connexion)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def pool(self):
+        taille = self.settings_dict.get('POOL_TAILLE') or 0
+        if taille <= 0:
+            return None
+        with _verrou:
+            pool = _pools.get(self.alias)
+            if pool is None:
+                pool = _pools[self.alias] = Pool(taille)
+        return pool
+
+    def get_new_connection(self, conn_params):
+        pool = self.pool()
+        connexion = pool.prendre() if pool is not None else None
+        self._depuis_pool = connexion is not None
+        if connexion is None:
+            connexion = super().get_new_connection(conn_params)
+        return connexion
+
+    def init_connection_state(self):
+        # Session déjà initialisée (SQL_AUTO_IS_NULL, niveau d'isolation)
+        if getattr(self, '_depuis_pool', False):
+            return
+        super().init_connection_state()
+
+    def _close(self):
+        pool = self.pool()
+        reutilisable = (
+            pool is not None
+            and self.connection is not None
+            and not self.in_atomic_block
+            and self.autocommit
+            and not self.errors_occurred
+        )
+        if not reutilisable:
+            return super()._close()
+        pool.rendre(self.connection)
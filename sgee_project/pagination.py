@@ -0,0 +1,130 @@
+# sgee_project/pagination.py
+"""
+Pagination par curseur (keyset) sur (created_at, id).
+
+Contrairement à OFFSET, le coût d'une page ne dépend pas de sa profondeur :
+chaque page reprend après le dernier couple (created_at, id) vu, avec un
+ordre stable même quand plusieurs lignes partagent le même created_at.
+
+Mode optionnel, activé par la présence du paramètre `cursor` (vide pour la
+première page). Le curseur renvoyé dans `next` est opaque (base64).
+
+Le total n'est pas calculé par défaut ; `count=exact` fait un COUNT(*),
+`count=estime` utilise l'estimation de l'optimiseur MySQL (EXPLAIN), sans
+parcourir la table.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination:
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'per_page'
+    count_query_param = 'count'
+    page_size = 20
+    max_page_size = 100
+
+    @classmethod
+    def demandee(cls, request):
+        """True si le client a choisi la pagination par curseur"""
+        return cls.cursor_query_param in request.query_params
+
+    def paginate_queryset(self, queryset, request):
+        self.request = request
+        self.taille = self._taille_page(request)
+        self.count = self._compter(queryset, request.query_params.get(self.count_query_param))
+
+        queryset = queryset.order_by('-created_at', '-id')
+        position = self._decoder(request.query_params.get(self.cursor_query_param))
+        if position is not None:
+            created_at, pk = position
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+            )
+
+        # Une ligne de plus pour savoir s'il existe une page suivante
+        objets = list(queryset[:self.taille + 1])
+        self.suivant = objets[self.taille - 1] if len(objets) > self.taille else None
+        return objets[:self.taille]
+
+    def get_meta(self):
+        """Champs de pagination à fusionner dans la réponse"""
+        meta = {
+            'next': self._lien(self.suivant),
+            'per_page': self.taille,
+        }
+        if self.count is not None:
+            meta['count'], meta['count_estime'] = self.count
+        return meta
+
+    # ------------------------------------------------------------------
+
+    def _taille_page(self, request):
+        try:
+            taille = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return max(1, min(taille, self.max_page_size))
+
+    def _lien(self, objet):
+        if objet is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self._encoder(objet.created_at, objet.pk),
+        )
+
+    @staticmethod
+    def _encoder(created_at, pk):
+        brut = json.dumps({'c': created_at.isoformat(), 'i': pk}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(brut.encode('utf-8')).decode('ascii').rstrip('=')
+
+    @staticmethod
+    def _decoder(curseur):
+        if not curseur:
+            return None
+        try:
+            brut = base64.urlsafe_b64decode(curseur + '=' * (-len(curseur) % 4))
+            position = json.loads(brut)
+            return datetime.fromisoformat(position['c']), int(position['i'])
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            raise NotFound('Curseur invalide')
+
+    @staticmethod
+    def _compter(queryset, mode):
+        """(total, estimé) ou None si le total n'est pas demandé"""
+        if mode == 'exact':
+            return queryset.count(), False
+        if mode == 'estime':
+            estimation = estimer_nombre(queryset)
+            if estimation is not None:
+                return estimation, True
+            return queryset.count(), False
+        return None
+
+
+def estimer_nombre(queryset):
+    """
+    Nombre de lignes estimé par l'optimiseur (EXPLAIN) sur MySQL.
+    Retourne None sur les autres moteurs.
+    """
+    connexion = connections[queryset.db]
+    if connexion.vendor != 'mysql':
+        return None
+
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connexion.cursor() as curseur:
+        curseur.execute(f'EXPLAIN {sql}', params)
+        colonnes = [col[0] for col in curseur.description]
+        ligne = curseur.fetchone()
+    if ligne is None or 'rows' not in colonnes:
+        return None
+    return int(ligne[colonnes.index('rows')] or 0)
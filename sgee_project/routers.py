@@ -0,0 +1,156 @@
+# sgee_project/routers.py
+"""
+Routage des lectures vers la réplique MySQL (alias 'replica').
+
+Seules les vues marquées @lecture_sur_replique (tableaux de bord, exports,
+listes d'administration, détail des épreuves) lisent sur la réplique ;
+tout le reste, et toutes les écritures, vont sur le primaire. L'alias
+'replica' n'existe que si DB_REPLICA_HOST est renseigné : sans lui, tout
+reste sur 'default'.
+
+Lecture de ses propres écritures :
+- après une écriture dans la requête en cours, ou dans une transaction
+  ouverte, les lectures restent sur le primaire ;
+- RepliqueMiddleware retient qu'un utilisateur vient d'écrire (clé de
+  cache pendant REPLIQUE_DELAI secondes) : ses lectures suivantes restent
+  sur le primaire le temps que la réplique rattrape son retard.
+
+Les données mises en cache longtemps (registre des référentiels,
+catalogue des épreuves) sont construites sous sur_primaire() : une
+réplique en retard y figerait un état périmé jusqu'à l'invalidation
+suivante.
+"""
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from .http import utilisateur_du_jeton
+from .middleware import MiddlewareHybride
+
+REPLIQUE = 'replica'
+PRIMAIRE = 'default'
+ECRITURE_KEY = 'replique:ecriture:{user_id}'
+
+_lecture = ContextVar('lecture_sur_replique', default=False)
+_requete = ContextVar('etat_requete_replique', default=None)
+
+
+class EtatRequete:
+    """Ce que le routeur doit savoir de la requête HTTP en cours"""
+
+    def __init__(self, request):
+        self.request = request
+        self.ecrit = False
+        self._utilisateur_id = None
+        self._collant = None
+
+    @property
+    def utilisateur_id(self):
+        """Identifiant tiré du JWT (sans requête SQL), None si anonyme"""
+        if self._utilisateur_id is None:
+            self._utilisateur_id = utilisateur_du_jeton(self.request) or 0
+        return self._utilisateur_id or None
+
+    @property
+    def collant(self):
+        """L'utilisateur a écrit il y a moins de REPLIQUE_DELAI secondes"""
+        if self._collant is None:
+            user_id = self.utilisateur_id
+            self._collant = bool(user_id and cache.get(ECRITURE_KEY.format(user_id=user_id)))
+        return self._collant
+
+
+def replique_disponible():
+    return REPLIQUE in settings.DATABASES
+
+
+def lecture_sur_replique(vue):
+    """Marque une vue (fonction ou méthode de ViewSet) dont les lectures peuvent aller sur la réplique"""
+
+    @functools.wraps(vue)
+    def enveloppe(*args, **kwargs):
+        jeton = _lecture.set(True)
+        try:
+            return vue(*args, **kwargs)
+        finally:
+            _lecture.reset(jeton)
+
+    return enveloppe
+
+
+@contextmanager
+def sur_primaire():
+    """Force les lectures du bloc sur le primaire, même dans une vue @lecture_sur_replique"""
+    jeton = _lecture.set(False)
+    try:
+        yield
+    finally:
+        _lecture.reset(jeton)
+
+
+class RouteurReplique:
+    """DATABASE_ROUTERS : lectures marquées -> réplique, le reste -> primaire"""
+
+    def db_for_read(self, model, **hints):
+        if not _lecture.get() or not replique_disponible():
+            return None
+        if connections[PRIMAIRE].in_atomic_block:
+            return PRIMAIRE
+        etat = _requete.get()
+        if etat is not None and (etat.ecrit or etat.collant):
+            return PRIMAIRE
+        return REPLIQUE
+
+    def db_for_write(self, model, **hints):
+        etat = _requete.get()
+        if etat is not None:
+            etat.ecrit = True
+        return PRIMAIRE
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if {obj1._state.db, obj2._state.db} <= {PRIMAIRE, REPLIQUE}:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == REPLIQUE:
+            return False
+        return None
+
+
+class RepliqueMiddleware(MiddlewareHybride):
+    """
+    Suit les écritures de la requête pour RouteurReplique et, si
+    l'utilisateur a écrit, garde ses lectures sur le primaire pendant
+    REPLIQUE_DELAI secondes. Ajouté à MIDDLEWARE seulement si la réplique
+    est configurée (DB_REPLICA_HOST).
+    """
+
+    def traiter(self, request):
+        etat = EtatRequete(request)
+        jeton = _requete.set(etat)
+        try:
+            response = self.get_response(request)
+        finally:
+            _requete.reset(jeton)
+
+        if etat.ecrit and etat.utilisateur_id:
+            cache.set(ECRITURE_KEY.format(user_id=etat.utilisateur_id), 1, timeout=settings.REPLIQUE_DELAI)
+        return response
+
+    async def __acall__(self, request):
+        # Le contexte (donc l'état) suit la requête dans ses threads synchrones
+        etat = EtatRequete(request)
+        jeton = _requete.set(etat)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _requete.reset(jeton)
+
+        if etat.ecrit and etat.utilisateur_id:
+            await cache.aset(ECRITURE_KEY.format(user_id=etat.utilisateur_id), 1, timeout=settings.REPLIQUE_DELAI)
+        return response
@@ -48,9 +48,12 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'sgee_project.middleware.PerformanceMiddleware',  # en premier : mesure toute la chaîne
     'django.middleware.security.SecurityMiddleware',
+    'sgee_project.middleware.CompressionMiddleware',  # gzip/brotli, au-dessus de ConditionalGet
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',  # CORS doit être avant CommonMiddleware
+    'django.middleware.http.ConditionalGetMiddleware',  # ETag + 304 (sous CORS pour garder ses en-têtes)
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -81,14 +84,25 @@ WSGI_APPLICATION = 'sgee_project.wsgi.application'
 # Database
 # Dans settings.py, dans la section DATABASES, modifiez OPTIONS:
 
+# Réutilisation des connexions : persistantes DB_CONN_MAX_AGE secondes (0 =
+# une connexion par requête), vérifiées en début de requête. DB_POOL_TAILLE > 0
+# active le pool de sgee_project/mysql_pool (utile avec des workers threadés
+# et les threads d'envoi) ; les connexions y retournent alors à chaque fin de requête.
+DB_CONN_MAX_AGE = config('DB_CONN_MAX_AGE', default=60, cast=int)
+DB_CONN_HEALTH_CHECKS = config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool)
+DB_POOL_TAILLE = config('DB_POOL_TAILLE', default=0, cast=int)
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.mysql',
+        'ENGINE': 'sgee_project.mysql_pool' if DB_POOL_TAILLE else 'django.db.backends.mysql',
         'NAME': config('DB_NAME', default='sgee_db'),
         'USER': config('DB_USER', default='root'),
         'PASSWORD': config('DB_PASSWORD', default=''),
         'HOST': config('DB_HOST', default='localhost'),
         'PORT': config('DB_PORT', default='3306'),
+        'CONN_MAX_AGE': 0 if DB_POOL_TAILLE else DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': DB_CONN_HEALTH_CHECKS,
+        'POOL_TAILLE': DB_POOL_TAILLE,
         'OPTIONS': {
             'charset': 'utf8mb4',
             'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
@@ -96,6 +110,28 @@ DATABASES = {
         }
     }
 }
+# Connexion dédiée aux compteurs de numéros (configurations/sequences.py) :
+# les blocs réservés sont validés hors de la transaction en cours
+DATABASES['sequences'] = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+SEQUENCE_TAILLE_BLOC = config('SEQUENCE_TAILLE_BLOC', default=100, cast=int)
+
+# Réplique en lecture (sgee_project/routers.py) : tableaux de bord, exports et
+# listes d'administration y lisent si DB_REPLICA_HOST est renseigné. Après une
+# écriture, les lectures de l'utilisateur restent REPLIQUE_DELAI secondes sur le primaire.
+DB_REPLICA_HOST = config('DB_REPLICA_HOST', default='')
+REPLIQUE_DELAI = config('REPLIQUE_DELAI', default=5, cast=int)  # secondes
+if DB_REPLICA_HOST:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': DB_REPLICA_HOST,
+        'PORT': config('DB_REPLICA_PORT', default=DATABASES['default']['PORT']),
+        'USER': config('DB_REPLICA_USER', default=DATABASES['default']['USER']),
+        'PASSWORD': config('DB_REPLICA_PASSWORD', default=DATABASES['default']['PASSWORD']),
+        'TEST': {'MIRROR': 'default'},
+    }
+    MIDDLEWARE.append('sgee_project.routers.RepliqueMiddleware')
+DATABASE_ROUTERS = ['sgee_project.routers.RouteurReplique']
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -132,6 +168,122 @@ REST_FRAMEWORK = {
     ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': config('DEFAULT_PAGE_SIZE', default=20, cast=int),
+    # Proxys de confiance devant Django : 0 = adresse IP de la connexion
+    # (REMOTE_ADDR), X-Forwarded-For ignoré ; 1 derrière un seul nginx, etc.
+    'NUM_PROXIES': config('NUM_PROXIES', default=0, cast=int),
+}
+
+# Cache (LocMem par défaut, Redis/Memcached via les variables d'environnement)
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='sgee-cache'),
+        'TIMEOUT': config('CACHE_TIMEOUT', default=300, cast=int),
+    }
+}
+
+# Durée de vie (secondes) du catalogue des épreuves en cache
+EPREUVES_CATALOGUE_TTL = config('EPREUVES_CATALOGUE_TTL', default=3600, cast=int)
+
+# Compression des réponses (sgee_project.middleware.CompressionMiddleware)
+COMPRESSION_MIN_SIZE = config('COMPRESSION_MIN_SIZE', default=1024, cast=int)  # octets
+COMPRESSION_GZIP_LEVEL = config('COMPRESSION_GZIP_LEVEL', default=6, cast=int)
+COMPRESSION_BROTLI_QUALITY = config('COMPRESSION_BROTLI_QUALITY', default=5, cast=int)
+
+# Mesure des requêtes (sgee_project/metriques.py) : en-tête Server-Timing et /api/metrics/
+METRIQUES_ACTIVES = config('METRIQUES_ACTIVES', default=True, cast=bool)
+# Server-Timing est renvoyé à tout client, anonymes compris : en développement seulement par défaut
+METRIQUES_SERVER_TIMING = config('METRIQUES_SERVER_TIMING', default=DEBUG, cast=bool)
+METRIQUES_PUBLICATION = config('METRIQUES_PUBLICATION', default=10, cast=int)  # secondes
+METRIQUES_JETON = config('METRIQUES_JETON', default='')  # Bearer du scraper Prometheus (optionnel)
+
+# Détection des N+1 et des requêtes lentes (sgee_project/detecteur.py), pour le
+# développement et la préproduction : alertes journalisées à chaque requête
+DETECTEUR_REQUETES = config('DETECTEUR_REQUETES', default=False, cast=bool)
+DETECTEUR_N_PLUS_UN_SEUIL = config('DETECTEUR_N_PLUS_UN_SEUIL', default=5, cast=int)  # exécutions d'une même requête
+DETECTEUR_LENTE_MS = config('DETECTEUR_LENTE_MS', default=100, cast=int)
+if DETECTEUR_REQUETES:
+    MIDDLEWARE.insert(1, 'sgee_project.middleware.DetecteurRequetesMiddleware')
+
+# Espace des codes quitus : seuils d'alerte (% d'utilisation)
+QUITUS_SEUIL_ALERTE = config('QUITUS_SEUIL_ALERTE', default=80, cast=float)
+QUITUS_SEUIL_CRITIQUE = config('QUITUS_SEUIL_CRITIQUE', default=95, cast=float)
+
+# Vérification des codes quitus : filtre en mémoire et limitation par IP.
+# L'invalidation du filtre après génération passe par le cache : avec un cache
+# par processus (LocMem) ou generer_quitus lancé à part, les autres processus ne
+# voient les nouveaux codes qu'après QUITUS_FILTRE_CONTROLE secondes (contrôle
+# du plus grand id en base sur un code absent). Prévoir Redis/Memcached en production.
+QUITUS_FILTRE_TTL = config('QUITUS_FILTRE_TTL', default=300, cast=int)  # secondes
+QUITUS_FILTRE_CONTROLE = config('QUITUS_FILTRE_CONTROLE', default=5, cast=int)  # secondes
+QUITUS_VERIFICATION_RAFALE = config('QUITUS_VERIFICATION_RAFALE', default=10, cast=int)
+QUITUS_VERIFICATION_PAR_MINUTE = config('QUITUS_VERIFICATION_PAR_MINUTE', default=30, cast=int)
+QUITUS_STATS_TTL = config('QUITUS_STATS_TTL', default=60, cast=int)  # compteurs de l'admin (secondes)
+
+# Détection des doublons de candidats : similarité minimale des noms (0 à 1)
+DOUBLONS_SEUIL = config('DOUBLONS_SEUIL', default=0.85, cast=float)
+
+# Flux SSE (candidats/events.py) : BackendMemoire suffit avec un seul worker ASGI,
+# candidats.events.BackendRedis (paquet redis) dès qu'il y en a plusieurs
+EVENEMENTS_BACKEND = config('EVENEMENTS_BACKEND', default='candidats.events.BackendMemoire')
+EVENEMENTS_REDIS_URL = config('EVENEMENTS_REDIS_URL', default='redis://localhost:6379/0')
+EVENEMENTS_HEARTBEAT = config('EVENEMENTS_HEARTBEAT', default=15, cast=int)  # secondes
+
+# Versions asynchrones (ORM asynchrone) des endpoints publics les plus sollicités :
+# vérification quitus, cascade de configuration, liste des épreuves, check-enrollment.
+# À activer sous le serveur ASGI (uvicorn sgee_project.asgi:application) ; sous WSGI
+# chaque appel créerait sa propre boucle d'événements. Voir bench_async.
+VUES_ASYNCHRONES = config('VUES_ASYNCHRONES', default=False, cast=bool)
+
+# Âge maximal (secondes) du registre des données de référence en mémoire.
+# Sa version vit dans le cache : avec LocMem elle est propre à chaque processus,
+# les autres workers ne voient une modification qu'au bout de ce délai.
+REFERENTIEL_TTL = config('REFERENTIEL_TTL', default=3600, cast=int)
+
+# Journalisation (sgee_project/logutils.py) : JSON sur la sortie standard,
+# écrit par un thread dédié. LOG_NIVEAUX fixe des niveaux par module,
+# ex. "candidats.views=DEBUG,authentication=WARNING".
+LOG_NIVEAU = config('LOG_NIVEAU', default='INFO')
+LOG_FORMAT = config('LOG_FORMAT', default='json')  # json ou texte
+LOG_DEBUG_ECHANTILLON = config('LOG_DEBUG_ECHANTILLON', default=1.0, cast=float)  # part des DEBUG gardés
+LOG_ASYNCHRONE = config('LOG_ASYNCHRONE', default=True, cast=bool)
+LOG_NIVEAUX = config(
+    'LOG_NIVEAUX',
+    default='',
+    cast=lambda v: dict(item.strip().split('=', 1) for item in v.split(',') if '=' in item)
+)
+
+LOGGING_CONFIG = 'sgee_project.logutils.configurer'
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'asynchrone': LOG_ASYNCHRONE,
+    'formatters': {
+        'json': {'()': 'sgee_project.logutils.FormateurJSON'},
+        'texte': {'format': '%(asctime)s %(levelname)s %(name)s: %(message)s'},
+    },
+    'filters': {
+        'echantillonnage_debug': {
+            '()': 'sgee_project.logutils.EchantillonnageDebug',
+            'taux': LOG_DEBUG_ECHANTILLON,
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'stream': 'ext://sys.stdout',
+            'formatter': LOG_FORMAT,
+            'filters': ['echantillonnage_debug'],
+        },
+    },
+    'root': {'handlers': ['console'], 'level': 'WARNING'},
+    'loggers': {
+        **{app: {'level': LOG_NIVEAU} for app in (
+            'sgee_project', 'authentication', 'candidats', 'inscriptions', 'communications', 'configurations',
+        )},
+        'django': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+        **{module: {'level': niveau.strip().upper()} for module, niveau in LOG_NIVEAUX.items()},
+    },
 }
 
 # JWT Settings
@@ -163,13 +315,6 @@ EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = f"ESTLC <{config('EMAIL_HOST_USER', default='noreply@estlc.cm')}>"
 
-# Vérification temporaire
-print("=" * 60)
-print("🔍 VÉRIFICATION CONFIGURATION EMAIL")
-print("=" * 60)
-print(f"EMAIL_HOST_USER: {EMAIL_HOST_USER}")
-print(f"EMAIL_HOST_PASSWORD: {'✅ Configuré' if EMAIL_HOST_PASSWORD else '❌ NON CONFIGURÉ'}")
-print("=" * 60)
 # Pour Gmail, créez un "mot de passe d'application" :
 # https://myaccount.google.com/apppasswords
 # File Upload Settings
@@ -0,0 +1,275 @@
+import gzip
+import json
+from datetime import timedelta
+from urllib.parse import parse_qs, urlparse
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections, router, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .middleware import CompressionMiddleware, brotli, choisir_encodage
+from .pagination import KeysetPagination
+from .routers import (
+    ECRITURE_KEY, PRIMAIRE, REPLIQUE, RepliqueMiddleware, lecture_sur_replique, sur_primaire,
+)
+
+User = get_user_model()
+
+
+@lecture_sur_replique
+def base_de_lecture():
+    return router.db_for_read(User)
+
+
+# ============================================
+# ROUTAGE DES LECTURES VERS LA RÉPLIQUE
+# ============================================
+
+class RouteurRepliqueTests(TransactionTestCase):
+    # TransactionTestCase : TestCase ouvre une transaction, qui garde tout sur le primaire.
+    # '__all__' est résolu dans setUpClass, une fois la réplique ajoutée
+    databases = '__all__'
+
+    @classmethod
+    def setUpClass(cls):
+        # Sans DB_REPLICA_HOST, la réplique est simulée le temps de ces tests par
+        # un miroir de la base de test (TEST MIRROR, comme en production)
+        cls.replique_simulee = REPLIQUE not in connections.settings
+        if cls.replique_simulee:
+            primaire = connections[PRIMAIRE].settings_dict
+            connections.settings[REPLIQUE] = {**primaire, 'TEST': {**primaire['TEST'], 'MIRROR': PRIMAIRE}}
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        if cls.replique_simulee:
+            connections[REPLIQUE].close()
+            del connections[REPLIQUE]
+            del connections.settings[REPLIQUE]
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+
+    def requete(self, user_id=None):
+        entetes = {'Authorization': f'Bearer {AccessToken.for_user(User(pk=user_id))}'} if user_id else {}
+        return self.factory.get('/api/auth/users/', headers=entetes)
+
+    def passer(self, request, vue):
+        """Fait traverser RepliqueMiddleware à `vue`, qui renvoie les bases utilisées"""
+        bases = []
+
+        def get_response(request):
+            bases.extend(vue())
+            return HttpResponse()
+
+        RepliqueMiddleware(get_response)(request)
+        return bases
+
+    def test_vue_marquee_lit_sur_replique(self):
+        self.assertEqual(base_de_lecture(), REPLIQUE)
+        self.assertEqual(router.db_for_read(User), PRIMAIRE)
+        with sur_primaire():
+            self.assertEqual(router.db_for_read(User), PRIMAIRE)
+
+    def test_replique_voit_les_donnees_du_primaire(self):
+        user = User.objects.create_user(email='lecteur@example.com', password='x')
+
+        @lecture_sur_replique
+        def lire():
+            requete = User.objects.filter(pk=user.pk)
+            return requete.db, requete.exists()
+
+        self.assertEqual(lire(), (REPLIQUE, True))
+
+    def test_primaire_dans_une_transaction(self):
+        with transaction.atomic():
+            self.assertEqual(base_de_lecture(), PRIMAIRE)
+        self.assertEqual(base_de_lecture(), REPLIQUE)
+
+    def test_primaire_apres_une_ecriture_de_la_requete(self):
+        def vue():
+            avant = base_de_lecture()
+            User.objects.create_user(email='ecrivain@example.com', password='x')
+            return [avant, base_de_lecture()]
+
+        self.assertEqual(self.passer(self.requete(), vue), [REPLIQUE, PRIMAIRE])
+
+    def test_fenetre_collante_apres_ecriture(self):
+        def ecrire():
+            User.objects.create_user(email='collant@example.com', password='x')
+            return []
+
+        def lire():
+            return [base_de_lecture()]
+
+        self.passer(self.requete(user_id=7), ecrire)
+        self.assertTrue(cache.get(ECRITURE_KEY.format(user_id=7)))
+
+        self.assertEqual(self.passer(self.requete(user_id=7), lire), [PRIMAIRE])
+        self.assertEqual(self.passer(self.requete(user_id=8), lire), [REPLIQUE])
+        self.assertEqual(self.passer(self.requete(), lire), [REPLIQUE])
+
+        # Fin de REPLIQUE_DELAI : retour sur la réplique
+        cache.delete(ECRITURE_KEY.format(user_id=7))
+        self.assertEqual(self.passer(self.requete(user_id=7), lire), [REPLIQUE])
+
+    def test_ecriture_anonyme_sans_fenetre(self):
+        def ecrire():
+            User.objects.create_user(email='anonyme@example.com', password='x')
+            return []
+
+        self.passer(self.requete(), ecrire)
+        self.assertEqual(self.passer(self.requete(), lambda: [base_de_lecture()]), [REPLIQUE])
+
+    def test_pas_de_migration_sur_la_replique(self):
+        self.assertFalse(router.allow_migrate(REPLIQUE, 'candidats', model_name='candidat'))
+        self.assertTrue(router.allow_migrate(PRIMAIRE, 'candidats', model_name='candidat'))
+
+
+# ============================================
+# COMPRESSION DES RÉPONSES
+# ============================================
+
+@override_settings(COMPRESSION_MIN_SIZE=200)
+class CompressionMiddlewareTests(SimpleTestCase):
+    CONTENU = json.dumps([{'id': i, 'libelle': 'Informatique'} for i in range(50)]).encode()
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def passer(self, accept_encoding='', contenu=CONTENU, content_type='application/json', cookies=None, **entetes):
+        def get_response(request):
+            response = HttpResponse(contenu, content_type=content_type)
+            for nom, valeur in entetes.items():
+                response[nom] = valeur
+            return response
+
+        request = self.factory.get('/api/config/filieres/', headers={'Accept-Encoding': accept_encoding})
+        request.COOKIES.update(cookies or {})
+        return CompressionMiddleware(get_response)(request)
+
+    def test_choix_de_l_encodage(self):
+        self.assertEqual(choisir_encodage('gzip, deflate'), 'gzip')
+        self.assertEqual(choisir_encodage('*'), 'br' if brotli else 'gzip')
+        self.assertIsNone(choisir_encodage('gzip;q=0, identity'))
+        self.assertIsNone(choisir_encodage(''))
+        if brotli:
+            self.assertEqual(choisir_encodage('gzip, br'), 'br')
+            self.assertEqual(choisir_encodage('gzip, br;q=0.5'), 'gzip')
+
+    def test_gzip(self):
+        response = self.passer('gzip, deflate', ETag='"abc"')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), self.CONTENU)
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+        self.assertEqual(response['ETag'], 'W/"abc"')
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_sans_encodage_accepte(self):
+        response = self.passer('identity')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content, self.CONTENU)
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_taille_minimale(self):
+        response = self.passer('gzip', contenu=self.CONTENU[:199])
+        self.assertFalse(response.has_header('Content-Encoding'))
+        # La version longue serait compressée : un cache doit distinguer les clients
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_contenu_deja_compresse(self):
+        response = self.passer('gzip', content_type='application/pdf')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertFalse(response.has_header('Vary'))
+
+    def test_pas_de_compression_avec_cookie_de_session(self):
+        response = self.passer('gzip', cookies={settings.SESSION_COOKIE_NAME: 'x'})
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content, self.CONTENU)
+
+
+# ============================================
+# PAGINATION PAR CURSEUR (KEYSET)
+# ============================================
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class KeysetPaginationTests(TestCase):
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        # 7 utilisateurs, dont 4 créés au même instant (égalité sur created_at)
+        instant = timezone.now()
+        for i in range(7):
+            User.objects.create_user(f'page{i}@example.com', 'x', role='candidat')
+        User.objects.filter(email__in=[f'page{i}@example.com' for i in (1, 2, 3, 4)]).update(created_at=instant)
+        User.objects.filter(email__in=['page5@example.com', 'page6@example.com']).update(
+            created_at=instant - timedelta(minutes=1)
+        )
+        self.attendu = list(User.objects.order_by('-created_at', '-id').values_list('pk', flat=True))
+
+    def page(self, **params):
+        paginator = KeysetPagination()
+        objets = paginator.paginate_queryset(User.objects.all(), Request(self.factory.get('/', params)))
+        return [objet.pk for objet in objets], paginator.get_meta()
+
+    def curseur(self, meta):
+        return parse_qs(urlparse(meta['next']).query)['cursor'][0]
+
+    def parcourir(self, per_page):
+        vus, params = [], {'cursor': '', 'per_page': per_page}
+        while True:
+            pks, meta = self.page(**params)
+            vus.append(pks)
+            if meta['next'] is None:
+                return vus
+            params['cursor'] = self.curseur(meta)
+
+    def test_parcours_complet_avec_egalites(self):
+        for per_page in (1, 2, 3, 7):
+            pages = self.parcourir(per_page)
+            self.assertEqual([pk for page in pages for pk in page], self.attendu, per_page)
+            # Pas de page vide en fin de parcours, même quand le total est un multiple de la taille
+            self.assertTrue(all(pages), per_page)
+
+    def test_curseur_au_milieu_d_une_egalite(self):
+        # La première page s'arrête au milieu des 4 lignes de même created_at
+        _, meta = self.page(cursor='', per_page=2)
+        pks, _ = self.page(cursor=self.curseur(meta), per_page=2)
+        self.assertEqual(pks, self.attendu[2:4])
+
+    def test_taille_de_page_bornee(self):
+        self.assertEqual(self.page(cursor='', per_page=0)[1]['per_page'], 1)
+        self.assertEqual(self.page(cursor='', per_page=1000)[1]['per_page'], KeysetPagination.max_page_size)
+        self.assertEqual(self.page(cursor='', per_page='abc')[1]['per_page'], KeysetPagination.page_size)
+
+    def test_total_sur_demande(self):
+        self.assertNotIn('count', self.page(cursor='')[1])
+        self.assertEqual(self.page(cursor='', count='exact')[1]['count'], 7)
+        # Estimation MySQL uniquement : compte exact ailleurs
+        meta = self.page(cursor='', count='estime')[1]
+        self.assertEqual((meta['count'], meta['count_estime']), (7, False))
+
+    def test_curseur_invalide(self):
+        for curseur in ('pas-un-curseur', 'e30'):  # e30 : {} en base64
+            with self.assertRaises(NotFound):
+                self.page(cursor=curseur)
+
+    def test_liste_des_utilisateurs(self):
+        admin = User.objects.create_user('admin-page@example.com', 'x', role='super_admin')
+        client = APIClient()
+        client.force_authenticate(admin)
+        donnees = client.get('/api/auth/users/', {'cursor': '', 'per_page': 5}).json()
+        self.assertEqual([u['id'] for u in donnees['users']], self.attendu[:5])
+        suite = client.get(donnees['next']).json()
+        self.assertEqual([u['id'] for u in suite['users']], self.attendu[5:])
+        self.assertIsNone(suite['next'])
@@ -19,8 +19,11 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from .metriques import metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/metrics/', metrics_view, name='metrics'),
      path('api/auth/', include('authentication.urls')),
     path('api/candidats/', include('candidats.urls')), 
     path('api/inscriptions/', include('inscriptions.urls')),